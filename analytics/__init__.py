@@ -0,0 +1 @@
+"""Аналитика витрины: буфер событий (analytics.buffer) и пересчёт подборок (analytics.aggregate)."""
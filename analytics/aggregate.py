@@ -0,0 +1,165 @@
+"""Пересчёт подборок по событиям витрины в таблицу recommendations.
+
+Запускается как фоновая задача analytics.aggregate (jobs.tasks), по таймеру
+run_forever или вручную через POST /jobs/analytics.aggregate. Считает по
+событиям за ANALYTICS_WINDOW_DAYS:
+
+* popular — вес товара (просмотр 1, корзина CART_WEIGHT) по категориям и по
+  всему каталогу;
+* also_viewed — товары, которые смотрели в тех же сессиях (пары совместных
+  просмотров), по убыванию числа таких сессий.
+
+Хранится только верх TOP_SIZE каждой подборки, поэтому запрос к ней — одна
+строка по первичному ключу. События старше окна удаляются.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from itertools import combinations
+from typing import Awaitable, Callable
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from analytics.buffer import KIND_CART
+from catalog.pricing import utcnow
+from config import ANALYTICS_WINDOW_DAYS
+from jobs.queue import queue
+from models.analytics import ItemEvent, Recommendation
+from models.catalog import CatalogItem
+
+logger = logging.getLogger(__name__)
+
+KIND_POPULAR = "popular"
+KIND_ALSO_VIEWED = "also_viewed"
+# key_id подборки popular по всему каталогу
+ALL_CATEGORIES = 0
+
+TOP_SIZE = 20
+CART_WEIGHT = 3
+# Сессия с сотнями просмотров (бот, перебор каталога) даёт квадратичное число пар —
+# учитываются только первые её товары
+SESSION_ITEMS_MAX = 50
+# Через сколько сессий отдавать управление циклу событий и сообщать прогресс
+SESSIONS_PER_STEP = 500
+
+
+@dataclass
+class AggregateReport:
+    events_pruned: int = 0
+    items: int = 0
+    sessions: int = 0
+    pairs: int = 0
+    duration_ms: float = 0.0
+
+
+def _top(scores: dict[int, float], tie_break: dict[int, float]) -> list[int]:
+    best = heapq.nlargest(
+        TOP_SIZE, scores.items(), key=lambda entry: (entry[1], tie_break.get(entry[0], 0), -entry[0])
+    )
+    return [item_id for item_id, _ in best]
+
+
+async def aggregate(
+    session_factory: async_sessionmaker[AsyncSession],
+    window_days: int = ANALYTICS_WINDOW_DAYS,
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> AggregateReport:
+    started = time.perf_counter()
+    report = AggregateReport()
+    cutoff = utcnow() - timedelta(days=window_days)
+
+    async with session_factory() as session:
+        pruned = await session.execute(delete(ItemEvent).where(ItemEvent.created_at < cutoff))
+        report.events_pruned = pruned.rowcount or 0
+        await session.commit()
+
+        # Вес товаров; join с витриной отсекает удалённые и скрытые товары
+        weight = case((ItemEvent.kind == KIND_CART, CART_WEIGHT), else_=1)
+        scores: dict[int, float] = {}
+        by_category: dict[int, dict[int, float]] = defaultdict(dict)
+        for item_id, category_id, score in await session.execute(
+            select(CatalogItem.item_id, CatalogItem.category_id, func.sum(weight))
+            .join(ItemEvent, ItemEvent.item_id == CatalogItem.item_id)
+            .group_by(CatalogItem.item_id, CatalogItem.category_id)
+        ):
+            scores[item_id] = score
+            if category_id is not None:
+                by_category[category_id][item_id] = score
+        report.items = len(scores)
+
+        total_sessions = await session.scalar(
+            select(func.count(func.distinct(ItemEvent.session_id)))
+        ) or 0
+        co_views: dict[int, Counter] = defaultdict(Counter)
+
+        def count_pairs(item_ids: list[int]) -> None:
+            for a, b in combinations(sorted(item_ids[:SESSION_ITEMS_MAX]), 2):
+                co_views[a][b] += 1
+                co_views[b][a] += 1
+                report.pairs += 1
+
+        current_session, current_items = None, []
+        result = await session.stream(
+            select(ItemEvent.session_id, ItemEvent.item_id)
+            .distinct()
+            .order_by(ItemEvent.session_id, ItemEvent.item_id)
+        )
+        async for session_id, item_id in result:
+            if session_id != current_session:
+                if current_items:
+                    count_pairs(current_items)
+                current_session, current_items = session_id, []
+                report.sessions += 1
+                if report.sessions % SESSIONS_PER_STEP == 0:
+                    if on_progress is not None:
+                        await on_progress(report.sessions, total_sessions)
+                    await asyncio.sleep(0)
+            if item_id in scores:
+                current_items.append(item_id)
+        if current_items:
+            count_pairs(current_items)
+
+        rows = [{"kind": KIND_POPULAR, "key_id": ALL_CATEGORIES, "item_ids": _top(scores, {})}]
+        rows.extend(
+            {"kind": KIND_POPULAR, "key_id": category_id, "item_ids": _top(category_scores, {})}
+            for category_id, category_scores in by_category.items()
+        )
+        rows.extend(
+            {"kind": KIND_ALSO_VIEWED, "key_id": item_id, "item_ids": _top(counter, scores)}
+            for item_id, counter in co_views.items()
+        )
+        # Подборки заменяются целиком одной транзакцией: читатели видят либо старые, либо новые
+        await session.execute(delete(Recommendation))
+        await session.execute(insert(Recommendation), rows)
+        await session.commit()
+
+    if on_progress is not None:
+        await on_progress(total_sessions, total_sessions)
+    report.duration_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        "Подборки пересчитаны: товаров %d, сессий %d, пар %d, удалено старых событий %d (%.0f мс)",
+        report.items, report.sessions, report.pairs, report.events_pruned, report.duration_ms,
+    )
+    return report
+
+
+async def run_forever(interval: float) -> None:
+    """Фоновая задача для lifespan: раз в interval ставит пересчёт в очередь задач.
+
+    Ключ идемпотентности — номер интервала, поэтому при нескольких процессах
+    пересчёт за интервал ставится один раз.
+    """
+    while True:
+        slot = int(time.time() // interval)
+        try:
+            await queue.enqueue("analytics.aggregate", idempotency_key=f"analytics.aggregate:{slot}")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Не удалось поставить пересчёт подборок")
+        await asyncio.sleep((slot + 1) * interval - time.time())
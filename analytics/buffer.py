@@ -0,0 +1,100 @@
+"""Буфер событий витрины: приём без записи в БД на каждый запрос.
+
+POST /analytics/events только добавляет события в список в памяти. Фоновая
+задача (EventBuffer.run_forever) раз в ANALYTICS_FLUSH_INTERVAL сек — или
+раньше, когда набралось ANALYTICS_FLUSH_SIZE — пишет их одним executemany
+INSERT в одной транзакции. Буфер ограничен ANALYTICS_BUFFER_MAX: при
+недоступной БД лишние события отбрасываются (аналитика не важнее витрины).
+При остановке приложения остаток записывается.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from catalog.pricing import utcnow
+from config import ANALYTICS_BUFFER_MAX, ANALYTICS_FLUSH_INTERVAL, ANALYTICS_FLUSH_SIZE
+from database.db import new_async_session
+from models.analytics import ItemEvent
+
+logger = logging.getLogger(__name__)
+
+KIND_VIEW = "view"
+KIND_CART = "cart"
+
+
+class EventBuffer:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float = ANALYTICS_FLUSH_INTERVAL,
+        flush_size: int = ANALYTICS_FLUSH_SIZE,
+        max_size: int = ANALYTICS_BUFFER_MAX,
+    ) -> None:
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_size = max_size
+        self._rows: list[dict] = []
+        self._wakeup = asyncio.Event()
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, session_id: str, events: list[tuple[str, int]]) -> int:
+        """Добавить события [(kind, item_id)] одной сессии. Возвращает число принятых."""
+        accepted = events[: max(self.max_size - len(self._rows), 0)]
+        self.dropped += len(events) - len(accepted)
+        now = utcnow()
+        self._rows.extend(
+            {"kind": kind, "item_id": item_id, "session_id": session_id, "created_at": now}
+            for kind, item_id in accepted
+        )
+        if len(self._rows) >= self.flush_size:
+            self._wakeup.set()
+        return len(accepted)
+
+    async def flush(self) -> int:
+        """Записать накопленное одной транзакцией. Возвращает число записанных событий."""
+        rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            async with self._session_factory() as session:
+                await session.execute(insert(ItemEvent), rows)
+                await session.commit()
+        except BaseException:
+            # Вернуть пачку в начало буфера (в пределах max_size) и повторить позже
+            keep = rows[: max(self.max_size - len(self._rows), 0)]
+            self.dropped += len(rows) - len(keep)
+            self._rows[:0] = keep
+            raise
+        self.written += len(rows)
+        return len(rows)
+
+    async def run_forever(self) -> None:
+        """Фоновая задача для lifespan; при отмене дописывает остаток буфера."""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+                try:
+                    await self.flush()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Не удалось записать события аналитики (в буфере %d)", len(self))
+        except asyncio.CancelledError:
+            if self._rows:
+                await self.flush()
+            raise
+
+
+buffer = EventBuffer(new_async_session)
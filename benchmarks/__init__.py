@@ -0,0 +1 @@
+"""Бенчмарки горячих путей. Запуск из корня репозитория: python -m benchmarks.<имя>."""
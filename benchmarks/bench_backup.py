@@ -0,0 +1,208 @@
+"""Задержки /get_items, пока делается резервная копия SQLite.
+
+Во временном каталоге засевается файловая SQLite (товары витрины плюс
+таблица-балласт, чтобы копия шла заметное время) и приложение (main.app)
+вызывается в том же процессе напрямую по ASGI — как в проде, копия и запросы
+делят один процесс и GIL. /get_items приходит RATE раз в секунду со случайными
+category_id и min_price (мимо кэша ответов — каждый запрос идёт в БД). Три фазы:
+
+* без копии;
+* копия одним шагом прямо в цикле событий (sqlite3 backup без pages) — как
+  делать не надо;
+* database.backup.create — шагами по BACKUP_PAGES страниц в отдельном потоке,
+  со сжатием.
+
+Каждая фаза — не меньше WINDOW секунд трафика; для неё число запросов, p50 / p99 / максимум задержки и время копии.
+
+    python -m benchmarks.bench_backup [число_товаров] [балласт_МБ]
+"""
+import os
+import sys
+import tempfile
+
+# Настройки читаются при импорте config — до импорта приложения
+WORKDIR = tempfile.mkdtemp(prefix="bench_backup-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{WORKDIR}/bench.db",
+    "BACKUP_DIR": os.path.join(WORKDIR, "backups"),
+    "TELEGRAM_BOT_TOKEN": "",
+    "RATE_LIMIT_ENABLED": "0",
+})
+
+import asyncio  # noqa: E402
+import random  # noqa: E402
+import shutil  # noqa: E402
+import sqlite3  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from urllib.parse import urlencode  # noqa: E402
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from benchmarks.bench_statements import CATEGORIES, seed  # noqa: E402
+from config import BACKUP_PAGES, BACKUP_STEP_PAUSE  # noqa: E402
+from database import backup  # noqa: E402
+from database.db import Base, engine  # noqa: E402
+from main import app  # noqa: E402
+
+# Запросов в секунду — примерно половина того, что успевает один процесс
+RATE = 60
+WINDOW = 10.0
+BALLAST_ROW = 64 * 1024
+
+
+def ballast_row() -> bytes:
+    """Строка балласта, которая сжимается примерно как данные каталога (текст с повторами)."""
+    words = [f"Товар {random.randint(1, 10 ** 6)} цена {random.random():.4f}" for _ in range(BALLAST_ROW // 48)]
+    return " ".join(words).encode()[:BALLAST_ROW]
+
+
+def prepare(items_count: int, ballast_mb: int) -> str:
+    path = backup.sqlite_path()
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        seed(session, items_count)
+    sync_engine.dispose()
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE bench_ballast (data BLOB)")
+        connection.executemany(
+            "INSERT INTO bench_ballast VALUES (?)",
+            ((ballast_row(),) for _ in range(ballast_mb * 1024 * 1024 // BALLAST_ROW)),
+        )
+    return path
+
+
+async def get(path: str, params: dict) -> int:
+    """GET через ASGI-приложение без сервера; вернуть статус ответа."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": urlencode(params).encode(),
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def request(arrived: float, latencies: list[float]) -> None:
+    params = {"category_id": random.randint(1, CATEGORIES), "min_price": round(random.uniform(0, 150), 2)}
+    status = await get("/get_items", params)
+    latencies.append((time.perf_counter() - arrived) * 1000)
+    if status != 200:
+        raise RuntimeError(f"/get_items ответил {status}")
+
+
+async def traffic(stop: asyncio.Event, latencies: list[float]) -> None:
+    """Открытая нагрузка: запросы приходят с частотой RATE независимо от ответов.
+
+    Задержка считается от расчётного момента прихода: если цикл событий был занят,
+    опоздавшие запросы запускаются разом, и ожидание входит в их задержку
+    (клиенты, ждущие ответа перед следующим запросом, такую остановку скрывают).
+    """
+    in_flight: set[asyncio.Task] = set()
+    arrival = time.perf_counter()
+    while not stop.is_set():
+        while arrival <= time.perf_counter():
+            task = asyncio.create_task(request(arrival, latencies))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            arrival += random.expovariate(RATE)
+        await asyncio.sleep(arrival - time.perf_counter())
+    await asyncio.gather(*in_flight)
+
+
+def naive_backup(source_path: str) -> None:
+    """Копия одним шагом в цикле событий — блокирует его на всё время копирования."""
+    target_path = os.path.join(WORKDIR, "naive.db")
+    source, target = sqlite3.connect(source_path), sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+        os.remove(target_path)
+
+
+async def phase(action) -> tuple[list[float], float, object]:
+    """Трафик не меньше WINDOW секунд, в начале которых выполняется action.
+
+    (задержки, длительность action, её результат).
+    """
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    load = asyncio.create_task(traffic(stop, latencies))
+    await asyncio.sleep(0.5)  # разгон
+    latencies.clear()
+    started = time.perf_counter()
+    result = await action() if action is not None else None
+    duration = time.perf_counter() - started
+    await asyncio.sleep(max(0.0, WINDOW - duration))
+    stop.set()
+    await load
+    return latencies, duration, result
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def run(items_count: int, ballast_mb: int) -> None:
+    path = prepare(items_count, ballast_mb)
+    size = os.path.getsize(path)
+
+    async def in_event_loop():
+        naive_backup(path)
+
+    async def incremental():
+        return await backup.create()
+
+    rows = []
+    for title, action in (
+        ("без копии", None),
+        ("копия в цикле событий", in_event_loop),
+        ("database.backup", incremental),
+    ):
+        latencies, duration, result = await phase(action)
+        rows.append((title, latencies, duration if action else None, result))
+    await engine.dispose()
+    backup.shutdown()
+
+    print(
+        f"Товаров: {items_count}, БД {size / 1024 / 1024:.0f} МБ, {RATE} запросов/с; "
+        f"шаг {BACKUP_PAGES} страниц, пауза {BACKUP_STEP_PAUSE * 1000:g} мс"
+    )
+    print(f"{'':24} {'запросов':>9} {'p50, мс':>8} {'p99, мс':>8} {'макс, мс':>9} {'копия, с':>9}")
+    for title, latencies, duration, _ in rows:
+        copy = f"{duration:9.1f}" if duration is not None else f"{'—':>9}"
+        print(
+            f"{title:<24} {len(latencies):9d} {percentile(latencies, 50):8.1f}"
+            f" {percentile(latencies, 99):8.1f} {max(latencies):9.1f} {copy}"
+        )
+    report = rows[-1][3]
+    print(
+        f"\nКопия {os.path.basename(report.path)}: {report.size / 1024 / 1024:.1f} МБ, "
+        f"{report.pages} страниц за {report.steps} шагов, перезапусков {report.restarts}"
+    )
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+        ))
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
@@ -0,0 +1,82 @@
+"""Цена маршрутизации callback_query от числа обработчиков.
+
+Сравниваются два способа на настоящем Router aiogram (propagate_event, как
+при апдейте от Dispatcher):
+
+* цепочка фильтров — каждый обработчик зарегистрирован со своим
+  F.data.startswith("<префикс>:"), как было в bot.handlers до bot.callbacks;
+* CallbackRouter — один хендлер и выборка из словаря по коду действия.
+
+Для цепочки меряется первый, средний и последний обработчик (aiogram
+проверяет фильтры по порядку регистрации), для таблицы — последний.
+
+    python -m benchmarks.bench_callbacks [число_вызовов]
+"""
+import asyncio
+import sys
+import time
+from enum import IntEnum
+
+from aiogram import F, Router
+from aiogram.types import CallbackQuery, User
+
+from bot.callbacks import CallbackRouter, pack
+
+HANDLER_COUNTS = (5, 25, 100, 400)
+CALLS = 1000
+
+
+async def handler(callback: CallbackQuery) -> None:
+    pass
+
+
+def query(data: str) -> CallbackQuery:
+    return CallbackQuery(
+        id="1",
+        from_user=User(id=1, is_bot=False, first_name="Admin"),
+        chat_instance="1",
+        data=data,
+    )
+
+
+def filter_chain(count: int) -> tuple[Router, list[str]]:
+    router = Router()
+    prefixes = [f"product_action_{i}:" for i in range(count)]
+    for prefix in prefixes:
+        router.callback_query.register(handler, F.data.startswith(prefix))
+    return router, [f"{prefix}145" for prefix in prefixes]
+
+
+def dispatch_table(count: int) -> tuple[Router, list[str]]:
+    actions = IntEnum("BenchAction", [f"ACTION_{i}" for i in range(count)])
+    callbacks = CallbackRouter()
+    for action in actions:
+        callbacks.register(action, handler)
+    router = Router()
+    callbacks.setup(router)
+    return router, [pack(action, 145) for action in actions]
+
+
+async def measure(router: Router, data: str, calls: int) -> float:
+    event = query(data)
+    started = time.perf_counter()
+    for _ in range(calls):
+        await router.propagate_event("callback_query", event)
+    return (time.perf_counter() - started) * 1e6 / calls
+
+
+async def run(calls: int) -> None:
+    print(f"Вызовов на замер: {calls}, мкс на callback_query")
+    print(f"{'обработчиков':>12} {'цепочка: первый':>16} {'средний':>9} {'последний':>10} {'таблица':>9}")
+    for count in HANDLER_COUNTS:
+        chain, chain_data = filter_chain(count)
+        table, table_data = dispatch_table(count)
+        first = await measure(chain, chain_data[0], calls)
+        middle = await measure(chain, chain_data[count // 2], calls)
+        last = await measure(chain, chain_data[-1], calls)
+        lookup = await measure(table, table_data[-1], calls)
+        print(f"{count:>12} {first:>16.1f} {middle:>9.1f} {last:>10.1f} {lookup:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else CALLS))
@@ -0,0 +1,124 @@
+"""Сжатие JSON каталога: CPU против байтов по кодировкам и уровням.
+
+Тело — ответ /get_items на засеянном каталоге (как его склеивает маршрут из
+payload витрины) и ответ одной категории. Для gzip 1/6/9 и brotli 1/4/9/11
+(если brotli установлен): размер, во сколько раз меньше, время сжатия и
+распаковки (её платит клиент) и время передачи на медленном мобильном канале.
+
+Внизу — цена сжатия на REQUESTS запросов одной версии каталога: на каждом
+запросе (CompressionMiddleware) против одного раза на версию
+(catalog.response_cache, EncodedBody.response на попадании).
+
+    python -m benchmarks.bench_compression [число_товаров]
+"""
+import asyncio
+import gzip
+import sys
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from benchmarks.bench_statements import seed
+from core import compression
+from core.compression import EncodedBody
+from core.serialization import json_array
+from database.db import Base
+from models.catalog import CatalogItem
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPEAT = 20
+REQUESTS = 1000
+# Канал для оценки передачи: медленный мобильный интернет, бит/с
+LINK_BPS = 4_000_000
+ACCEPT = "gzip, deflate, br"
+
+
+def codecs():
+    """(название, сжать, распаковать)."""
+    for level in (1, 6, 9):
+        yield f"gzip {level}", lambda body, level=level: gzip.compress(body, level, mtime=0), gzip.decompress
+    if brotli is None:
+        return
+    for quality in (1, 4, 9, 11):
+        yield (
+            f"brotli {quality}",
+            lambda body, quality=quality: brotli.compress(body, mode=brotli.MODE_TEXT, quality=quality),
+            brotli.decompress,
+        )
+
+
+def timed(func, arg, repeat: int) -> tuple[float, object]:
+    """(мс на вызов, результат)."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(arg)
+    return (time.perf_counter() - started) * 1000 / repeat, result
+
+
+def bodies(items_count: int) -> list[tuple[str, bytes]]:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, items_count)
+        payloads = session.scalars(select(CatalogItem.payload).order_by(CatalogItem.item_id)).all()
+        category = session.scalars(
+            select(CatalogItem.payload).where(CatalogItem.category_id == 1).order_by(CatalogItem.item_id)
+        ).all()
+    return [
+        (f"/get_items, {items_count} товаров", json_array(payloads)),
+        (f"/get_items?category_id=1, {len(category)} товаров", json_array(category)),
+    ]
+
+
+def report(title: str, body: bytes) -> None:
+    print(f"\n{title}: {len(body) / 1024:.0f} КБ, передача {len(body) * 8 / LINK_BPS * 1000:.0f} мс")
+    print(f"{'':12} {'КБ':>8} {'меньше в':>9} {'сжатие, мс':>11} {'распаковка, мс':>15} {'передача, мс':>13}")
+    for name, pack, unpack in codecs():
+        pack_ms, packed = timed(pack, body, REPEAT)
+        unpack_ms, _ = timed(unpack, packed, REPEAT)
+        print(
+            f"{name:<12} {len(packed) / 1024:8.1f} {len(body) / len(packed):9.1f}"
+            f" {pack_ms:11.2f} {unpack_ms:15.2f} {len(packed) * 8 / LINK_BPS * 1000:13.0f}"
+        )
+
+
+async def cached_responses(body: bytes) -> tuple[float, float]:
+    """(мс на первый ответ — сжатие в пуле потоков, мс на REQUESTS ответов с попаданием)."""
+    entry = EncodedBody(body)
+    started = time.perf_counter()
+    await entry.response(ACCEPT)  # промах: сжатие уровнями COMPRESS_CACHED_*
+    first_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        await entry.response(ACCEPT)
+    return first_ms, (time.perf_counter() - started) * 1000
+
+
+def per_version(body: bytes) -> None:
+    """CPU на REQUESTS запросов одной версии: сжатие на каждом против одного на версию."""
+    fast_ms, _ = timed(lambda b: gzip.compress(b, 6, mtime=0), body, REPEAT)
+    first_ms, hit_ms = asyncio.run(cached_responses(body))
+    print(f"\nCPU на {REQUESTS} запросов одной версии каталога:")
+    print(f"  сжатие на каждом запросе (gzip 6)     {fast_ms * REQUESTS:10.1f} мс")
+    print(f"  один раз на версию + попадания кэша   {first_ms + hit_ms:10.1f} мс"
+          f" (сжатие {first_ms:.1f} мс, ответ с попаданием {hit_ms / REQUESTS * 1000:.1f} мкс)")
+
+
+def run(items_count: int) -> None:
+    print(f"Повторов на замер: {REPEAT}; brotli: {'есть' if brotli else 'не установлен'}")
+    catalog = bodies(items_count)
+    for title, body in catalog:
+        report(title, body)
+    per_version(catalog[0][1])
+
+
+if __name__ == "__main__":
+    try:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
+    finally:
+        compression.shutdown()
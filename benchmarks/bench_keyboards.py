@@ -0,0 +1,91 @@
+"""Память и время на клавиатуры бота: сборка на каждый апдейт против кэша.
+
+«До» — исходные функции без кэша (__wrapped__ у functools.cache) и кнопки,
+создаваемые заново (вместо _button подставляется его __wrapped__). «После» —
+функции как есть: постоянные клавиатуры отдаются готовыми, в списке товаров
+с переключаемой отметкой создаётся только кнопка изменившейся строки.
+Память — tracemalloc: сколько байт на вызов занимают 100 удерживаемых
+результатов (у кэшированной клавиатуры — только ссылка на общий объект).
+
+    python -m benchmarks.bench_keyboards [число_товаров]
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from bot.keyboards import inline, reply
+
+CALLS = 2000
+
+STATIC = (
+    ("reply: главное меню админа", reply.get_admin_main_keyboard),
+    ("reply: управление товарами", reply.get_manage_products_keyboard),
+    ("inline: что изменить у товара", inline.inline_edit_product_fields_keyboard),
+    ("inline: отмена", inline.inline_edit_cancel_keyboard),
+)
+
+
+@contextmanager
+def uncached_buttons():
+    cached_inline, cached_reply = inline._button, reply._button
+    inline._button, reply._button = cached_inline.__wrapped__, cached_reply.__wrapped__
+    try:
+        yield
+    finally:
+        inline._button, reply._button = cached_inline, cached_reply
+
+
+def measure(call, calls: int) -> tuple[float, float]:
+    """(мкс на вызов, байт памяти на вызов)."""
+    call()  # прогрев кэшей
+    started = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = (time.perf_counter() - started) * 1e6 / calls
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    results = [call(i) for i in range(100)]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return elapsed, (peak - before) / 100
+
+
+def report(title: str, before: tuple[float, float], after: tuple[float, float]) -> None:
+    print(
+        f"{title:<34} {before[0]:8.1f} → {after[0]:6.1f} мкс"
+        f"   {before[1]:9.0f} → {after[1]:7.0f} Б/вызов"
+    )
+
+
+def run(items_count: int, calls: int) -> None:
+    print(f"Вызовов на замер: {calls}; в списке товаров: {items_count}")
+    for title, fn in STATIC:
+        with uncached_buttons():
+            before = measure(lambda i=0: fn.__wrapped__(), calls)
+        after = measure(lambda i=0: fn(), calls)
+        report(title, before, after)
+
+    items = [(item_id, f"Товар {item_id}") for item_id in range(1, items_count + 1)]
+
+    def toggling(i: int = 0):
+        # Каждый вызов — следующий апдейт: отмечен один товар, остальные строки те же
+        return inline.inline_bulk_products_keyboard(items, {i % items_count + 1})
+
+    with uncached_buttons():
+        before = measure(toggling, calls)
+    after = measure(toggling, calls)
+    report("inline: массовый выбор (отметка)", before, after)
+
+    flavors = [SimpleNamespace(id=i, name=f"Вкус {i}") for i in range(1, 31)]
+    with uncached_buttons():
+        before = measure(lambda i=0: inline.inline_flavors_keyboard_edit(flavors, 1), calls)
+    after = measure(lambda i=0: inline.inline_flavors_keyboard_edit(flavors, 1), calls)
+    report("inline: вкусы товара (30)", before, after)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50, CALLS)
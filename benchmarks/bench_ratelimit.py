@@ -0,0 +1,92 @@
+"""Цена решения лимитера (core.ratelimit) на запрос.
+
+Сравнивается голое ASGI-приложение и оно же за RateLimitMiddleware: по IP и
+по initData Telegram (HMAC считается один раз на строку, дальше — кэш), при
+заданном числе активных клиентов. Плюс сам RateLimiter.hit без ASGI.
+
+    python -m benchmarks.bench_ratelimit [число_клиентов]
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import sys
+import time
+from urllib.parse import urlencode
+
+from core.ratelimit import Limit, RateLimiter, RateLimitMiddleware
+
+BOT_TOKEN = "123456:bench"
+REQUESTS = 200_000
+
+
+def init_data(user_id: int) -> bytes:
+    fields = {"auth_date": str(int(time.time())), "user": json.dumps({"id": user_id})}
+    check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields).encode()
+
+
+async def app(scope, receive, send) -> None:
+    pass
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message) -> None:
+    pass
+
+
+def scopes(clients: int, telegram: bool) -> list[dict]:
+    result = []
+    for i in range(clients):
+        headers = [(b"host", b"shop"), (b"accept", b"*/*")]
+        if telegram:
+            headers.append((b"x-telegram-init-data", init_data(i)))
+        result.append({
+            "type": "http",
+            "method": "GET",
+            "path": "/get_items",
+            "headers": headers,
+            "client": (f"10.0.{i // 256 % 256}.{i % 256}", 40000),
+        })
+    return result
+
+
+async def measure(handler, requests: list[dict]) -> float:
+    started = time.perf_counter()
+    for scope in requests:
+        await handler(scope, receive, send)
+    return (time.perf_counter() - started) * 1e9 / len(requests)
+
+
+def limiter() -> RateLimiter:
+    # Лимит с запасом: меряется решение, а не отказы
+    return RateLimiter({"read": Limit(1e9, 10**9)})
+
+
+async def run(clients: int) -> None:
+    print(f"Активных клиентов: {clients}, запросов: {REQUESTS}")
+    for title, telegram in (("по IP", False), ("по initData Telegram", True)):
+        pool = scopes(clients, telegram)
+        requests = [pool[i % clients] for i in range(REQUESTS)]
+        bare = await measure(app, requests)
+        middleware = RateLimitMiddleware(app, limiter(), bot_token=BOT_TOKEN)
+        await measure(middleware, requests[:clients])  # прогрев кэша initData
+        limited = await measure(middleware, requests)
+        print(f"{title:<24} без лимитера {bare:7.0f} нс, с лимитером {limited:7.0f} нс/запрос")
+
+    bare_limiter = limiter()
+    keys = [f"read:10.0.0.{i}" for i in range(clients)]
+    started = time.perf_counter()
+    for i in range(REQUESTS):
+        bare_limiter.hit(keys[i % clients], "read")
+    per_hit = (time.perf_counter() - started) * 1e9 / REQUESTS
+    print(f"{'RateLimiter.hit':<24} {per_hit:7.0f} нс/вызов, ведер в памяти {len(bare_limiter)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,78 @@
+"""Список товаров для чтения: ORM-объекты против строк catalog.rows.
+
+«До» — как ItemService.get_items строил список раньше: select(Item) с
+selectinload вкусов и категории, экземпляры с InstanceState в identity map.
+«После» — catalog.rows.items: NamedTuple из строк, вкусы — отдельным запросом
+со сгруппированными парами, общие объекты вкусов и категорий.
+
+Время — весь вызов на SQLite в памяти (синхронная сессия, новая на каждый
+вызов). Память — tracemalloc: сколько байт на товар занимает удерживаемый
+результат, пока сессия открыта (у ORM-объектов — вместе с состоянием в сессии).
+
+    python -m benchmarks.bench_rows [число_товаров]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, selectinload
+
+from benchmarks.bench_statements import seed
+from catalog import rows
+from database.db import Base
+from models.items import Item
+
+REPEAT = 5
+
+
+def orm_items(session: Session) -> list[Item]:
+    result = session.execute(
+        select(Item)
+        .options(selectinload(Item.flavors), selectinload(Item.category))
+        .order_by(Item.id)
+    )
+    return list(result.scalars().unique().all())
+
+
+def measure(engine, load, items_count: int) -> tuple[float, float]:
+    """(мс на вызов, байт на товар)."""
+    with Session(engine) as session:
+        load(session)  # прогрев кэша скомпилированных запросов
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        with Session(engine) as session:
+            load(session)
+    elapsed = (time.perf_counter() - started) * 1000 / REPEAT
+
+    gc.collect()
+    with Session(engine) as session:
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        result = load(session)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(result) == items_count
+        del result
+    return elapsed, (after - before) / items_count
+
+
+def run(items_count: int) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, items_count)
+
+    print(f"Товаров: {items_count} (по 3 вкуса), повторов: {REPEAT}")
+    before = measure(engine, orm_items, items_count)
+    after = measure(engine, rows.items, items_count)
+    print(f"{'':16} {'мс на список':>14} {'байт на товар':>15}")
+    print(f"{'ORM (selectin)':<16} {before[0]:14.1f} {before[1]:15.0f}")
+    print(f"{'catalog.rows':<16} {after[0]:14.1f} {after[1]:15.0f}")
+    print(f"Быстрее в {before[0] / after[0]:.1f} раза, памяти меньше в {before[1] / after[1]:.1f} раза")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,92 @@
+"""Стоимость сериализации одного товара для /get_items: до и после.
+
+До: FastAPI отдаёт ORM-объекты Item (с категорией и вкусами) через
+jsonable_encoder + json.dumps — рефлексивный обход каждого экземпляра.
+После: тело ответа склеивается из готовых JSON-фрагментов витрины
+(catalog_items), а сами фрагменты строятся из кортежей строк быстрым
+энкодером (core.serialization.dumps) только при записи.
+
+    python -m benchmarks.bench_serialization [число_товаров]
+"""
+import json
+import sys
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.serialization import dumps, json_array, orjson
+from models.catalog import CatalogItem  # noqa: F401 — регистрация всех моделей
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item
+
+
+def build_orm_items(count: int) -> list[Item]:
+    categories = [Category(id=i, name=f"Категория {i}", photo=f"c{i}.jpg") for i in range(10)]
+    flavors = [Flavor(id=i, name=f"Вкус {i}", photo=f"f{i}.jpg") for i in range(30)]
+    items = []
+    for i in range(count):
+        category = categories[i % len(categories)]
+        item = Item(
+            id=i,
+            name=f"Товар {i}",
+            description="Описание товара " * 4,
+            price=100.0 + i,
+            discount=None,
+            photo=f"{i}.jpg",
+            category_id=category.id,
+        )
+        # Как после selectinload: связи загружены, обратные коллекции — нет
+        set_committed_value(item, "category", category)
+        set_committed_value(item, "flavors", [flavors[(i + k) % len(flavors)] for k in range(3)])
+        items.append(item)
+    return items
+
+
+def build_rows(items: list[Item]) -> list[tuple]:
+    return [
+        (i.id, i.name, i.description, i.price, i.discount, i.photo, i.category_id,
+         i.category.name, i.category.photo, [(f.id, f.name, f.photo) for f in i.flavors])
+        for i in items
+    ]
+
+
+def row_payload(row: tuple) -> bytes:
+    (item_id, name, description, price, discount, photo,
+     category_id, category_name, category_photo, flavors) = row
+    return dumps({
+        "id": item_id,
+        "name": name,
+        "description": description,
+        "price": price,
+        "discount": discount,
+        "photo": photo,
+        "category_id": category_id,
+        "category": {"id": category_id, "name": category_name, "photo": category_photo},
+        "flavors": [{"id": f[0], "name": f[1], "photo": f[2]} for f in flavors],
+    })
+
+
+def main(count: int = 2000) -> None:
+    items = build_orm_items(count)
+    rows = build_rows(items)
+    payloads = [row_payload(row) for row in rows]
+    repeat = 5
+
+    cases = {
+        "ORM + jsonable_encoder + json.dumps (до)":
+            lambda: json.dumps(jsonable_encoder(items)).encode(),
+        "кортежи строк → dumps (запись в витрину)":
+            lambda: [row_payload(row) for row in rows],
+        "склейка готовых фрагментов (чтение /get_items)":
+            lambda: json_array(payloads),
+    }
+    print(f"Товаров: {count}, энкодер: {'orjson' if orjson else 'json'}")
+    for title, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{title:<50} {best * 1e6 / count:8.2f} мкс/товар")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
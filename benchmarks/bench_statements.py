@@ -0,0 +1,199 @@
+"""Накладные расходы Python на запрос: select(...) на каждый вызов против готовых запросов.
+
+«До» — запросы, как они строились в сервисах и роутах: новый select с
+options() / where() на каждый вызов. «После» — database.statements (готовый
+объект с bindparam, ключ кэша запомнен) и кэш вариантов запроса /get_items по
+набору фильтров (catalog.read_model). Для сравнения — те же фильтры через
+lambda_stmt. Пути:
+
+* бот, редактирование товара — ItemService.get_item (товар + вкусы + категория);
+* бот, выбор вкусов — вкусы по списку id;
+* /get_items — без фильтров, по категории, по категории с ценой и сортировкой.
+
+Первый столбец — только построение запроса и его ключа кэша (то, что
+SQLAlchemy делает до поиска скомпилированного SQL), второй — весь вызов на
+SQLite в памяти (синхронная сессия, чтобы не мерить переключения потоков
+aiosqlite). В конце — доля попаданий в кэш скомпилированного SQL.
+
+    python -m benchmarks.bench_statements [число_товаров]
+"""
+import sys
+import time
+
+from sqlalchemy import create_engine, insert, lambda_stmt, select
+from sqlalchemy.orm import Session, selectinload
+
+from catalog import read_model
+from catalog.read_model import SORT_ID, SORT_PRICE_DESC
+from database import statements
+from database.db import Base
+from database.schema import ensure_schema  # noqa: F401 — регистрация всех моделей
+from models.catalog import CatalogItem
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item, item_flavor_association
+
+CALLS = 2000
+CATEGORIES = 10
+FLAVORS = 30
+
+
+def seed(session: Session, items_count: int) -> None:
+    session.execute(insert(Category), [
+        {"id": i, "name": f"Категория {i}", "photo": f"c{i}.jpg"} for i in range(1, CATEGORIES + 1)
+    ])
+    session.execute(insert(Flavor), [
+        {"id": i, "name": f"Вкус {i}", "photo": f"f{i}.jpg"} for i in range(1, FLAVORS + 1)
+    ])
+    session.execute(insert(Item), [
+        {
+            "id": i, "name": f"Товар {i}", "description": "Описание", "price": 100.0 + i % 50,
+            "discount": None, "photo": f"{i}.jpg", "category_id": i % CATEGORIES + 1,
+        }
+        for i in range(1, items_count + 1)
+    ])
+    session.execute(insert(item_flavor_association), [
+        {"item_id": i, "flavor_id": (i + k) % FLAVORS + 1}
+        for i in range(1, items_count + 1) for k in range(3)
+    ])
+    read_model.rebuild_all(session)
+    session.commit()
+
+
+# --- «До»: запросы в том виде, в каком они строились на каждый вызов ---
+
+def old_item_by_id(item_id: int):
+    return (
+        select(Item)
+        .where(Item.id == item_id)
+        .options(selectinload(Item.flavors), selectinload(Item.category))
+    )
+
+
+def old_flavors_by_ids(ids: list[int]):
+    return select(Flavor).where(Flavor.id.in_(ids)).order_by(Flavor.name)
+
+
+def old_payloads(category_id, min_price, max_price, sort):
+    query = select(CatalogItem.payload)
+    if category_id is not None:
+        query = query.where(CatalogItem.category_id == category_id)
+    if min_price is not None:
+        query = query.where(CatalogItem.effective_price >= min_price)
+    if max_price is not None:
+        query = query.where(CatalogItem.effective_price <= max_price)
+    if sort == SORT_PRICE_DESC:
+        return query.order_by(CatalogItem.effective_price.desc(), CatalogItem.item_id.desc())
+    return query.order_by(CatalogItem.item_id)
+
+
+def lambda_payloads(category_id, min_price, max_price, sort):
+    query = lambda_stmt(lambda: select(CatalogItem.payload))
+    if category_id is not None:
+        query += lambda s: s.where(CatalogItem.category_id == category_id)
+    if min_price is not None:
+        query += lambda s: s.where(CatalogItem.effective_price >= min_price)
+    if max_price is not None:
+        query += lambda s: s.where(CatalogItem.effective_price <= max_price)
+    if sort == SORT_PRICE_DESC:
+        query += lambda s: s.order_by(CatalogItem.effective_price.desc(), CatalogItem.item_id.desc())
+    else:
+        query += lambda s: s.order_by(CatalogItem.item_id)
+    return query
+
+
+def new_payloads(category_id, min_price, max_price, sort):
+    params = {"category_id": category_id, "min_price": min_price, "max_price": max_price}
+    query = read_model._payloads_query(
+        category_id is not None, min_price is not None, max_price is not None, sort
+    )
+    return query, params
+
+
+def cases(items_count: int):
+    """(название, до: i → (запрос, параметры), после: i → (запрос, параметры), чтение результата)."""
+    item_id = lambda i: i % items_count + 1
+    flavor_ids = lambda i: [i % FLAVORS + 1, (i + 7) % FLAVORS + 1, (i + 13) % FLAVORS + 1]
+    category = lambda i: i % CATEGORIES + 1
+    one = lambda result: result.scalar_one_or_none()
+    scalars = lambda result: result.scalars().all()
+    yield from (
+        (
+            "бот: товар по id (+вкусы, категория)",
+            lambda i: (old_item_by_id(item_id(i)), None),
+            lambda i: (statements.ITEM_BY_ID, {"item_id": item_id(i)}),
+            one,
+        ),
+        (
+            "бот: вкусы по списку id",
+            lambda i: (old_flavors_by_ids(flavor_ids(i)), None),
+            lambda i: (statements.FLAVORS_BY_IDS, {"ids": flavor_ids(i)}),
+            scalars,
+        ),
+    )
+    get_items = (
+        ("все", lambda i: (None, None, None, SORT_ID)),
+        ("категория", lambda i: (category(i), None, None, SORT_ID)),
+        ("категория+цена+сорт.", lambda i: (category(i), 110.0, 130.0, SORT_PRICE_DESC)),
+    )
+    for title, args in get_items:
+        yield (
+            f"/get_items: {title}",
+            lambda i, args=args: (old_payloads(*args(i)), None),
+            lambda i, args=args: new_payloads(*args(i)),
+            scalars,
+        )
+        yield (
+            "  то же через lambda_stmt",
+            lambda i, args=args: (old_payloads(*args(i)), None),
+            lambda i, args=args: (lambda_payloads(*args(i)), None),
+            scalars,
+        )
+
+
+def build_cost(make, calls: int) -> float:
+    """Мкс на построение запроса и его ключа кэша."""
+    started = time.perf_counter()
+    for i in range(calls):
+        stmt, _ = make(i)
+        stmt._generate_cache_key()
+    return (time.perf_counter() - started) * 1e6 / calls
+
+
+def call_cost(engine, make, fetch, calls: int) -> float:
+    """Мкс на весь вызов: новая сессия (как на апдейт/запрос), выполнение, чтение."""
+    started = time.perf_counter()
+    for i in range(calls):
+        with Session(engine) as session:
+            stmt, params = make(i)
+            fetch(session.execute(stmt, params))
+    return (time.perf_counter() - started) * 1e6 / calls
+
+
+def run(items_count: int, calls: int) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, items_count)
+    statements.stats.attach(engine)
+
+    print(f"Товаров: {items_count}; вызовов на замер: {calls}")
+    print(f"{'':36} {'построение, мкс':>20}   {'вызов целиком, мкс':>22}")
+    for title, before, after, fetch in cases(items_count):
+        # Прогрев: SQL обоих вариантов уже скомпилирован и лежит в кэше
+        call_cost(engine, before, fetch, 10)
+        call_cost(engine, after, fetch, 10)
+        build = build_cost(before, calls), build_cost(after, calls)
+        call = call_cost(engine, before, fetch, calls), call_cost(engine, after, fetch, calls)
+        print(f"{title:<36} {build[0]:8.1f} → {build[1]:6.1f}   {call[0]:10.1f} → {call[1]:8.1f}")
+
+    stats = statements.stats
+    print(
+        f"Кэш SQL: попаданий {stats.hit_rate:.1%} ({stats.hits} из {stats.hits + stats.misses}),"
+        f" без кэша {stats.uncached}"
+    )
+    statements.stats.detach()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, CALLS)
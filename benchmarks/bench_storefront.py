@@ -0,0 +1,225 @@
+"""Открытие витрины (index.html) в headless Chromium на засеянном каталоге.
+
+Поднимается настоящий сервер (uvicorn main:app) во временном каталоге: своя
+SQLite, uploads с картинками 800×800 у каждого товара, вкуса и категории. Страница
+открывается как в Telegram на телефоне (390×844, DPR 3), затем прокручивается до
+конца каталога. Для каждого варианта страницы:
+
+* время до первой карточки и до загрузки картинок первого экрана;
+* число элементов DOM после открытия;
+* сколько картинок запрошено при открытии и сколько байт они весят;
+* суммарная длительность long tasks (> 50 мс) при открытии и при прокрутке.
+
+Второй аргумент — старая версия страницы для сравнения, например:
+
+    git show HEAD~1:index.html > /tmp/index_old.html
+
+Нужен Playwright: pip install playwright && playwright install chromium.
+
+    python -m benchmarks.bench_storefront [число_товаров] [старый_index.html]
+"""
+import asyncio
+import io
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+
+from benchmarks.bench_statements import seed
+from catalog import read_model
+from database.db import Base
+from database.schema import ensure_schema  # noqa: F401 — регистрация всех моделей
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+ROOT = Path(__file__).resolve().parent.parent
+PHOTO_SIDE = 800
+VIEWPORT = {"width": 390, "height": 844}
+SCROLL_STEP = 600
+# Долгие задачи главного потока (PerformanceObserver longtask) копятся с самого начала
+LONG_TASKS_SCRIPT = """
+window.__longTasks = [];
+new PerformanceObserver(list => {
+    for (const entry of list.getEntries()) window.__longTasks.push(entry.duration);
+}).observe({ type: 'longtask', buffered: true });
+"""
+
+
+def photo_bytes() -> bytes:
+    """JPEG (с Pillow) или PNG без сжатия — картинка заметного размера."""
+    try:
+        from PIL import Image
+    except ImportError:
+        import struct
+        import zlib
+
+        row = b"\x00" + bytes(range(256)) * (PHOTO_SIDE * 3 // 256) + bytes(PHOTO_SIDE * 3 % 256)
+        raw = row * PHOTO_SIDE
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        header = struct.pack(">IIBBBBB", PHOTO_SIDE, PHOTO_SIDE, 8, 2, 0, 0, 0)
+        return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+    image = Image.radial_gradient("L").resize((PHOTO_SIDE, PHOTO_SIDE)).convert("RGB")
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+def prepare(workdir: str, items_count: int) -> None:
+    """База и uploads: у всех записей фото — жёсткие ссылки на одну картинку."""
+    engine = create_engine(f"sqlite:///{workdir}/bench.db")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, items_count)
+        for model in (Item, Flavor, Category):
+            session.execute(update(model).values(photo_width=PHOTO_SIDE, photo_height=PHOTO_SIDE))
+        read_model.rebuild_all(session)
+        session.commit()
+        photos = {
+            photo
+            for model in (Item, Flavor, Category)
+            for photo in session.scalars(select(model.photo))
+        }
+    engine.dispose()
+
+    uploads = os.path.join(workdir, "uploads")
+    os.makedirs(uploads, exist_ok=True)
+    original = os.path.join(workdir, "photo")
+    Path(original).write_bytes(photo_bytes())
+    for photo in photos:
+        os.link(original, os.path.join(uploads, photo))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir: str, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/bench.db",
+        "TELEGRAM_BOT_TOKEN": "",
+        "RATE_LIMIT_ENABLED": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/get_categories", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Сервер не запустился за 60 секунд")
+
+
+async def measure(browser, url: str, html: str | None) -> dict:
+    context = await browser.new_context(viewport=VIEWPORT, device_scale_factor=3, is_mobile=True)
+    page = await context.new_page()
+    await page.add_init_script(LONG_TASKS_SCRIPT)
+    if html is not None:
+        await page.route(url, lambda route: route.fulfill(body=html, content_type="text/html"))
+    images = {}
+
+    async def on_response(response) -> None:
+        if response.request.resource_type == "image" and response.url.startswith(url):
+            images[response.url] = len(await response.body())
+
+    page.on("response", lambda response: asyncio.ensure_future(on_response(response)))
+
+    started = time.perf_counter()
+    await page.goto(url)
+    await page.wait_for_selector("#catalog-grid .item-card")
+    first_card_ms = (time.perf_counter() - started) * 1000
+    # Картинки первого экрана: все <img> в видимой области загружены
+    await page.wait_for_function("""() => [...document.querySelectorAll('#catalog-grid img')]
+        .filter(img => img.getBoundingClientRect().top < innerHeight)
+        .every(img => img.complete)""")
+    above_fold_ms = (time.perf_counter() - started) * 1000
+    await page.wait_for_timeout(500)
+    opened = {
+        "dom": await page.evaluate("document.getElementsByTagName('*').length"),
+        "images": len(images),
+        "image_kb": sum(images.values()) / 1024,
+        "long_ms": await page.evaluate("window.__longTasks.reduce((a, b) => a + b, 0)"),
+    }
+
+    await page.evaluate("window.__longTasks = []")
+    height = await page.evaluate("document.body.scrollHeight")
+    for _ in range(0, height, SCROLL_STEP):
+        await page.mouse.wheel(0, SCROLL_STEP)
+        await page.wait_for_timeout(16)
+    scroll_long_ms = await page.evaluate("window.__longTasks.reduce((a, b) => a + b, 0)")
+    await context.close()
+    return {
+        "first_card_ms": first_card_ms,
+        "above_fold_ms": above_fold_ms,
+        **opened,
+        "scroll_long_ms": scroll_long_ms,
+        "scroll_images": len(images),
+    }
+
+
+ROWS = (
+    ("до первой карточки, мс", "first_card_ms", "{:.0f}"),
+    ("до картинок 1-го экрана, мс", "above_fold_ms", "{:.0f}"),
+    ("элементов DOM", "dom", "{:d}"),
+    ("картинок при открытии", "images", "{:d}"),
+    ("их вес, КБ", "image_kb", "{:.0f}"),
+    ("long tasks при открытии, мс", "long_ms", "{:.0f}"),
+    ("long tasks при прокрутке, мс", "scroll_long_ms", "{:.0f}"),
+    ("картинок после прокрутки", "scroll_images", "{:d}"),
+)
+
+
+async def run(items_count: int, old_html: str | None) -> None:
+    if async_playwright is None:
+        sys.exit("Нужен Playwright: pip install playwright && playwright install chromium")
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare(workdir, items_count)
+        port = free_port()
+        server = start_server(workdir, port)
+        url = f"http://127.0.0.1:{port}/"
+        try:
+            async with async_playwright() as playwright:
+                browser = await playwright.chromium.launch()
+                variants = [("текущая", None)]
+                if old_html is not None:
+                    variants.insert(0, ("старая", old_html))
+                results = [(title, await measure(browser, url, html)) for title, html in variants]
+                await browser.close()
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"Товаров: {items_count}, фото {PHOTO_SIDE}×{PHOTO_SIDE}, экран {VIEWPORT['width']}×{VIEWPORT['height']} @3x")
+    print(f"{'':30}" + "".join(f"{title:>12}" for title, _ in results))
+    for label, key, fmt in ROWS:
+        print(f"{label:<30}" + "".join(f"{fmt.format(result[key]):>12}" for _, result in results))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    old = Path(sys.argv[2]).read_text(encoding="utf-8") if len(sys.argv) > 2 else None
+    asyncio.run(run(count, old))
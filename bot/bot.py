@@ -21,7 +21,11 @@ from aiogram.fsm.storage.memory import MemoryStorage
 
 from bot.config import BotConfig
 from bot.handlers import setup_handlers
+from bot.handlers.jobs import make_job_notifier
 from bot.middlewares.db import DbSessionMiddleware
+from bot.middlewares.role import RoleMiddleware
+from bot.roles import RoleResolver
+from jobs.queue import queue as job_queue
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +34,15 @@ def create_bot_and_dispatcher(config: BotConfig) -> tuple[Bot, Dispatcher]:
     """Создаёт экземпляры Bot и Dispatcher с подключёнными middleware и хендлерами."""
     bot = Bot(token=config.token)
     dp = Dispatcher(storage=MemoryStorage())
+    # Роль — один раз на апдейт, до выбора роутера (bot.handlers.setup_handlers)
+    dp.update.outer_middleware(RoleMiddleware(RoleResolver(config)))
     dp.message.middleware(DbSessionMiddleware())
     dp.callback_query.middleware(DbSessionMiddleware())
     router = Router()
     setup_handlers(router, config)
     dp.include_router(router)
+    # Статусы фоновых задач правятся в чате, откуда их поставили
+    job_queue.set_notifier(make_job_notifier(bot))
     return bot, dp
 
 
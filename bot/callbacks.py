@@ -0,0 +1,169 @@
+"""Callback data inline-кнопок: числовой код действия и необязательный аргумент.
+
+Формат — "<код>" или "<код>:<аргумент>" (оба — целые), например "26:145":
+даже с 64-битным id это около 25 байт при лимите Telegram в 64. Коды
+действий — Action; поля, которые выбирают кнопки «Что изменить?», —
+ProductField / CategoryField в аргументе.
+
+Маршрутизация — CallbackRouter: в aiogram регистрируется один хендлер на
+все callback_query, обработчик действия находится одной выборкой из словаря
+по коду, а не проверкой цепочки фильтров F.data.startswith(...) — и порядок
+регистрации префиксов («category_delete:» / «category_delete_confirm:») больше
+не важен.
+"""
+import inspect
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import SkipHandler
+from aiogram.fsm.state import State
+from aiogram.types import CallbackQuery
+
+# Лимит Telegram на callback_data, байт
+CALLBACK_DATA_MAX = 64
+
+
+class Action(IntEnum):
+    # Товары: удаление (несколько сразу) и редактирование
+    PRODUCT_DELETE_TOGGLE = 1  # аргумент — id товара
+    PRODUCT_DELETE_SELECTED = 2
+    PRODUCT_DELETE_CONFIRM = 3
+    PRODUCT_DELETE_CANCEL = 4
+    PRODUCT_EDIT = 5  # id товара
+    PRODUCT_EDIT_CANCEL = 6
+    PRODUCT_EDIT_FIELD = 7  # ProductField
+    PRODUCT_SELECT_CATEGORY = 8  # id категории
+    # Массовое редактирование
+    PRODUCT_BULK_START = 10
+    PRODUCT_BULK_TOGGLE = 11  # id товара
+    PRODUCT_BULK_MOVE = 12
+    PRODUCT_BULK_DISCOUNT = 13
+    # Вкусы
+    FLAVOR_EDIT_NAME = 20  # id вкуса
+    FLAVOR_EDIT_PHOTO = 21  # id вкуса
+    FLAVOR_EDIT_BACK = 22
+    ADD_FLAVOR_SELECT = 23  # id вкуса
+    ADD_FLAVOR_NEW = 24
+    ADD_FLAVOR_DONE = 25
+    PRODUCT_EDIT_FLAVOR = 26  # id вкуса
+    EDIT_FLAVOR_ADD = 27  # id товара
+    PRODUCT_EDIT_FLAVORS_BACK = 28
+    # Категории
+    CATEGORY_DELETE = 40  # id категории
+    CATEGORY_DELETE_CONFIRM = 41  # id категории
+    CATEGORY_DELETE_CANCEL = 42
+    CATEGORY_EDIT = 43  # id категории
+    CATEGORY_EDIT_CANCEL = 44
+    CATEGORY_EDIT_FIELD = 45  # CategoryField
+
+
+class ProductField(IntEnum):
+    NAME = 1
+    DESCRIPTION = 2
+    IMAGE = 3
+    FLAVORS = 4
+    CATEGORY = 5
+
+
+class CategoryField(IntEnum):
+    NAME = 1
+    IMAGE = 2
+
+
+class CallbackPayload(NamedTuple):
+    action: Action
+    arg: int | None = None
+
+
+def pack(action: Action, arg: int | None = None) -> str:
+    """callback_data для кнопки."""
+    data = f"{action.value}" if arg is None else f"{action.value}:{int(arg)}"
+    if len(data) > CALLBACK_DATA_MAX:
+        raise ValueError(f"callback_data длиннее {CALLBACK_DATA_MAX} байт: {data}")
+    return data
+
+
+# Коды по значению — разбор без исключения ValueError из Action(...)
+_ACTIONS: dict[str, Action] = {str(action.value): action for action in Action}
+
+
+def unpack(data: str | None) -> CallbackPayload | None:
+    """Разобрать callback_data; None — не наш формат (чужая или устаревшая кнопка)."""
+    if not data:
+        return None
+    code, _, raw_arg = data.partition(":")
+    action = _ACTIONS.get(code)
+    if action is None:
+        return None
+    if not raw_arg:
+        return CallbackPayload(action)
+    try:
+        return CallbackPayload(action, int(raw_arg))
+    except ValueError:
+        return None
+
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class _Route:
+    action: Action
+    handler: Handler
+    state: State | None
+    # Имена аргументов обработчика — передаются только они (как делает aiogram)
+    params: frozenset[str]
+    takes_all: bool
+
+
+class CallbackRouter:
+    """Таблица «код действия → обработчик» за одним хендлером aiogram.
+
+    Обработчики — обычные хендлеры callback_query: первым аргументом получают
+    CallbackQuery, остальные (state, session, …) — по именам из данных
+    middleware; payload — разобранный CallbackPayload. Если у маршрута задан
+    state, обработчик вызывается только в этом состоянии FSM; иначе апдейт
+    уходит дальше по цепочке aiogram (SkipHandler).
+    """
+
+    def __init__(self) -> None:
+        # Ключ — код действия строкой, как в callback_data: разбор без Action(...)
+        self._routes: dict[str, _Route] = {}
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def register(self, action: Action, handler: Handler, state: State | None = None) -> None:
+        code = str(action.value)
+        if code in self._routes:
+            raise ValueError(f"Для {action!r} уже зарегистрирован обработчик")
+        parameters = list(inspect.signature(handler).parameters.values())[1:]
+        self._routes[code] = _Route(
+            action=action,
+            handler=handler,
+            state=state,
+            params=frozenset(p.name for p in parameters if p.kind is not p.VAR_KEYWORD),
+            takes_all=any(p.kind is p.VAR_KEYWORD for p in parameters),
+        )
+
+    async def dispatch(self, callback: CallbackQuery, **data: Any) -> Any:
+        code, _, raw_arg = (callback.data or "").partition(":")
+        route = self._routes.get(code)
+        if route is None:
+            raise SkipHandler()
+        try:
+            payload = CallbackPayload(route.action, int(raw_arg) if raw_arg else None)
+        except ValueError:
+            raise SkipHandler()
+        if route.state is not None and await data["state"].get_state() != route.state.state:
+            raise SkipHandler()
+        data["payload"] = payload
+        if route.takes_all:
+            return await route.handler(callback, **data)
+        return await route.handler(callback, **{name: data[name] for name in route.params if name in data})
+
+    def setup(self, router: Router, *filters: Any) -> None:
+        """Зарегистрировать таблицу в router одним хендлером callback_query (с общими фильтрами)."""
+        router.callback_query.register(self.dispatch, *filters)
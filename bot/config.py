@@ -8,16 +8,24 @@ class BotConfig:
     """Настройки бота из переменных окружения."""
 
     token: str
-    admin_ids: tuple[int, ...] = ()
-    courier_ids: tuple[int, ...] = ()
+    admin_ids: frozenset[int] = frozenset()
+    courier_ids: frozenset[int] = frozenset()
     webapp_url: str = ""  # URL Mini App (index.html), для кнопки «Открыть магазин»
+    staff_cache_ttl: float = 60.0  # сколько секунд кэшируется таблица staff (bot.roles)
 
     @classmethod
     def from_env(cls) -> "BotConfig":
         token = os.getenv("TELEGRAM_BOT_TOKEN") or os.getenv("TOKEN", "")
         admin_str = os.getenv("TELEGRAM_ADMIN_IDS", "")
-        admin_ids = tuple(int(x.strip()) for x in admin_str.split(",") if x.strip())
+        admin_ids = frozenset(int(x.strip()) for x in admin_str.split(",") if x.strip())
         courier_str = os.getenv("TELEGRAM_COURIERS_IDS", "")
-        courier_ids = tuple(int(x.strip()) for x in courier_str.split(",") if x.strip())
+        courier_ids = frozenset(int(x.strip()) for x in courier_str.split(",") if x.strip())
         webapp_url = (os.getenv("WEBAPP_URL") or os.getenv("BASE_URL") or "").rstrip("/")
-        return cls(token=token, admin_ids=admin_ids, courier_ids=courier_ids, webapp_url=webapp_url)
+        staff_cache_ttl = float(os.getenv("STAFF_CACHE_TTL", "60"))
+        return cls(
+            token=token,
+            admin_ids=admin_ids,
+            courier_ids=courier_ids,
+            webapp_url=webapp_url,
+            staff_cache_ttl=staff_cache_ttl,
+        )
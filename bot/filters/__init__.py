@@ -1,36 +1,19 @@
 """Кастомные фильтры для хендлеров."""
 from aiogram.filters import BaseFilter
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import TelegramObject
 
-from bot.config import BotConfig
+from bot.roles import Role
 
 
-def _user_id_from_event(event: Message | CallbackQuery) -> int | None:
-    """ID пользователя из Message или CallbackQuery."""
-    user = getattr(event, "from_user", None)
-    return user.id if user else None
+class RoleFilter(BaseFilter):
+    """Фильтр по роли из RoleMiddleware (data['role']). Подходит для любых апдейтов.
 
+    Ставится на роутер целиком (router.message.filter(...)), а не на каждый
+    хендлер: апдейт чужой роли не проверяет ни одного хендлера этого роутера.
+    """
 
-class AdminFilter(BaseFilter):
-    """Фильтр: только администраторы (id в admin_ids). Подходит для Message и CallbackQuery."""
+    def __init__(self, *roles: Role) -> None:
+        self.roles = frozenset(roles)
 
-    def __init__(self, config: BotConfig) -> None:
-        self.admin_ids = config.admin_ids
-
-    async def __call__(self, event: Message | CallbackQuery) -> bool:
-        uid = _user_id_from_event(event)
-        return uid is not None and uid in self.admin_ids
-
-
-class StaffFilter(BaseFilter):
-    """Фильтр: администратор или курьер (id в admin_ids или courier_ids)."""
-
-    def __init__(self, config: BotConfig) -> None:
-        self.admin_ids = config.admin_ids
-        self.courier_ids = config.courier_ids
-
-    async def __call__(self, message: Message) -> bool:
-        if message.from_user is None:
-            return False
-        uid = message.from_user.id
-        return uid in self.admin_ids or uid in self.courier_ids
+    async def __call__(self, event: TelegramObject, role: Role = Role.CUSTOMER) -> bool:
+        return role in self.roles
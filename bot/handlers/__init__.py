@@ -1,11 +1,32 @@
 from aiogram import Router
 
+from bot.callbacks import CallbackRouter
 from bot.config import BotConfig
-from bot.handlers import start, orders, products, categories
+from bot.filters import RoleFilter
+from bot.handlers import start, orders, products, categories, jobs, staff
+from bot.roles import Role
 
 
 def setup_handlers(router: Router, config: BotConfig) -> None:
-    start.setup(router, config)
-    orders.setup(router, config)
-    products.setup(router, config)
-    categories.setup(router, config)
\ No newline at end of file
+    """Хендлеры по ролям: роль проверяется фильтром роутера один раз, а не у каждого хендлера.
+
+    Роль кладёт в data RoleMiddleware (см. bot.bot); апдейт покупателя не доходит
+    до хендлеров админского и курьерского роутеров.
+    """
+    admin_router = Router(name="admin")
+    staff_router = Router(name="staff")
+    for observer in (admin_router.message, admin_router.callback_query):
+        observer.filter(RoleFilter(Role.ADMIN))
+    staff_router.message.filter(RoleFilter(Role.ADMIN, Role.COURIER))
+
+    # Все inline-кнопки — админские: одна таблица действий на админском роутере
+    callbacks = CallbackRouter()
+    start.setup(router, admin_router, config)
+    orders.setup(admin_router, staff_router, config)
+    products.setup(admin_router, config, callbacks)
+    categories.setup(admin_router, config, callbacks)
+    jobs.setup(admin_router, config)
+    staff.setup(admin_router, config)
+    callbacks.setup(admin_router)
+
+    router.include_routers(admin_router, staff_router)
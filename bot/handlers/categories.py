@@ -10,6 +10,7 @@ from aiogram.exceptions import TelegramBadRequest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import UPLOAD_DIR
+from bot.callbacks import Action, CallbackPayload, CallbackRouter, CategoryField
 from bot.config import BotConfig
 from bot.keyboards.reply import (
     get_admin_main_keyboard,
@@ -22,15 +23,7 @@ from bot.keyboards.inline import (
     inline_edit_category_start_keyboard,
     inline_edit_category_fields_keyboard,
     inline_edit_category_cancel_keyboard,
-    CBD_CATEGORY_DELETE_PREFIX,
-    CBD_CATEGORY_DELETE_CANCEL,
-    CBD_CATEGORY_DELETE_CONFIRM_PREFIX,
-    CBD_CATEGORY_EDIT_PREFIX,
-    CBD_CATEGORY_EDIT_CANCEL,
-    CBD_CATEGORY_EDIT_FIELD_NAME,
-    CBD_CATEGORY_EDIT_FIELD_IMAGE,
 )
-from bot.filters import AdminFilter
 from bot.services.categories import CategoryService
 
 router = Router(name="categories")
@@ -48,80 +41,46 @@ class CategoryEditStates(StatesGroup):
     waiting_photo = State()
 
 
-def setup(router_instance: Router, config: BotConfig) -> None:
-    admin_filter = AdminFilter(config)
-
+def setup(router_instance: Router, config: BotConfig, callbacks: CallbackRouter) -> None:
     router_instance.message.register(
         handle_manage_categories_enter,
         F.text == BTN_BACK_TO_ADMIN_FROM_CATEGORIES,
-        admin_filter,
     )
     router_instance.message.register(
         handle_category_add_start,
         F.text == "➕ Добавить категорию",
-        admin_filter,
     )
     router_instance.message.register(
         handle_category_delete_start,
         F.text == "🗑 Удалить категорию",
-        admin_filter,
     )
     router_instance.message.register(
         handle_category_edit_start,
         F.text == "✏️ Редактировать категорию",
-        admin_filter,
     )
     router_instance.message.register(
         handle_category_add_name,
-        admin_filter,
         CategoryAddStates.waiting_name,
     )
     router_instance.message.register(
         handle_category_add_photo,
-        admin_filter,
         CategoryAddStates.waiting_photo,
     )
     router_instance.message.register(
         handle_category_edit_name,
-        admin_filter,
         CategoryEditStates.waiting_name,
     )
     router_instance.message.register(
         handle_category_edit_photo,
-        admin_filter,
         CategoryEditStates.waiting_photo,
     )
 
-    router_instance.callback_query.register(
-        handle_category_delete_choice,
-        F.data.startswith(CBD_CATEGORY_DELETE_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_category_delete_confirm,
-        F.data.startswith(CBD_CATEGORY_DELETE_CONFIRM_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_category_delete_cancel,
-        F.data == CBD_CATEGORY_DELETE_CANCEL,
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_category_edit_choice,
-        F.data.startswith(CBD_CATEGORY_EDIT_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_category_edit_cancel,
-        F.data == CBD_CATEGORY_EDIT_CANCEL,
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_category_edit_field_callback,
-        F.data.in_({CBD_CATEGORY_EDIT_FIELD_NAME, CBD_CATEGORY_EDIT_FIELD_IMAGE}),
-        admin_filter,
-    )
+    callbacks.register(Action.CATEGORY_DELETE, handle_category_delete_choice)
+    callbacks.register(Action.CATEGORY_DELETE_CONFIRM, handle_category_delete_confirm)
+    callbacks.register(Action.CATEGORY_DELETE_CANCEL, handle_category_delete_cancel)
+    callbacks.register(Action.CATEGORY_EDIT, handle_category_edit_choice)
+    callbacks.register(Action.CATEGORY_EDIT_CANCEL, handle_category_edit_cancel)
+    callbacks.register(Action.CATEGORY_EDIT_FIELD, handle_category_edit_field_callback)
 
 
 async def handle_manage_categories_enter(message: Message, state: FSMContext) -> None:
@@ -202,13 +161,13 @@ async def handle_category_delete_start(
 
 
 async def handle_category_delete_choice(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    category_id = int(callback.data.removeprefix(CBD_CATEGORY_DELETE_PREFIX))
+    category_id = payload.arg
     service = CategoryService(session)
     category = await service.get_category(category_id)
     if not category:
@@ -221,13 +180,13 @@ async def handle_category_delete_choice(
 
 
 async def handle_category_delete_confirm(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    category_id = int(callback.data.removeprefix(CBD_CATEGORY_DELETE_CONFIRM_PREFIX))
+    category_id = payload.arg
     service = CategoryService(session)
     ok = await service.delete_category(category_id)
     await state.clear()
@@ -274,13 +233,13 @@ async def handle_category_edit_start(
 
 
 async def handle_category_edit_choice(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    category_id = int(callback.data.removeprefix(CBD_CATEGORY_EDIT_PREFIX))
+    category_id = payload.arg
     service = CategoryService(session)
     category = await service.get_category(category_id)
     if not category:
@@ -295,20 +254,20 @@ async def handle_category_edit_choice(
 
 
 async def handle_category_edit_field_callback(
-    callback: CallbackQuery, state: FSMContext
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
 ) -> None:
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    data = callback.data
-    if data == CBD_CATEGORY_EDIT_FIELD_NAME:
+    field = payload.arg
+    if field == CategoryField.NAME:
         await state.set_state(CategoryEditStates.waiting_name)
         await callback.message.answer(
             "Введите новое название категории:",
             reply_markup=inline_edit_category_cancel_keyboard(),
         )
-    elif data == CBD_CATEGORY_EDIT_FIELD_IMAGE:
+    elif field == CategoryField.IMAGE:
         await state.set_state(CategoryEditStates.waiting_photo)
         await callback.message.answer(
             "Отправьте новую картинку категории:",
@@ -0,0 +1,105 @@
+"""Команды администратора для тяжёлых операций: ставят фоновую задачу (jobs.queue).
+
+Хендлер отвечает сразу; ход выполнения воркер показывает правкой того же
+сообщения (см. make_job_notifier).
+"""
+from aiogram import Bot, Router
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from bot.config import BotConfig
+from jobs import tasks  # noqa: F401 — регистрирует типы задач
+from jobs.queue import Notifier, kinds, queue
+
+router = Router(name="jobs")
+
+
+def setup(router_instance: Router, config: BotConfig) -> None:
+    router_instance.message.register(handle_reprice, Command("reprice"))
+    router_instance.message.register(handle_rebuild_catalog, Command("rebuild_catalog"))
+    router_instance.message.register(handle_cleanup_uploads, Command("cleanup_uploads"))
+    router_instance.message.register(handle_backfill_images, Command("backfill_images"))
+    router_instance.message.register(handle_backup, Command("backup"))
+    router_instance.message.register(handle_job_status, Command("job"))
+
+
+def make_job_notifier(bot: Bot) -> Notifier:
+    """notifier для jobs.queue: правит статусное сообщение задачи."""
+    async def notify(chat_id: int, message_id: int, text: str) -> None:
+        try:
+            await bot.edit_message_text(text, chat_id=chat_id, message_id=message_id)
+        except TelegramBadRequest:
+            # Сообщение удалено или текст не изменился
+            pass
+    return notify
+
+
+async def _enqueue(message: Message, kind: str, payload: dict | None = None) -> None:
+    """Ответить статусным сообщением и поставить задачу, привязанную к нему.
+
+    Ключ идемпотентности — id входящего сообщения: повторная доставка того же
+    апдейта не создаст вторую задачу.
+    """
+    title = kinds()[kind].title
+    status = await message.answer(f"⏳ {title}: задача поставлена в очередь…")
+    job = await queue.enqueue(
+        kind,
+        payload,
+        idempotency_key=f"tg:{message.chat.id}:{message.message_id}",
+        chat_id=message.chat.id,
+        message_id=status.message_id,
+    )
+    if job.message_id != status.message_id:
+        await status.edit_text(f"{title}: задача #{job.id} уже поставлена.")
+
+
+async def handle_reprice(message: Message, command: CommandObject) -> None:
+    """/reprice <процент> [id категории] — изменить цены, например /reprice -10 3."""
+    args = (command.args or "").split()
+    try:
+        percent = float(args[0].replace(",", "."))
+        category_id = int(args[1]) if len(args) > 1 else None
+    except (IndexError, ValueError):
+        await message.answer("Использование: /reprice <процент> [id категории], например /reprice -10 3")
+        return
+    if percent <= -100 or percent == 0:
+        await message.answer("Процент должен быть больше -100 и не равен нулю.")
+        return
+    await _enqueue(message, "items.reprice", {"percent": percent, "category_id": category_id})
+
+
+async def handle_rebuild_catalog(message: Message) -> None:
+    await _enqueue(message, "catalog.rebuild")
+
+
+async def handle_cleanup_uploads(message: Message) -> None:
+    await _enqueue(message, "uploads.gc")
+
+
+async def handle_backfill_images(message: Message) -> None:
+    await _enqueue(message, "images.backfill")
+
+
+async def handle_backup(message: Message) -> None:
+    await _enqueue(message, "db.backup")
+
+
+async def handle_job_status(message: Message, command: CommandObject) -> None:
+    """/job <id> — состояние задачи."""
+    try:
+        job_id = int((command.args or "").strip())
+    except ValueError:
+        await message.answer("Использование: /job <номер задачи>")
+        return
+    job = await queue.get(job_id)
+    if job is None:
+        await message.answer("Задача не найдена.")
+        return
+    text = (
+        f"Задача #{job.id} ({job.kind}): {job.status}, "
+        f"{job.progress_done}/{job.progress_total}, попыток {job.attempts}/{job.max_attempts}"
+    )
+    if job.error:
+        text += f"\nОшибка: {job.error}"
+    await message.answer(text)
@@ -13,33 +13,29 @@ from bot.keyboards.reply import (
     BTN_ORDERS_CANCELLED,
     BTN_BACK_TO_ADMIN,
 )
-from bot.filters import AdminFilter, StaffFilter
 
 router = Router(name="orders")
 
 
-def setup(router_instance: Router, config: BotConfig) -> None:
-    """Регистрирует хендлеры заказов (подменю + просмотр по статусам)."""
-    admin_filter = AdminFilter(config)
-    staff_filter = StaffFilter(config)
-
-    router_instance.message.register(
-        handle_manage_orders, F.text == BTN_ADMIN_ORDERS, admin_filter
+def setup(admin_router: Router, staff_router: Router, config: BotConfig) -> None:
+    """Регистрирует хендлеры заказов: подменю — админам, просмотр по статусам — админам и курьерам."""
+    admin_router.message.register(
+        handle_manage_orders, F.text == BTN_ADMIN_ORDERS
     )
-    router_instance.message.register(
-        handle_back_to_admin, F.text == BTN_BACK_TO_ADMIN, admin_filter
+    admin_router.message.register(
+        handle_back_to_admin, F.text == BTN_BACK_TO_ADMIN
     )
-    router_instance.message.register(
-        handle_orders_new, F.text == BTN_ORDERS_NEW, staff_filter
+    staff_router.message.register(
+        handle_orders_new, F.text == BTN_ORDERS_NEW
     )
-    router_instance.message.register(
-        handle_orders_active, F.text == BTN_ORDERS_ACTIVE, staff_filter
+    staff_router.message.register(
+        handle_orders_active, F.text == BTN_ORDERS_ACTIVE
     )
-    router_instance.message.register(
-        handle_orders_completed, F.text == BTN_ORDERS_COMPLETED, staff_filter
+    staff_router.message.register(
+        handle_orders_completed, F.text == BTN_ORDERS_COMPLETED
     )
-    router_instance.message.register(
-        handle_orders_cancelled, F.text == BTN_ORDERS_CANCELLED, staff_filter
+    staff_router.message.register(
+        handle_orders_cancelled, F.text == BTN_ORDERS_CANCELLED
     )
 
 
@@ -10,6 +10,7 @@ from aiogram.fsm.state import State, StatesGroup
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import UPLOAD_DIR
+from bot.callbacks import Action, CallbackPayload, CallbackRouter, ProductField
 from bot.config import BotConfig
 from bot.keyboards.reply import (
     get_manage_products_keyboard,
@@ -31,29 +32,9 @@ from bot.keyboards.inline import (
     inline_flavors_keyboard_add,
     inline_flavors_keyboard_edit,
     inline_select_category_keyboard,
-    CBD_PRODUCT_DELETE_CANCEL,
-    CBD_PRODUCT_DELETE_CONFIRM_PREFIX,
-    CBD_PRODUCT_EDIT_CANCEL,
-    CBD_PRODUCT_DELETE_PREFIX,
     inline_confirm_delete_product_keyboard,
-    CBD_PRODUCT_EDIT_PREFIX,
-    CBD_EDIT_NAME,
-    CBD_EDIT_DESCRIPTION,
-    CBD_EDIT_IMAGE,
-    CBD_EDIT_FLAVORS,
-    CBD_EDIT_CATEGORY,
-    CBD_FLAVOR_EDIT_NAME_PREFIX,
-    CBD_FLAVOR_EDIT_PHOTO_PREFIX,
-    CBD_FLAVOR_EDIT_BACK,
-    CBD_ADD_FLAVOR_SELECT_PREFIX,
-    CBD_ADD_FLAVOR_NEW,
-    CBD_ADD_FLAVOR_DONE,
-    CBD_PRODUCT_EDIT_FLAVOR_PREFIX,
-    CBD_EDIT_FLAVOR_ADD_PREFIX,
-    CBD_PRODUCT_EDIT_FLAVORS_BACK,
-    CBD_PRODUCT_SELECT_CATEGORY_PREFIX,
+    inline_bulk_products_keyboard,
 )
-from bot.filters import AdminFilter
 from bot.services.items import ItemService
 
 router = Router(name="products")
@@ -75,6 +56,13 @@ class ProductEditStates(StatesGroup):
     waiting_new_flavor_photo = State()
 
 
+class ProductBulkStates(StatesGroup):
+    """Состояния FSM массового редактирования (несколько товаров сразу)."""
+    selecting = State()
+    waiting_category = State()
+    waiting_discount = State()
+
+
 class ProductAddStates(StatesGroup):
     """Состояния FSM при добавлении товара."""
     waiting_category = State()  # выбор категории (обязательно)
@@ -87,184 +75,121 @@ class ProductAddStates(StatesGroup):
     waiting_new_flavor_photo = State()
 
 
-def setup(router_instance: Router, config: BotConfig) -> None:
-    """Регистрирует хендлеры товаров (только админ)."""
-    admin_filter = AdminFilter(config)
-
+def setup(router_instance: Router, config: BotConfig, callbacks: CallbackRouter) -> None:
+    """Регистрирует хендлеры товаров (только админ). Inline-кнопки — в таблице callbacks."""
     router_instance.message.register(
-        handle_product_add, F.text == BTN_PRODUCT_ADD, admin_filter
+        handle_product_add, F.text == BTN_PRODUCT_ADD
     )
     router_instance.message.register(
-        handle_product_delete_start, F.text == BTN_PRODUCT_DELETE, admin_filter
+        handle_product_delete_start, F.text == BTN_PRODUCT_DELETE
     )
     router_instance.message.register(
-        handle_product_edit_start, F.text == BTN_PRODUCT_EDIT, admin_filter
+        handle_product_edit_start, F.text == BTN_PRODUCT_EDIT
     )
     router_instance.message.register(
         handle_back_to_manage_products,
         F.text == BTN_BACK_TO_MANAGE_PRODUCTS,
-        admin_filter,
     )
 
-    # Callback: выбор товара для удаления (подтверждение) и подтверждение удаления
-    router_instance.callback_query.register(
-        handle_product_delete_confirm,
-        F.data.startswith(CBD_PRODUCT_DELETE_CONFIRM_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_product_delete_choice,
-        F.data.startswith(CBD_PRODUCT_DELETE_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_product_edit_choice,
-        F.data.startswith(CBD_PRODUCT_EDIT_PREFIX),
-        admin_filter,
+    # Массовое редактирование
+    router_instance.message.register(
+        handle_bulk_discount_input, ProductBulkStates.waiting_discount
     )
     # Редактирование: выбор поля
     router_instance.message.register(
         handle_edit_field_name,
         F.text == BTN_EDIT_NAME,
-        admin_filter,
         ProductEditStates.choosing_field,
     )
     router_instance.message.register(
         handle_edit_field_description,
         F.text == BTN_EDIT_DESCRIPTION,
-        admin_filter,
         ProductEditStates.choosing_field,
     )
     router_instance.message.register(
         handle_edit_field_image,
         F.text == BTN_EDIT_IMAGE,
-        admin_filter,
         ProductEditStates.choosing_field,
     )
     router_instance.message.register(
         handle_edit_field_flavors,
         F.text == BTN_EDIT_FLAVORS,
-        admin_filter,
         ProductEditStates.choosing_field,
     )
     router_instance.message.register(
         handle_edit_new_flavor_name,
-        admin_filter,
         ProductEditStates.waiting_new_flavor_name,
     )
     router_instance.message.register(
         handle_edit_new_flavor_photo,
-        admin_filter,
         ProductEditStates.waiting_new_flavor_photo,
     )
     router_instance.message.register(
         handle_edit_flavor_name_receive,
-        admin_filter,
         ProductEditStates.waiting_flavor_name,
     )
     router_instance.message.register(
         handle_edit_flavor_photo_receive,
-        admin_filter,
         ProductEditStates.waiting_flavor_photo,
     )
     router_instance.message.register(
-        handle_receive_name, admin_filter, ProductEditStates.waiting_name
+        handle_receive_name, ProductEditStates.waiting_name
     )
     router_instance.message.register(
-        handle_receive_description, admin_filter, ProductEditStates.waiting_description
+        handle_receive_description, ProductEditStates.waiting_description
     )
     router_instance.message.register(
-        handle_receive_image, admin_filter, ProductEditStates.waiting_image
+        handle_receive_image, ProductEditStates.waiting_image
     )
     router_instance.message.register(
-        handle_receive_flavors, admin_filter, ProductEditStates.waiting_flavors
+        handle_receive_flavors, ProductEditStates.waiting_flavors
     )
 
     # Добавление товара: по шагам
     router_instance.message.register(
-        handle_add_name, admin_filter, ProductAddStates.waiting_name
+        handle_add_name, ProductAddStates.waiting_name
     )
     router_instance.message.register(
-        handle_add_description, admin_filter, ProductAddStates.waiting_description
+        handle_add_description, ProductAddStates.waiting_description
     )
     router_instance.message.register(
-        handle_add_price, admin_filter, ProductAddStates.waiting_price
+        handle_add_price, ProductAddStates.waiting_price
     )
     router_instance.message.register(
-        handle_add_photo, admin_filter, ProductAddStates.waiting_photo
+        handle_add_photo, ProductAddStates.waiting_photo
     )
     router_instance.message.register(
-        handle_add_new_flavor_name, admin_filter, ProductAddStates.waiting_new_flavor_name
+        handle_add_new_flavor_name, ProductAddStates.waiting_new_flavor_name
     )
     router_instance.message.register(
-        handle_add_new_flavor_photo, admin_filter, ProductAddStates.waiting_new_flavor_photo
+        handle_add_new_flavor_photo, ProductAddStates.waiting_new_flavor_photo
     )
 
-    # Callback: отмена удаления / редактирования и выбор поля редактирования
-    router_instance.callback_query.register(
-        handle_product_delete_cancel, F.data == CBD_PRODUCT_DELETE_CANCEL, admin_filter
-    )
-    router_instance.callback_query.register(
-        handle_product_edit_cancel, F.data == CBD_PRODUCT_EDIT_CANCEL, admin_filter
-    )
-    router_instance.callback_query.register(
-        handle_product_edit_field_callback,
-        F.data.in_({CBD_EDIT_NAME, CBD_EDIT_DESCRIPTION, CBD_EDIT_IMAGE, CBD_EDIT_FLAVORS, CBD_EDIT_CATEGORY}),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_product_select_category,
-        F.data.startswith(CBD_PRODUCT_SELECT_CATEGORY_PREFIX),
-        admin_filter,
-    )
-    # Callback: редактирование вкуса (название, фото, назад)
-    router_instance.callback_query.register(
-        handle_flavor_edit_name_callback,
-        F.data.startswith(CBD_FLAVOR_EDIT_NAME_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_flavor_edit_photo_callback,
-        F.data.startswith(CBD_FLAVOR_EDIT_PHOTO_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_flavor_edit_back_callback,
-        F.data == CBD_FLAVOR_EDIT_BACK,
-        admin_filter,
-    )
-    # Callback: вкусы при добавлении товара (инлайн под сообщением)
-    router_instance.callback_query.register(
-        handle_add_flavor_select,
-        F.data.startswith(CBD_ADD_FLAVOR_SELECT_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_add_flavor_new_callback,
-        F.data == CBD_ADD_FLAVOR_NEW,
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_add_flavor_done_callback,
-        F.data == CBD_ADD_FLAVOR_DONE,
-        admin_filter,
-    )
-    # Callback: вкусы при редактировании товара (инлайн под сообщением)
-    router_instance.callback_query.register(
-        handle_product_edit_flavor_callback,
-        F.data.startswith(CBD_PRODUCT_EDIT_FLAVOR_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_edit_flavor_add_callback,
-        F.data.startswith(CBD_EDIT_FLAVOR_ADD_PREFIX),
-        admin_filter,
-    )
-    router_instance.callback_query.register(
-        handle_product_edit_flavors_back_callback,
-        F.data == CBD_PRODUCT_EDIT_FLAVORS_BACK,
-        admin_filter,
-    )
+
+    # Callback: удаление (несколько товаров сразу), выбор товара и поля редактирования
+    callbacks.register(Action.PRODUCT_DELETE_TOGGLE, handle_product_delete_choice)
+    callbacks.register(Action.PRODUCT_DELETE_SELECTED, handle_product_delete_selected)
+    callbacks.register(Action.PRODUCT_DELETE_CONFIRM, handle_product_delete_confirm)
+    callbacks.register(Action.PRODUCT_DELETE_CANCEL, handle_product_delete_cancel)
+    callbacks.register(Action.PRODUCT_EDIT, handle_product_edit_choice)
+    callbacks.register(Action.PRODUCT_EDIT_CANCEL, handle_product_edit_cancel)
+    callbacks.register(Action.PRODUCT_EDIT_FIELD, handle_product_edit_field_callback)
+    callbacks.register(Action.PRODUCT_SELECT_CATEGORY, handle_product_select_category)
+    # Callback: массовое редактирование
+    callbacks.register(Action.PRODUCT_BULK_START, handle_product_bulk_start)
+    callbacks.register(Action.PRODUCT_BULK_TOGGLE, handle_product_bulk_toggle, ProductBulkStates.selecting)
+    callbacks.register(Action.PRODUCT_BULK_MOVE, handle_product_bulk_move, ProductBulkStates.selecting)
+    callbacks.register(Action.PRODUCT_BULK_DISCOUNT, handle_product_bulk_discount, ProductBulkStates.selecting)
+    # Callback: вкусы — редактирование вкуса, выбор при добавлении и при редактировании товара
+    callbacks.register(Action.FLAVOR_EDIT_NAME, handle_flavor_edit_name_callback)
+    callbacks.register(Action.FLAVOR_EDIT_PHOTO, handle_flavor_edit_photo_callback)
+    callbacks.register(Action.FLAVOR_EDIT_BACK, handle_flavor_edit_back_callback)
+    callbacks.register(Action.ADD_FLAVOR_SELECT, handle_add_flavor_select)
+    callbacks.register(Action.ADD_FLAVOR_NEW, handle_add_flavor_new_callback)
+    callbacks.register(Action.ADD_FLAVOR_DONE, handle_add_flavor_done_callback)
+    callbacks.register(Action.PRODUCT_EDIT_FLAVOR, handle_product_edit_flavor_callback)
+    callbacks.register(Action.EDIT_FLAVOR_ADD, handle_edit_flavor_add_callback)
+    callbacks.register(Action.PRODUCT_EDIT_FLAVORS_BACK, handle_product_edit_flavors_back_callback)
 
 
 # --- Callback: отмена и выбор поля (клавиатура к сообщению) ---
@@ -301,33 +226,33 @@ async def handle_product_edit_cancel(
 
 
 async def handle_product_edit_field_callback(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     """Выбор поля редактирования по inline-кнопке (название/описание/картинка/вкусы)."""
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    data = callback.data
-    if data == CBD_EDIT_NAME:
+    field = payload.arg
+    if field == ProductField.NAME:
         await state.set_state(ProductEditStates.waiting_name)
         await callback.message.answer(
             "Введите новое название товара:",
             reply_markup=inline_edit_cancel_keyboard(),
         )
-    elif data == CBD_EDIT_DESCRIPTION:
+    elif field == ProductField.DESCRIPTION:
         await state.set_state(ProductEditStates.waiting_description)
         await callback.message.answer(
             "Введите новое описание товара:",
             reply_markup=inline_edit_cancel_keyboard(),
         )
-    elif data == CBD_EDIT_IMAGE:
+    elif field == ProductField.IMAGE:
         await state.set_state(ProductEditStates.waiting_image)
         await callback.message.answer(
             "Отправьте новое фото товара:",
             reply_markup=inline_edit_cancel_keyboard(),
         )
-    elif data == CBD_EDIT_FLAVORS:
+    elif field == ProductField.FLAVORS:
         await state.set_state(ProductEditStates.choosing_flavor)
         sdata = await state.get_data()
         product_id = sdata.get("product_id")
@@ -344,7 +269,7 @@ async def handle_product_edit_field_callback(
             f"Вкусы товара: {names}. Выберите вкус для редактирования или нажмите «Добавить вкус».",
             reply_markup=inline_flavors_keyboard_edit(item.flavors, product_id),
         )
-    elif data == CBD_EDIT_CATEGORY:
+    elif field == ProductField.CATEGORY:
         await state.set_state(ProductEditStates.waiting_category_select)
         service = ItemService(session)
         categories = await service.get_categories()
@@ -359,19 +284,31 @@ async def handle_product_edit_field_callback(
 
 
 async def handle_product_select_category(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     """Выбор категории при добавлении товара или при редактировании (смена категории)."""
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    category_id = int(callback.data.removeprefix(CBD_PRODUCT_SELECT_CATEGORY_PREFIX))
+    category_id = payload.arg
     current_state = await state.get_state()
     if current_state == ProductAddStates.waiting_category.state:
         await state.update_data(category_id=category_id)
         await state.set_state(ProductAddStates.waiting_name)
         await callback.message.answer("Введите название товара:")
+    elif current_state == ProductBulkStates.waiting_category.state:
+        data = await state.get_data()
+        service = ItemService(session)
+        moved = await service.move_items(data.get("bulk_selected_ids") or [], category_id)
+        await state.clear()
+        if moved is None:
+            await callback.message.answer("Категория не найдена.")
+        else:
+            await callback.message.answer(
+                f"Перенесено товаров: {len(moved)}.",
+                reply_markup=get_manage_products_keyboard(),
+            )
     elif current_state == ProductEditStates.waiting_category_select.state:
         data = await state.get_data()
         product_id = data.get("product_id")
@@ -483,14 +420,14 @@ async def handle_add_photo(
 
 
 async def handle_add_flavor_select(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     """Выбор/снятие вкуса при добавлении товара (инлайн под сообщением). Вкусы уникальны в списке."""
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    flavor_id = int(callback.data.removeprefix(CBD_ADD_FLAVOR_SELECT_PREFIX))
+    flavor_id = payload.arg
     data = await state.get_data()
     selected_ids: set[int] = set(data.get("selected_flavor_ids") or [])
     if flavor_id in selected_ids:
@@ -523,7 +460,10 @@ async def handle_add_flavor_new_callback(
 async def handle_add_flavor_done_callback(
     callback: CallbackQuery, state: FSMContext, session: AsyncSession
 ) -> None:
-    """Кнопка «Готово» при добавлении товара — создаём товар с выбранными вкусами."""
+    """Кнопка «Готово» при добавлении товара — создаём товар с выбранными вкусами.
+
+    Вкусы назначаются ItemService.set_flavors в той же транзакции, что и создание товара.
+    """
     try:
         await callback.answer()
     except TelegramBadRequest:
@@ -615,67 +555,104 @@ async def handle_add_new_flavor_photo(
         )
 
 
-# --- Удаление товара ---
+# --- Удаление товаров (можно отметить несколько и удалить одним запросом) ---
 
 
 async def handle_product_delete_start(
     message: Message, state: FSMContext, session: AsyncSession
 ) -> None:
-    """Старт удаления: показать список товаров для выбора."""
+    """Старт удаления: показать список товаров для выбора (несколько сразу)."""
     await state.clear()
     service = ItemService(session)
-    items = await service.get_items()
+    items = [(i.id, i.name) for i in await service.get_items()]
     if not items:
         await message.answer(
             "Нет товаров для удаления.",
             reply_markup=get_manage_products_keyboard(),
         )
         return
+    # Список хранится в FSM: переключение отметок не ходит в БД
+    await state.update_data(delete_items=items, delete_selected_ids=[])
     await message.answer(
-        "Выберите товар для удаления:",
-        reply_markup=inline_delete_product_keyboard([(i.id, i.name) for i in items]),
+        "Отметьте товары для удаления:",
+        reply_markup=inline_delete_product_keyboard(items),
     )
 
 
 async def handle_product_delete_choice(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
 ) -> None:
-    """Выбор товара для удаления: показываем подтверждение."""
+    """Отметить/снять товар в списке удаления (клавиатура меняется на месте)."""
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    item_id = int(callback.data.removeprefix(CBD_PRODUCT_DELETE_PREFIX))
-    service = ItemService(session)
-    item = await service.get_item(item_id)
-    if not item:
-        await callback.message.answer("Товар не найден.")
+    item_id = payload.arg
+    data = await state.get_data()
+    items = [tuple(i) for i in data.get("delete_items") or []]
+    selected_ids = _toggle(data.get("delete_selected_ids"), item_id)
+    await state.update_data(delete_selected_ids=list(selected_ids))
+    try:
+        await callback.message.edit_reply_markup(
+            reply_markup=inline_delete_product_keyboard(items, selected_ids),
+        )
+    except TelegramBadRequest:
+        pass
+
+
+async def handle_product_delete_selected(
+    callback: CallbackQuery, state: FSMContext
+) -> None:
+    """Кнопка «Удалить выбранные»: показываем подтверждение."""
+    try:
+        await callback.answer()
+    except TelegramBadRequest:
+        pass
+    data = await state.get_data()
+    selected_ids = set(data.get("delete_selected_ids") or [])
+    if not selected_ids:
+        await callback.message.answer("Не выбрано ни одного товара.")
         return
+    names = [name for id_, name in data.get("delete_items") or [] if id_ in selected_ids]
     await callback.message.answer(
-        f"Удалить товар «{item.name}» (ID: {item_id})?",
-        reply_markup=inline_confirm_delete_product_keyboard(item_id),
+        f"Удалить товары ({len(selected_ids)}): {_names_preview(names)}?",
+        reply_markup=inline_confirm_delete_product_keyboard(),
     )
 
 
 async def handle_product_delete_confirm(
     callback: CallbackQuery, state: FSMContext, session: AsyncSession
 ) -> None:
-    """Подтверждение удаления товара по inline-кнопке «Да, удалить»."""
+    """Подтверждение удаления: все выбранные товары удаляются в одной транзакции."""
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    item_id = int(callback.data.removeprefix(CBD_PRODUCT_DELETE_CONFIRM_PREFIX))
+    data = await state.get_data()
+    selected_ids = list(data.get("delete_selected_ids") or [])
     service = ItemService(session)
-    ok = await service.delete_item(item_id)
+    deleted = await service.delete_items(selected_ids)
     await state.clear()
-    if ok:
+    if deleted:
         await callback.message.answer(
-            f"Товар (ID: {item_id}) удалён.",
+            f"Удалено товаров: {len(deleted)}.",
             reply_markup=get_manage_products_keyboard(),
         )
     else:
-        await callback.message.answer("Товар не найден.")
+        await callback.message.answer("Товары не найдены.")
+
+
+def _toggle(ids: list[int] | None, item_id: int) -> set[int]:
+    selected = set(ids or [])
+    selected.symmetric_difference_update({item_id})
+    return selected
+
+
+def _names_preview(names: list[str], limit: int = 10) -> str:
+    preview = ", ".join(f"«{name}»" for name in names[:limit])
+    if len(names) > limit:
+        preview += f" и ещё {len(names) - limit}"
+    return preview
 
 
 # --- Редактирование товара (по одному полю) ---
@@ -701,14 +678,14 @@ async def handle_product_edit_start(
 
 
 async def handle_product_edit_choice(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     """Выбор товара для редактирования по inline-кнопке."""
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass  # запрос устарел — всё равно выполняем действие и отправим новое сообщение
-    product_id = int(callback.data.removeprefix(CBD_PRODUCT_EDIT_PREFIX))
+    product_id = payload.arg
     service = ItemService(session)
     item = await service.get_item(product_id)
     if not item:
@@ -722,6 +699,104 @@ async def handle_product_edit_choice(
     )
 
 
+# --- Массовое редактирование: категория и скидка для нескольких товаров ---
+
+
+async def handle_product_bulk_start(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+) -> None:
+    """Кнопка «Несколько товаров»: список товаров превращается в список с отметками."""
+    try:
+        await callback.answer()
+    except TelegramBadRequest:
+        pass
+    service = ItemService(session)
+    items = [(i.id, i.name) for i in await service.get_items()]
+    await state.set_state(ProductBulkStates.selecting)
+    await state.update_data(bulk_items=items, bulk_selected_ids=[])
+    try:
+        await callback.message.edit_text(
+            "Отметьте товары и выберите действие:",
+            reply_markup=inline_bulk_products_keyboard(items, set()),
+        )
+    except TelegramBadRequest:
+        pass
+
+
+async def handle_product_bulk_toggle(callback: CallbackQuery, state: FSMContext, payload: CallbackPayload) -> None:
+    """Отметить/снять товар в массовом редактировании."""
+    try:
+        await callback.answer()
+    except TelegramBadRequest:
+        pass
+    item_id = payload.arg
+    data = await state.get_data()
+    items = [tuple(i) for i in data.get("bulk_items") or []]
+    selected_ids = _toggle(data.get("bulk_selected_ids"), item_id)
+    await state.update_data(bulk_selected_ids=list(selected_ids))
+    try:
+        await callback.message.edit_reply_markup(
+            reply_markup=inline_bulk_products_keyboard(items, selected_ids),
+        )
+    except TelegramBadRequest:
+        pass
+
+
+async def handle_product_bulk_move(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+) -> None:
+    """Перенос выбранных товаров: показываем категории (выбор — handle_product_select_category)."""
+    try:
+        await callback.answer()
+    except TelegramBadRequest:
+        pass
+    service = ItemService(session)
+    categories = await service.get_categories()
+    if not categories:
+        await callback.message.answer("Нет категорий. Создайте категорию в разделе «Управление категориями».")
+        return
+    await state.set_state(ProductBulkStates.waiting_category)
+    await callback.message.answer(
+        "Выберите категорию для выбранных товаров:",
+        reply_markup=inline_select_category_keyboard(categories),
+    )
+
+
+async def handle_product_bulk_discount(callback: CallbackQuery, state: FSMContext) -> None:
+    """Скидка для выбранных товаров: ждём число процентов."""
+    try:
+        await callback.answer()
+    except TelegramBadRequest:
+        pass
+    await state.set_state(ProductBulkStates.waiting_discount)
+    await callback.message.answer(
+        "Введите скидку в процентах (0 — убрать скидку):",
+        reply_markup=inline_edit_cancel_keyboard(),
+    )
+
+
+async def handle_bulk_discount_input(
+    message: Message, state: FSMContext, session: AsyncSession
+) -> None:
+    text = (message.text or "").strip().replace(",", ".")
+    try:
+        discount = float(text)
+        if not 0 <= discount <= 100:
+            raise ValueError
+    except ValueError:
+        await message.answer("Введите число от 0 до 100.")
+        return
+    data = await state.get_data()
+    service = ItemService(session)
+    updated = await service.set_discount(data.get("bulk_selected_ids") or [], discount or None)
+    await state.clear()
+    action = f"скидка {discount:g}%" if discount else "скидка снята"
+    await message.answer(
+        f"Готово: {action} у товаров: {len(updated)}.",
+        reply_markup=get_manage_products_keyboard(),
+    )
+
+
 async def handle_edit_field_name(message: Message, state: FSMContext) -> None:
     await state.set_state(ProductEditStates.waiting_name)
     await message.answer(
@@ -768,14 +843,14 @@ async def handle_edit_field_flavors(
 
 
 async def handle_product_edit_flavor_callback(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, payload: CallbackPayload
 ) -> None:
     """Выбор вкуса для редактирования (название/фото) — инлайн под сообщением. Вкусы уникальны для товара."""
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    flavor_id = int(callback.data.removeprefix(CBD_PRODUCT_EDIT_FLAVOR_PREFIX))
+    flavor_id = payload.arg
     service = ItemService(session)
     flavor = await service.get_flavor(flavor_id)
     if not flavor:
@@ -852,26 +927,26 @@ async def handle_edit_new_flavor_photo(
 
 
 async def handle_flavor_edit_name_callback(
-    callback: CallbackQuery, state: FSMContext
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
 ) -> None:
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    flavor_id = int(callback.data.removeprefix(CBD_FLAVOR_EDIT_NAME_PREFIX))
+    flavor_id = payload.arg
     await state.update_data(flavor_id=flavor_id)
     await state.set_state(ProductEditStates.waiting_flavor_name)
     await callback.message.answer("Введите новое название вкуса:")
 
 
 async def handle_flavor_edit_photo_callback(
-    callback: CallbackQuery, state: FSMContext
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
 ) -> None:
     try:
         await callback.answer()
     except TelegramBadRequest:
         pass
-    flavor_id = int(callback.data.removeprefix(CBD_FLAVOR_EDIT_PHOTO_PREFIX))
+    flavor_id = payload.arg
     await state.update_data(flavor_id=flavor_id)
     await state.set_state(ProductEditStates.waiting_flavor_photo)
     await callback.message.answer("Отправьте новое фото вкуса:")
@@ -0,0 +1,69 @@
+"""Команды администратора для сотрудников: курьеры и админы без перезапуска бота.
+
+Назначения хранятся в таблице staff; после изменения кэш ролей сбрасывается
+(RoleResolver.invalidate), и новая роль действует со следующего апдейта.
+Сотрудники из TELEGRAM_ADMIN_IDS / TELEGRAM_COURIERS_IDS здесь не меняются.
+"""
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import BotConfig
+from bot.roles import Role, RoleResolver, STAFF_ROLES
+from bot.services.staff import StaffService
+
+router = Router(name="staff")
+
+ROLE_TITLES = {Role.ADMIN: "админ", Role.COURIER: "курьер"}
+
+
+def setup(router_instance: Router, config: BotConfig) -> None:
+    router_instance.message.register(handle_staff_list, Command("staff"))
+    router_instance.message.register(handle_staff_add, Command("staff_add"))
+    router_instance.message.register(handle_staff_remove, Command("staff_remove"))
+
+
+async def handle_staff_list(message: Message, session: AsyncSession, roles: RoleResolver) -> None:
+    """/staff — сотрудники из окружения и назначенные из бота."""
+    lines = [f"{user_id} — админ (окружение)" for user_id in sorted(roles.admin_ids)]
+    lines += [f"{user_id} — курьер (окружение)" for user_id in sorted(roles.courier_ids)]
+    lines += [
+        f"{staff.user_id} — {ROLE_TITLES.get(staff.role, staff.role)}"
+        for staff in await StaffService(session).get_staff()
+    ]
+    await message.answer("Сотрудники:\n" + "\n".join(lines) if lines else "Сотрудников нет.")
+
+
+async def handle_staff_add(
+    message: Message, command: CommandObject, session: AsyncSession, roles: RoleResolver
+) -> None:
+    """/staff_add <id пользователя> [courier|admin] — назначить роль (по умолчанию курьер)."""
+    args = (command.args or "").split()
+    try:
+        user_id = int(args[0])
+        role = Role(args[1].lower()) if len(args) > 1 else Role.COURIER
+    except (IndexError, ValueError):
+        role = None
+    if role not in STAFF_ROLES:
+        await message.answer("Использование: /staff_add <id пользователя> [courier|admin]")
+        return
+    await StaffService(session).set_role(user_id, role)
+    roles.invalidate()
+    await message.answer(f"Пользователь {user_id} — {ROLE_TITLES[role]}.")
+
+
+async def handle_staff_remove(
+    message: Message, command: CommandObject, session: AsyncSession, roles: RoleResolver
+) -> None:
+    """/staff_remove <id пользователя> — снять роль, назначенную из бота."""
+    try:
+        user_id = int((command.args or "").strip())
+    except ValueError:
+        await message.answer("Использование: /staff_remove <id пользователя>")
+        return
+    if not await StaffService(session).remove(user_id):
+        await message.answer("Такого сотрудника нет в списке назначенных из бота.")
+        return
+    roles.invalidate()
+    await message.answer(f"Роль пользователя {user_id} снята.")
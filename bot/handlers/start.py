@@ -13,7 +13,7 @@ from bot.keyboards.reply import (
     BTN_ADMIN_PRODUCTS,
     BTN_ADMIN_CATEGORIES,
 )
-from bot.filters import AdminFilter
+from bot.roles import Role
 
 router = Router(name="start")
 
@@ -26,32 +26,29 @@ WELCOME_USER = (
 )
 
 
-def setup(router_instance: Router, config: BotConfig) -> None:
-    """Регистрирует хендлеры start с учётом конфига (роли)."""
-    admin_filter = AdminFilter(config)
-
-    async def start_handler(message: Message) -> None:
-        await cmd_start(message, config)
+def setup(router_instance: Router, admin_router: Router, config: BotConfig) -> None:
+    """Регистрирует /start (для всех) и подменю администратора."""
+    async def start_handler(message: Message, role: Role) -> None:
+        await cmd_start(message, role, config)
 
     router_instance.message.register(start_handler, CommandStart())
-    router_instance.message.register(
-        handle_manage_products, F.text == BTN_ADMIN_PRODUCTS, admin_filter
+    admin_router.message.register(
+        handle_manage_products, F.text == BTN_ADMIN_PRODUCTS
     )
-    router_instance.message.register(
-        handle_manage_categories, F.text == BTN_ADMIN_CATEGORIES, admin_filter
+    admin_router.message.register(
+        handle_manage_categories, F.text == BTN_ADMIN_CATEGORIES
     )
 
 
-async def cmd_start(message: Message, config: BotConfig) -> None:
-    """Приветствие и меню в зависимости от роли."""
-    user_id = message.from_user.id if message.from_user else 0
-    if user_id in config.admin_ids:
+async def cmd_start(message: Message, role: Role, config: BotConfig) -> None:
+    """Приветствие и меню в зависимости от роли (см. bot.roles)."""
+    if role is Role.ADMIN:
         await message.answer(
             "👋 Добро пожаловать в панель администратора.\n\n"
             "Выберите действие в меню ниже.",
             reply_markup=get_admin_main_keyboard(),
         )
-    elif user_id in config.courier_ids:
+    elif role is Role.COURIER:
         await message.answer(
             "👋 Добро пожаловать, курьер.\n\n"
             "Ниже — разделы для просмотра заказов.",
@@ -1,63 +1,54 @@
-"""Inline-клавиатуры (привязаны к сообщению)."""
+"""Inline-клавиатуры (привязаны к сообщению). callback_data — bot.callbacks.pack.
+
+Как и в reply: постоянные клавиатуры собираются один раз (functools.cache, для
+клавиатур с id — lru_cache), кнопки списков (товары, вкусы, категории)
+кэшируются по (текст, действие, аргумент). При отметке товара в списке заново
+создаётся только кнопка изменившейся строки. Возвращённые объекты общие —
+менять их на месте нельзя.
+"""
+from functools import cache, lru_cache
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-# Callback data для товаров
-CBD_PRODUCT_DELETE_CANCEL = "product_delete_cancel"
-CBD_PRODUCT_DELETE_CONFIRM_PREFIX = "product_delete_confirm:"
-CBD_PRODUCT_EDIT_CANCEL = "product_edit_cancel"
-CBD_PRODUCT_DELETE_PREFIX = "product_delete:"
-CBD_PRODUCT_EDIT_PREFIX = "product_edit:"
-CBD_PRODUCT_EDIT_FIELD = "product_edit_field"
-CBD_EDIT_NAME = f"{CBD_PRODUCT_EDIT_FIELD}:name"
-CBD_EDIT_DESCRIPTION = f"{CBD_PRODUCT_EDIT_FIELD}:description"
-CBD_EDIT_IMAGE = f"{CBD_PRODUCT_EDIT_FIELD}:image"
-CBD_EDIT_FLAVORS = f"{CBD_PRODUCT_EDIT_FIELD}:flavors"
-CBD_EDIT_CATEGORY = f"{CBD_PRODUCT_EDIT_FIELD}:category"
-
-# Редактирование вкуса (название, фото)
-CBD_FLAVOR_EDIT_NAME_PREFIX = "flavor_edit_name:"
-CBD_FLAVOR_EDIT_PHOTO_PREFIX = "flavor_edit_photo:"
-CBD_FLAVOR_EDIT_BACK = "flavor_edit_back"
-
-# Вкусы товара — инлайн под сообщением (добавление товара)
-CBD_ADD_FLAVOR_SELECT_PREFIX = "add_flavor_select:"
-CBD_ADD_FLAVOR_NEW = "add_flavor_new"
-CBD_ADD_FLAVOR_DONE = "add_flavor_done"
-
-# Вкусы товара — инлайн под сообщением (редактирование товара)
-CBD_PRODUCT_EDIT_FLAVOR_PREFIX = "product_edit_flavor:"
-CBD_EDIT_FLAVOR_ADD_PREFIX = "edit_flavor_add:"
-CBD_PRODUCT_EDIT_FLAVORS_BACK = "product_edit_flavors_back"
-
-# Категории: удаление и редактирование
-CBD_CATEGORY_DELETE_PREFIX = "category_delete:"
-CBD_CATEGORY_DELETE_CANCEL = "category_delete_cancel"
-CBD_CATEGORY_DELETE_CONFIRM_PREFIX = "category_delete_confirm:"
-CBD_CATEGORY_EDIT_PREFIX = "category_edit:"
-CBD_CATEGORY_EDIT_CANCEL = "category_edit_cancel"
-CBD_CATEGORY_EDIT_FIELD_NAME = "category_edit_field:name"
-CBD_CATEGORY_EDIT_FIELD_IMAGE = "category_edit_field:image"
-# Выбор категории для товара (создание/редактирование)
-CBD_PRODUCT_SELECT_CATEGORY_PREFIX = "product_select_category:"
-
-
-def inline_delete_product_keyboard(items: list[tuple[int, str]]) -> InlineKeyboardMarkup:
-    """Клавиатура выбора товара для удаления. items — список (id, название)."""
+from bot.callbacks import Action, CategoryField, ProductField, pack
+
+# Сколько разных кнопок держать в кэше (строки списков товаров, вкусов, категорий)
+BUTTON_CACHE_SIZE = 4096
+# Клавиатуры, зависящие от одного id (вкус, категория)
+MARKUP_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=BUTTON_CACHE_SIZE)
+def _button(text: str, action: Action, arg: int | None = None) -> InlineKeyboardButton:
+    return InlineKeyboardButton(text=text, callback_data=pack(action, arg))
+
+
+def inline_delete_product_keyboard(
+    items: list[tuple[int, str]], selected_ids: set[int] = frozenset()
+) -> InlineKeyboardMarkup:
+    """Клавиатура выбора товаров для удаления (несколько сразу). items — список (id, название)."""
     buttons = [
-        [InlineKeyboardButton(text=f"🗑 {name} (ID: {id_})", callback_data=f"{CBD_PRODUCT_DELETE_PREFIX}{id_}")]
+        [_button(
+            f"✓ {name} (ID: {id_})" if id_ in selected_ids else f"🗑 {name} (ID: {id_})",
+            Action.PRODUCT_DELETE_TOGGLE,
+            id_,
+        )]
         for id_, name in items
     ]
-    buttons.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_PRODUCT_DELETE_CANCEL)])
+    if selected_ids:
+        buttons.append([_button(f"🗑 Удалить выбранные ({len(selected_ids)})", Action.PRODUCT_DELETE_SELECTED)])
+    buttons.append([_button("❌ Отмена", Action.PRODUCT_DELETE_CANCEL)])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def inline_confirm_delete_product_keyboard(item_id: int) -> InlineKeyboardMarkup:
-    """Клавиатура подтверждения удаления товара: Да, удалить / Отмена."""
+@cache
+def inline_confirm_delete_product_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура подтверждения удаления выбранных товаров: Да, удалить / Отмена."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="✅ Да, удалить", callback_data=f"{CBD_PRODUCT_DELETE_CONFIRM_PREFIX}{item_id}"),
-                InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_PRODUCT_DELETE_CANCEL),
+                _button("✅ Да, удалить", Action.PRODUCT_DELETE_CONFIRM),
+                _button("❌ Отмена", Action.PRODUCT_DELETE_CANCEL),
             ],
         ]
     )
@@ -66,48 +57,73 @@ def inline_confirm_delete_product_keyboard(item_id: int) -> InlineKeyboardMarkup
 def inline_edit_product_start_keyboard(items: list[tuple[int, str]]) -> InlineKeyboardMarkup:
     """Клавиатура выбора товара для редактирования. items — список (id, название)."""
     buttons = [
-        [InlineKeyboardButton(text=f"✏️ {name} (ID: {id_})", callback_data=f"{CBD_PRODUCT_EDIT_PREFIX}{id_}")]
+        [_button(f"✏️ {name} (ID: {id_})", Action.PRODUCT_EDIT, id_)]
+        for id_, name in items
+    ]
+    buttons.append([_button("☑️ Несколько товаров", Action.PRODUCT_BULK_START)])
+    buttons.append([_button("❌ Отмена", Action.PRODUCT_EDIT_CANCEL)])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def inline_bulk_products_keyboard(
+    items: list[tuple[int, str]], selected_ids: set[int]
+) -> InlineKeyboardMarkup:
+    """Массовое редактирование: отметка товаров и действия над выбранными (категория, скидка)."""
+    buttons = [
+        [_button(
+            f"✓ {name} (ID: {id_})" if id_ in selected_ids else f"{name} (ID: {id_})",
+            Action.PRODUCT_BULK_TOGGLE,
+            id_,
+        )]
         for id_, name in items
     ]
-    buttons.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_PRODUCT_EDIT_CANCEL)])
+    if selected_ids:
+        buttons.append([
+            _button(f"📂 Категория ({len(selected_ids)})", Action.PRODUCT_BULK_MOVE),
+            _button(f"🏷 Скидка ({len(selected_ids)})", Action.PRODUCT_BULK_DISCOUNT),
+        ])
+    buttons.append([_button("❌ Отмена", Action.PRODUCT_EDIT_CANCEL)])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@cache
 def inline_edit_product_fields_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура к сообщению «Что изменить?» (под сообщением)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="📝 Название", callback_data=CBD_EDIT_NAME),
-                InlineKeyboardButton(text="📄 Описание", callback_data=CBD_EDIT_DESCRIPTION),
+                _button("📝 Название", Action.PRODUCT_EDIT_FIELD, ProductField.NAME),
+                _button("📄 Описание", Action.PRODUCT_EDIT_FIELD, ProductField.DESCRIPTION),
             ],
             [
-                InlineKeyboardButton(text="🖼 Картинка", callback_data=CBD_EDIT_IMAGE),
-                InlineKeyboardButton(text="🍬 Вкусы", callback_data=CBD_EDIT_FLAVORS),
+                _button("🖼 Картинка", Action.PRODUCT_EDIT_FIELD, ProductField.IMAGE),
+                _button("🍬 Вкусы", Action.PRODUCT_EDIT_FIELD, ProductField.FLAVORS),
             ],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_PRODUCT_EDIT_CANCEL)],
+            [_button("❌ Отмена", Action.PRODUCT_EDIT_CANCEL)],
         ]
     )
 
 
+@cache
 def inline_edit_cancel_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура «Отмена» к сообщениям ввода (название, описание, фото, вкус)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_PRODUCT_EDIT_CANCEL)]
+            [_button("❌ Отмена", Action.PRODUCT_EDIT_CANCEL)]
         ]
     )
 
 
+@lru_cache(maxsize=MARKUP_CACHE_SIZE)
 def inline_edit_flavor_keyboard(flavor_id: int) -> InlineKeyboardMarkup:
     """Клавиатура под сообщением «Вкус: … Что изменить?»: название, фото, назад."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="📝 Название", callback_data=f"{CBD_FLAVOR_EDIT_NAME_PREFIX}{flavor_id}"),
-                InlineKeyboardButton(text="🖼 Фото", callback_data=f"{CBD_FLAVOR_EDIT_PHOTO_PREFIX}{flavor_id}"),
+                _button("📝 Название", Action.FLAVOR_EDIT_NAME, flavor_id),
+                _button("🖼 Фото", Action.FLAVOR_EDIT_PHOTO, flavor_id),
             ],
-            [InlineKeyboardButton(text="❌ Назад", callback_data=CBD_FLAVOR_EDIT_BACK)],
+            [_button("❌ Назад", Action.FLAVOR_EDIT_BACK)],
         ]
     )
 
@@ -123,10 +139,10 @@ def inline_flavors_keyboard_add(flavors: list, selected_ids: set[int]) -> Inline
             continue
         seen_ids.add(f.id)
         text = f"✓ {f.name}" if f.id in selected_ids else f.name
-        buttons.append([InlineKeyboardButton(text=text, callback_data=f"{CBD_ADD_FLAVOR_SELECT_PREFIX}{f.id}")])
+        buttons.append([_button(text, Action.ADD_FLAVOR_SELECT, f.id)])
     buttons.append([
-        InlineKeyboardButton(text="🍬 Добавить вкус", callback_data=CBD_ADD_FLAVOR_NEW),
-        InlineKeyboardButton(text="✅ Готово", callback_data=CBD_ADD_FLAVOR_DONE),
+        _button("🍬 Добавить вкус", Action.ADD_FLAVOR_NEW),
+        _button("✅ Готово", Action.ADD_FLAVOR_DONE),
     ])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
@@ -134,20 +150,21 @@ def inline_flavors_keyboard_add(flavors: list, selected_ids: set[int]) -> Inline
 def inline_delete_category_keyboard(categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
     """Клавиатура выбора категории для удаления. categories — список (id, название)."""
     buttons = [
-        [InlineKeyboardButton(text=f"🗑 {name} (ID: {id_})", callback_data=f"{CBD_CATEGORY_DELETE_PREFIX}{id_}")]
+        [_button(f"🗑 {name} (ID: {id_})", Action.CATEGORY_DELETE, id_)]
         for id_, name in categories
     ]
-    buttons.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_CATEGORY_DELETE_CANCEL)])
+    buttons.append([_button("❌ Отмена", Action.CATEGORY_DELETE_CANCEL)])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=MARKUP_CACHE_SIZE)
 def inline_confirm_delete_category_keyboard(category_id: int) -> InlineKeyboardMarkup:
     """Клавиатура подтверждения удаления категории."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="✅ Да, удалить", callback_data=f"{CBD_CATEGORY_DELETE_CONFIRM_PREFIX}{category_id}"),
-                InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_CATEGORY_DELETE_CANCEL),
+                _button("✅ Да, удалить", Action.CATEGORY_DELETE_CONFIRM, category_id),
+                _button("❌ Отмена", Action.CATEGORY_DELETE_CANCEL),
             ],
         ]
     )
@@ -156,31 +173,33 @@ def inline_confirm_delete_category_keyboard(category_id: int) -> InlineKeyboardM
 def inline_edit_category_start_keyboard(categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
     """Клавиатура выбора категории для редактирования."""
     buttons = [
-        [InlineKeyboardButton(text=f"✏️ {name} (ID: {id_})", callback_data=f"{CBD_CATEGORY_EDIT_PREFIX}{id_}")]
+        [_button(f"✏️ {name} (ID: {id_})", Action.CATEGORY_EDIT, id_)]
         for id_, name in categories
     ]
-    buttons.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_CATEGORY_EDIT_CANCEL)])
+    buttons.append([_button("❌ Отмена", Action.CATEGORY_EDIT_CANCEL)])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@cache
 def inline_edit_category_fields_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура «Что изменить у категории?»: название или картинка."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="📝 Название", callback_data=CBD_CATEGORY_EDIT_FIELD_NAME),
-                InlineKeyboardButton(text="🖼 Картинка", callback_data=CBD_CATEGORY_EDIT_FIELD_IMAGE),
+                _button("📝 Название", Action.CATEGORY_EDIT_FIELD, CategoryField.NAME),
+                _button("🖼 Картинка", Action.CATEGORY_EDIT_FIELD, CategoryField.IMAGE),
             ],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_CATEGORY_EDIT_CANCEL)],
+            [_button("❌ Отмена", Action.CATEGORY_EDIT_CANCEL)],
         ]
     )
 
 
+@cache
 def inline_edit_category_cancel_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура «Отмена» при вводе названия/картинки категории."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="❌ Отмена", callback_data=CBD_CATEGORY_EDIT_CANCEL)]
+            [_button("❌ Отмена", Action.CATEGORY_EDIT_CANCEL)]
         ]
     )
 
@@ -188,7 +207,7 @@ def inline_edit_category_cancel_keyboard() -> InlineKeyboardMarkup:
 def inline_select_category_keyboard(categories: list) -> InlineKeyboardMarkup:
     """Клавиатура выбора категории для товара (создание/редактирование). categories — список Category."""
     buttons = [
-        [InlineKeyboardButton(text=c.name, callback_data=f"{CBD_PRODUCT_SELECT_CATEGORY_PREFIX}{c.id}")]
+        [_button(c.name, Action.PRODUCT_SELECT_CATEGORY, c.id)]
         for c in categories
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
@@ -204,9 +223,9 @@ def inline_flavors_keyboard_edit(item_flavors: list, product_id: int) -> InlineK
         if f.id in seen_ids:
             continue
         seen_ids.add(f.id)
-        buttons.append([InlineKeyboardButton(text=f.name, callback_data=f"{CBD_PRODUCT_EDIT_FLAVOR_PREFIX}{f.id}")])
+        buttons.append([_button(f.name, Action.PRODUCT_EDIT_FLAVOR, f.id)])
     buttons.append([
-        InlineKeyboardButton(text="🍬 Добавить вкус", callback_data=f"{CBD_EDIT_FLAVOR_ADD_PREFIX}{product_id}"),
-        InlineKeyboardButton(text="◀️ Назад", callback_data=CBD_PRODUCT_EDIT_FLAVORS_BACK),
+        _button("🍬 Добавить вкус", Action.EDIT_FLAVOR_ADD, product_id),
+        _button("◀️ Назад", Action.PRODUCT_EDIT_FLAVORS_BACK),
     ])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
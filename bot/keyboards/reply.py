@@ -1,4 +1,12 @@
-"""Reply-клавиатуры."""
+"""Reply-клавиатуры.
+
+Постоянные клавиатуры собираются один раз (functools.cache) и отдаются одним и
+тем же объектом — pydantic-дерево не строится заново на каждое сообщение.
+Возвращённую клавиатуру нельзя менять на месте. В клавиатурах со списком
+вкусов кэшируются кнопки (_button), заново создаются только списки строк.
+"""
+from functools import cache, lru_cache
+
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, WebAppInfo
 
 
@@ -37,7 +45,16 @@ BTN_CATEGORY_EDIT_IMAGE = "🖼 Картинка"
 # Mini App для обычных пользователей
 BTN_OPEN_SHOP = "🛒 Открыть магазин"
 
+# Сколько разных кнопок (по тексту) держать в кэше
+BUTTON_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=BUTTON_CACHE_SIZE)
+def _button(text: str) -> KeyboardButton:
+    return KeyboardButton(text=text)
+
 
+@lru_cache(maxsize=8)
 def get_user_main_keyboard(webapp_url: str) -> ReplyKeyboardMarkup | None:
     """Клавиатура для обычного пользователя: кнопка «Открыть магазин» (Mini App). Если webapp_url пустой — None."""
     if not webapp_url:
@@ -50,6 +67,7 @@ def get_user_main_keyboard(webapp_url: str) -> ReplyKeyboardMarkup | None:
     )
 
 
+@cache
 def get_admin_main_keyboard() -> ReplyKeyboardMarkup:
     """Главное меню для администратора."""
     return ReplyKeyboardMarkup(
@@ -64,6 +82,7 @@ def get_admin_main_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cache
 def get_courier_main_keyboard() -> ReplyKeyboardMarkup:
     """Главное меню для курьера (только просмотр заказов)."""
     return ReplyKeyboardMarkup(
@@ -81,6 +100,7 @@ def get_courier_main_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cache
 def get_manage_products_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура подменю «Управление товарами»."""
     return ReplyKeyboardMarkup(
@@ -96,6 +116,7 @@ def get_manage_products_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cache
 def get_manage_categories_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура подменю «Управление категориями»."""
     return ReplyKeyboardMarkup(
@@ -111,6 +132,7 @@ def get_manage_categories_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cache
 def get_manage_orders_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура подменю «Управление заказами» (только просмотр заказов)."""
     return ReplyKeyboardMarkup(
@@ -129,6 +151,7 @@ def get_manage_orders_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cache
 def get_edit_product_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура выбора поля при редактировании товара (по одному)."""
     return ReplyKeyboardMarkup(
@@ -145,11 +168,9 @@ def get_product_flavors_keyboard_add(flavors: list, selected_ids: set | None = N
     """Клавиатура выбора вкусов при добавлении товара: все вкусы + «Добавить вкус» + «Готово».
     flavors — список Flavor (id, name); selected_ids — множество выбранных id (для пометки опционально).
     """
-    rows = []
-    for f in flavors:
-        rows.append([KeyboardButton(text=f.name)])
-    rows.append([KeyboardButton(text=BTN_ADD_FLAVOR)])
-    rows.append([KeyboardButton(text=BTN_FLAVORS_DONE)])
+    rows = [[_button(f.name)] for f in flavors]
+    rows.append([_button(BTN_ADD_FLAVOR)])
+    rows.append([_button(BTN_FLAVORS_DONE)])
     return ReplyKeyboardMarkup(keyboard=rows, resize_keyboard=True)
 
 
@@ -157,9 +178,7 @@ def get_product_flavors_keyboard_edit(flavors: list) -> ReplyKeyboardMarkup:
     """Клавиатура вкусов товара при редактировании: вкусы товара + «Добавить вкус» + «Назад».
     flavors — список Flavor (id, name) у данного товара.
     """
-    rows = []
-    for f in flavors:
-        rows.append([KeyboardButton(text=f.name)])
-    rows.append([KeyboardButton(text=BTN_ADD_FLAVOR)])
-    rows.append([KeyboardButton(text=BTN_FLAVORS_BACK)])
+    rows = [[_button(f.name)] for f in flavors]
+    rows.append([_button(BTN_ADD_FLAVOR)])
+    rows.append([_button(BTN_FLAVORS_BACK)])
     return ReplyKeyboardMarkup(keyboard=rows, resize_keyboard=True)
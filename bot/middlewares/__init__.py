@@ -1,4 +1,5 @@
 """Middlewares для бота."""
 from bot.middlewares.db import DbSessionMiddleware
+from bot.middlewares.role import RoleMiddleware
 
-__all__ = ["DbSessionMiddleware"]
+__all__ = ["DbSessionMiddleware", "RoleMiddleware"]
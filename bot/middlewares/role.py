@@ -0,0 +1,29 @@
+"""Middleware: роль пользователя один раз на апдейт."""
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.roles import RoleResolver
+
+
+class RoleMiddleware(BaseMiddleware):
+    """Кладёт в data['role'] роль автора апдейта и в data['roles'] — сам RoleResolver.
+
+    Регистрируется как outer-middleware на dp.update: дальше роль проверяют
+    фильтры роутеров (bot.filters.RoleFilter), не заглядывая в конфиг и БД.
+    """
+
+    def __init__(self, resolver: RoleResolver) -> None:
+        self.resolver = resolver
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        data["role"] = await self.resolver.resolve(user.id if user else None)
+        data["roles"] = self.resolver
+        return await handler(event, data)
@@ -0,0 +1,84 @@
+"""Роли пользователей бота: администратор, курьер, покупатель.
+
+Роль определяется один раз на апдейт (bot.middlewares.role.RoleMiddleware) и
+дальше приходит в фильтры и хендлеры как data["role"]. Источники:
+
+* TELEGRAM_ADMIN_IDS / TELEGRAM_COURIERS_IDS — frozenset в BotConfig;
+* таблица staff — сотрудники, назначенные из бота без перезапуска. Таблица
+  маленькая, поэтому кэшируется целиком и перечитывается не чаще раза в
+  staff_cache_ttl секунд (после изменения из бота — сразу, invalidate()).
+
+Из нескольких источников берётся старшая роль: админ из окружения остаётся
+админом, даже если в staff он записан курьером.
+"""
+import asyncio
+import logging
+from enum import StrEnum
+from time import monotonic
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from bot.config import BotConfig
+from database.db import new_async_session
+from models.staff import Staff
+
+logger = logging.getLogger(__name__)
+
+
+class Role(StrEnum):
+    ADMIN = "admin"
+    COURIER = "courier"
+    CUSTOMER = "customer"
+
+
+# Роли, которые можно назначить через таблицу staff
+STAFF_ROLES = (Role.ADMIN, Role.COURIER)
+
+
+class RoleResolver:
+    def __init__(
+        self,
+        config: BotConfig,
+        session_factory: async_sessionmaker[AsyncSession] = new_async_session,
+    ) -> None:
+        self.admin_ids = frozenset(config.admin_ids)
+        self.courier_ids = frozenset(config.courier_ids)
+        self.ttl = config.staff_cache_ttl
+        self._session_factory = session_factory
+        self._staff: dict[int, Role] = {}
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Перечитать staff при следующем апдейте (после изменения из бота)."""
+        self._expires_at = 0.0
+
+    async def _staff_roles(self) -> dict[int, Role]:
+        if monotonic() < self._expires_at:
+            return self._staff
+        async with self._lock:
+            # Пока ждали блокировку, таблицу мог перечитать другой апдейт
+            if monotonic() < self._expires_at:
+                return self._staff
+            try:
+                async with self._session_factory() as session:
+                    rows = (await session.execute(select(Staff.user_id, Staff.role))).all()
+                self._staff = {user_id: Role(role) for user_id, role in rows}
+            except Exception:
+                # Роли из окружения работают и без БД; старый кэш лучше пустого
+                logger.exception("Не удалось прочитать таблицу staff")
+            self._expires_at = monotonic() + self.ttl
+        return self._staff
+
+    async def resolve(self, user_id: int | None) -> Role:
+        if user_id is None:
+            return Role.CUSTOMER
+        if user_id in self.admin_ids:
+            return Role.ADMIN
+        staff_role = (await self._staff_roles()).get(user_id)
+        if staff_role is not None:
+            return staff_role
+        if user_id in self.courier_ids:
+            return Role.COURIER
+        return Role.CUSTOMER
@@ -1,8 +1,9 @@
 """Сервис каталога товаров и вкусов."""
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.flavor import Flavor
+from catalog import facets, rows
+from catalog.rows import ItemRow
+from database import statements
 from models.items import Item
 
 
@@ -14,18 +15,25 @@ class CatalogService:
 
     async def get_flavors(self) -> list[tuple[int, str]]:
         """Список вкусов: [(id, name), ...]."""
-        result = await self.session.execute(select(Flavor.id, Flavor.name).order_by(Flavor.name))
+        result = await self.session.execute(statements.FLAVOR_ROWS_ORDERED)
         return list(result.all())
 
-    async def get_items_by_flavor(self, flavor_id: int | None) -> list[Item]:
-        """Товары по вкусу. flavor_id=None — все товары."""
-        q = select(Item)
-        if flavor_id is not None:
-            q = q.join(Item.flavors).where(Flavor.id == flavor_id)
-        result = await self.session.execute(q)
-        return list(result.scalars().unique().all())
+    async def get_items_by_flavor(self, flavor_id: int | None) -> list[ItemRow]:
+        """Товары по вкусу (только для чтения, см. catalog.rows). flavor_id=None — все товары.
+
+        Если фасетный индекс загружен (бот запущен вместе с API), id товаров берутся
+        из битмапа вкуса, без join с item_flavor_association.
+        """
+        if flavor_id is None:
+            return await self.session.run_sync(rows.items)
+        if facets.index.loaded:
+            item_ids = list(facets.iter_ids(facets.index.match([flavor_id])))
+        else:
+            item_ids = list(
+                await self.session.scalars(statements.ITEM_IDS_BY_FLAVOR, {"flavor_id": flavor_id})
+            )
+        return await self.session.run_sync(rows.items, item_ids)
 
     async def get_item_by_id(self, item_id: int) -> Item | None:
         """Товар по ID."""
-        result = await self.session.execute(select(Item).where(Item.id == item_id))
-        return result.scalar_one_or_none()
+        return await self.session.get(Item, item_id)
@@ -1,9 +1,8 @@
 """Сервис категорий для бота (работа с БД через сессию)."""
-import os
-
-from sqlalchemy import select
-
-from config import UPLOAD_DIR
+from catalog import rows
+from catalog.changes import touch_category
+from catalog.rows import CategoryRow
+from core import files, images
 from models.category import Category
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,16 +11,18 @@ class CategoryService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_categories(self) -> list[Category]:
-        result = await self.session.execute(select(Category).order_by(Category.name))
-        return list(result.scalars().all())
+    async def get_categories(self) -> list[CategoryRow]:
+        return await self.session.run_sync(rows.categories)
 
     async def get_category(self, category_id: int) -> Category | None:
         return await self.session.get(Category, category_id)
 
     async def create_category(self, name: str, photo_filename: str) -> Category:
-        category = Category(name=name.strip(), photo=photo_filename)
+        category = Category(name=name.strip())
+        category.set_photo(photo_filename, await images.describe(files.upload_path(photo_filename)))
         self.session.add(category)
+        await self.session.flush()
+        await touch_category(self.session, category.id)
         await self.session.commit()
         await self.session.refresh(category)
         return category
@@ -31,9 +32,8 @@ class CategoryService:
         if not category:
             return False
         if category.photo:
-            file_path = os.path.join(UPLOAD_DIR, category.photo)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            files.remove_after_commit(self.session, files.upload_path(category.photo))
+        await touch_category(self.session, category_id)
         await self.session.delete(category)
         await self.session.commit()
         return True
@@ -43,6 +43,7 @@ class CategoryService:
         if not category:
             return False
         category.name = name.strip()
+        await touch_category(self.session, category_id)
         await self.session.commit()
         return True
 
@@ -51,9 +52,8 @@ class CategoryService:
         if not category:
             return False
         if category.photo:
-            old_path = os.path.join(UPLOAD_DIR, category.photo)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        category.photo = photo_filename
+            files.remove_after_commit(self.session, files.upload_path(category.photo))
+        category.set_photo(photo_filename, await images.describe(files.upload_path(photo_filename)))
+        await touch_category(self.session, category_id)
         await self.session.commit()
         return True
@@ -1,13 +1,16 @@
 """Сервис товаров: добавление, удаление, редактирование (логика бэкенда для бота)."""
-import os
+from typing import Iterable
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, delete, update
 
-from config import UPLOAD_DIR
+from catalog import rows
+from catalog.changes import touch_items, touch_item_flavors, touch_flavor
+from catalog.rows import CategoryRow, FlavorRow, ItemRow
+from core import files, images
+from database import statements
 from models.category import Category
 from models.flavor import Flavor
-from models.items import Item
+from models.items import Item, item_flavor_association
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -19,40 +22,26 @@ class ItemService:
 
     async def get_item(self, item_id: int) -> Item | None:
         """Товар по ID с подгрузкой вкусов и категории."""
-        result = await self.session.execute(
-            select(Item)
-            .where(Item.id == item_id)
-            .options(selectinload(Item.flavors), selectinload(Item.category))
-        )
+        result = await self.session.execute(statements.ITEM_BY_ID, {"item_id": item_id})
         return result.scalar_one_or_none()
 
-    async def get_items(self) -> list[Item]:
-        """Список всех товаров с вкусами и категорией."""
-        result = await self.session.execute(
-            select(Item)
-            .options(selectinload(Item.flavors), selectinload(Item.category))
-            .order_by(Item.id)
-        )
-        return list(result.scalars().unique().all())
+    async def get_items(self) -> list[ItemRow]:
+        """Список всех товаров с вкусами и категорией (только для чтения, см. catalog.rows)."""
+        return await self.session.run_sync(rows.items)
 
-    async def get_flavors(self) -> list[Flavor]:
+    async def get_flavors(self) -> list[FlavorRow]:
         """Список всех вкусов."""
-        result = await self.session.execute(select(Flavor).order_by(Flavor.name))
-        return list(result.scalars().all())
+        return await self.session.run_sync(rows.flavors)
 
-    async def get_flavors_by_ids(self, flavor_ids: list[int]) -> list[Flavor]:
+    async def get_flavors_by_ids(self, flavor_ids: list[int]) -> list[FlavorRow]:
         """Список вкусов по списку id (только вкусы, относящиеся к выбранным id)."""
         if not flavor_ids:
             return []
-        result = await self.session.execute(
-            select(Flavor).where(Flavor.id.in_(flavor_ids)).order_by(Flavor.name)
-        )
-        return list(result.scalars().all())
+        return await self.session.run_sync(rows.flavors_by_ids, flavor_ids)
 
-    async def get_categories(self) -> list[Category]:
+    async def get_categories(self) -> list[CategoryRow]:
         """Список всех категорий."""
-        result = await self.session.execute(select(Category).order_by(Category.name))
-        return list(result.scalars().all())
+        return await self.session.run_sync(rows.categories)
 
     async def create_item(
         self,
@@ -64,44 +53,95 @@ class ItemService:
         discount: float | None = None,
         flavor_ids: list[int] | None = None,
     ) -> Item:
-        """Создать товар. category_id обязателен. photo_filename — имя файла в UPLOAD_DIR."""
-        selected_flavors: list[Flavor] = []
-        if flavor_ids:
-            result = await self.session.execute(select(Flavor).where(Flavor.id.in_(flavor_ids)))
-            selected_flavors = list(result.scalars().all())
+        """Создать товар. category_id обязателен. photo_filename — имя файла в UPLOAD_DIR.
+
+        Вкусы назначаются через set_flavors в той же транзакции; несуществующие id
+        вкусов пропускаются.
+        """
         item = Item(
             name=name,
             description=description,
             price=price,
             discount=discount,
             category_id=category_id,
-            photo=photo_filename,
-            flavors=selected_flavors,
         )
+        item.set_photo(photo_filename, await images.describe(files.upload_path(photo_filename)))
         self.session.add(item)
+        await self.session.flush()
+        touch_items(self.session, item.id)
+        if flavor_ids:
+            existing = await self.session.scalars(statements.FLAVOR_IDS_BY_IDS, {"ids": flavor_ids})
+            await self.set_flavors(item.id, existing, commit=False)
         await self.session.commit()
         await self.session.refresh(item)
         return item
 
     async def delete_item(self, item_id: int) -> bool:
-        """Удалить товар и файл фото. Возвращает True, если товар был найден."""
+        """Удалить товар и (после commit) файл фото. Возвращает True, если товар был найден."""
         item = await self.get_item(item_id)
         if not item:
             return False
         if item.photo:
-            file_path = os.path.join(UPLOAD_DIR, item.photo)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            files.remove_after_commit(self.session, files.upload_path(item.photo))
         await self.session.delete(item)
+        touch_items(self.session, item_id)
         await self.session.commit()
         return True
 
+    # --- Массовые операции: один UPDATE/DELETE ... WHERE id IN (...) на пакет ---
+    # Витрина, журнал изменений и SSE обновляются один раз на commit (catalog.changes).
+
+    async def delete_items(self, item_ids: Iterable[int]) -> list[int]:
+        """Удалить товары одним DELETE; файлы фото удаляются после commit. Возвращает удалённые id."""
+        ids = set(item_ids)
+        if not ids:
+            return []
+        rows = (
+            await self.session.execute(select(Item.id, Item.photo).where(Item.id.in_(ids)))
+        ).all()
+        if not rows:
+            return []
+        deleted = sorted(item_id for item_id, _ in rows)
+        await self.session.execute(
+            delete(Item).where(Item.id.in_(deleted)).execution_options(synchronize_session=False)
+        )
+        files.remove_after_commit(self.session, *(files.upload_path(photo) for _, photo in rows if photo))
+        touch_items(self.session, *deleted)
+        await self.session.commit()
+        return deleted
+
+    async def move_items(self, item_ids: Iterable[int], category_id: int) -> list[int] | None:
+        """Перенести товары в категорию одним UPDATE. None — категории нет; иначе изменённые id."""
+        ids = set(item_ids)
+        if not await self.session.get(Category, category_id):
+            return None
+        if not ids:
+            return []
+        return await self._bulk_update(ids, category_id=category_id)
+
+    async def set_discount(self, item_ids: Iterable[int], discount: float | None) -> list[int]:
+        """Задать (или снять при None) скидку в процентах товарам одним UPDATE. Возвращает изменённые id."""
+        ids = set(item_ids)
+        if not ids:
+            return []
+        return await self._bulk_update(ids, discount=discount)
+
+    async def _bulk_update(self, ids: set[int], **values) -> list[int]:
+        result = await self.session.execute(
+            update(Item).where(Item.id.in_(ids)).values(**values).returning(Item.id)
+        )
+        updated = sorted(result.scalars())
+        touch_items(self.session, *updated)
+        await self.session.commit()
+        return updated
+
     async def update_name(self, item_id: int, name: str) -> bool:
         """Обновить название товара."""
         item = await self.get_item(item_id)
         if not item:
             return False
         item.name = name
+        touch_items(self.session, item_id)
         await self.session.commit()
         return True
 
@@ -111,6 +151,7 @@ class ItemService:
         if not item:
             return False
         item.description = description
+        touch_items(self.session, item_id)
         await self.session.commit()
         return True
 
@@ -123,22 +164,67 @@ class ItemService:
         if not category:
             return False
         item.category_id = category_id
+        touch_items(self.session, item_id)
         await self.session.commit()
         return True
 
     async def update_photo(self, item_id: int, new_photo_filename: str) -> bool:
-        """Обновить фото товара. Старый файл удаляется."""
+        """Обновить фото товара. Старый файл удаляется после commit."""
         item = await self.get_item(item_id)
         if not item:
             return False
         if item.photo:
-            old_path = os.path.join(UPLOAD_DIR, item.photo)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        item.photo = new_photo_filename
+            files.remove_after_commit(self.session, files.upload_path(item.photo))
+        item.set_photo(new_photo_filename, await images.describe(files.upload_path(new_photo_filename)))
+        touch_items(self.session, item_id)
         await self.session.commit()
         return True
 
+    async def set_flavors(
+        self, item_id: int, flavor_ids: Iterable[int], commit: bool = True
+    ) -> tuple[set[int], set[int]] | None:
+        """Заменить набор вкусов товара на flavor_ids.
+
+        Разница с текущими связями применяется одним INSERT и одним DELETE в одной
+        транзакции (commit=False — без commit, в транзакции вызывающего).
+        Возвращает (добавленные, убранные) id или None, если нет товара или вкуса.
+        """
+        desired = set(flavor_ids)
+        item = await self.session.get(Item, item_id)
+        if not item:
+            return None
+        if desired:
+            found = await self.session.scalars(statements.FLAVOR_IDS_BY_IDS, {"ids": list(desired)})
+            if len(set(found)) != len(desired):
+                return None
+        current = set(
+            await self.session.scalars(
+                select(item_flavor_association.c.flavor_id).where(
+                    item_flavor_association.c.item_id == item_id
+                )
+            )
+        )
+        added, removed = desired - current, current - desired
+        if added:
+            await self.session.execute(
+                insert(item_flavor_association),
+                [{"item_id": item_id, "flavor_id": flavor_id} for flavor_id in sorted(added)],
+            )
+        if removed:
+            await self.session.execute(
+                delete(item_flavor_association).where(
+                    item_flavor_association.c.item_id == item_id,
+                    item_flavor_association.c.flavor_id.in_(removed),
+                )
+            )
+        if added or removed:
+            # Связи менялись в обход ORM — загруженная коллекция item.flavors устарела
+            self.session.expire(item, ["flavors"])
+            touch_item_flavors(self.session, item_id)
+        if commit:
+            await self.session.commit()
+        return added, removed
+
     async def add_flavor(self, item_id: int, flavor_id: int) -> bool:
         """Добавить вкус к товару (по одному)."""
         item = await self.get_item(item_id)
@@ -150,6 +236,7 @@ class ItemService:
         if any(f.id == flavor.id for f in item.flavors):
             return True  # уже есть
         item.flavors.append(flavor)
+        touch_item_flavors(self.session, item_id)
         await self.session.commit()
         return True
 
@@ -163,6 +250,7 @@ class ItemService:
             return False
         if flavor in item.flavors:
             item.flavors.remove(flavor)
+            touch_item_flavors(self.session, item_id)
             await self.session.commit()
         return True
 
@@ -177,8 +265,11 @@ class ItemService:
 
     async def create_flavor(self, name: str, photo_filename: str) -> Flavor:
         """Создать новый вкус. photo_filename — имя файла в UPLOAD_DIR."""
-        flavor = Flavor(name=name.strip(), photo=photo_filename)
+        flavor = Flavor(name=name.strip())
+        flavor.set_photo(photo_filename, await images.describe(files.upload_path(photo_filename)))
         self.session.add(flavor)
+        await self.session.flush()
+        await touch_flavor(self.session, flavor.id)
         await self.session.commit()
         await self.session.refresh(flavor)
         return flavor
@@ -189,18 +280,18 @@ class ItemService:
         if not flavor:
             return False
         flavor.name = name.strip()
+        await touch_flavor(self.session, flavor_id)
         await self.session.commit()
         return True
 
     async def update_flavor_photo(self, flavor_id: int, photo_filename: str) -> bool:
-        """Изменить фото вкуса. Старый файл удаляется."""
+        """Изменить фото вкуса. Старый файл удаляется после commit."""
         flavor = await self.session.get(Flavor, flavor_id)
         if not flavor:
             return False
         if flavor.photo:
-            old_path = os.path.join(UPLOAD_DIR, flavor.photo)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        flavor.photo = photo_filename
+            files.remove_after_commit(self.session, files.upload_path(flavor.photo))
+        flavor.set_photo(photo_filename, await images.describe(files.upload_path(photo_filename)))
+        await touch_flavor(self.session, flavor_id)
         await self.session.commit()
         return True
@@ -0,0 +1,31 @@
+"""Сервис сотрудников: назначение ролей из бота (таблица staff)."""
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from catalog.pricing import utcnow
+from models.staff import Staff
+
+
+class StaffService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_staff(self) -> list[Staff]:
+        result = await self.session.execute(select(Staff).order_by(Staff.role, Staff.user_id))
+        return list(result.scalars().all())
+
+    async def set_role(self, user_id: int, role: str) -> Staff:
+        """Назначить роль (создать сотрудника или сменить роль)."""
+        staff = await self.session.get(Staff, user_id)
+        if staff is None:
+            staff = Staff(user_id=user_id, role=role, created_at=utcnow())
+            self.session.add(staff)
+        else:
+            staff.role = role
+        await self.session.commit()
+        return staff
+
+    async def remove(self, user_id: int) -> bool:
+        result = await self.session.execute(delete(Staff).where(Staff.user_id == user_id))
+        await self.session.commit()
+        return bool(result.rowcount)
@@ -0,0 +1 @@
+"""Витрина каталога: денормализованная модель чтения и её инкрементальное обновление."""
@@ -0,0 +1,191 @@
+"""Журнал изменений каталога и синхронизация «изменения после версии N».
+
+Каждая мутация Item, Flavor, Category и таблицы item_flavor_association пишет
+строку в catalog_changes в той же транзакции (см. catalog.changes). Ответ
+/catalog/changes свёрнут: несколько правок одной строки дают одну запись —
+актуальное состояние (upsert) или надгробие (delete). Изменения связей
+товар—вкус отдаются как upsert товара: его payload уже содержит вкусы.
+
+Номера версий выдаёт счётчик catalog_version (models.catalog.CatalogVersion), а не
+автоинкремент: UPDATE счётчика блокирует его строку до конца транзакции, поэтому
+параллельные записи каталога (PostgreSQL) коммитятся по очереди и в порядке номеров.
+С автоинкрементом транзакция с меньшим номером могла закоммититься позже — клиент,
+уже получивший since=N, её бы не увидел.
+"""
+from collections import defaultdict
+
+from sqlalchemy import select, func, insert, delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.serialization import dumps, json_array, rows_to_json
+from database import statements
+from models.catalog import CatalogChange, CatalogItem, CatalogVersion
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item
+from models.photo import PHOTO_FIELDS
+
+ENTITY_ITEM = "item"
+ENTITY_CATEGORY = "category"
+ENTITY_FLAVOR = "flavor"
+ENTITY_ITEM_FLAVORS = "item_flavors"
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+_COUNTER_ID = 1
+
+
+def _allocate(session: Session, count: int) -> int:
+    """Зарезервировать count версий; вернуть последнюю. Строка счётчика остаётся
+    заблокированной до commit — следующий писатель ждёт здесь."""
+    bump = (
+        update(CatalogVersion)
+        .where(CatalogVersion.id == _COUNTER_ID)
+        .values(version=CatalogVersion.version + count)
+        .execution_options(synchronize_session=False)
+    )
+    if session.execute(bump).rowcount == 0:
+        # Счётчика ещё нет (база до его появления): продолжить с последней записи журнала
+        start = session.execute(statements.CATALOG_VERSION).scalar() or 0
+        session.execute(insert(CatalogVersion).values(id=_COUNTER_ID, version=start + count))
+    return session.execute(
+        select(CatalogVersion.version).where(CatalogVersion.id == _COUNTER_ID)
+    ).scalar_one()
+
+
+def record(session: Session, changes: list[tuple[str, int, str]]) -> int | None:
+    """Записать изменения [(entity, entity_id, op)]. Возвращает новую версию каталога."""
+    if not changes:
+        return None
+    last = _allocate(session, len(changes))
+    first = last - len(changes) + 1
+    session.execute(
+        insert(CatalogChange),
+        [
+            {"version": first + offset, "entity": entity, "entity_id": entity_id, "op": op}
+            for offset, (entity, entity_id, op) in enumerate(changes)
+        ],
+    )
+    return last
+
+
+async def current_version(session: AsyncSession) -> int:
+    return await session.scalar(statements.CATALOG_VERSION) or 0
+
+
+async def ensure_seeded(session: AsyncSession) -> int:
+    """Заполнить пустой журнал upsert-записями всех существующих строк (базовая версия).
+
+    Без этого клиент с since=0 не получил бы данные, созданные до появления журнала.
+    Заодно создаёт строку счётчика версий, если её нет (при запуске, а не в первой
+    записи под нагрузкой). Возвращает число добавленных записей.
+    """
+    if await session.scalar(select(CatalogVersion.id).where(CatalogVersion.id == _COUNTER_ID)) is None:
+        start = await current_version(session)
+        await session.execute(insert(CatalogVersion).values(id=_COUNTER_ID, version=start))
+        await session.commit()
+    if await session.scalar(select(CatalogChange.version).limit(1)) is not None:
+        return 0
+    changes: list[tuple[str, int, str]] = []
+    for entity, id_column in (
+        (ENTITY_CATEGORY, Category.id),
+        (ENTITY_FLAVOR, Flavor.id),
+        (ENTITY_ITEM, Item.id),
+    ):
+        ids = await session.scalars(select(id_column).order_by(id_column))
+        changes.extend((entity, entity_id, OP_UPSERT) for entity_id in ids)
+    if changes:
+        await session.run_sync(record, changes)
+        await session.commit()
+    return len(changes)
+
+
+async def compact(session: AsyncSession) -> int:
+    """Свернуть журнал: оставить только последнюю запись для каждой сущности.
+
+    Безопасно для клиентов: для любого since последняя версия каждой строки сохраняется.
+    Возвращает число удалённых записей.
+    """
+    latest = (
+        select(func.max(CatalogChange.version))
+        .group_by(CatalogChange.entity, CatalogChange.entity_id)
+    )
+    result = await session.execute(
+        delete(CatalogChange).where(CatalogChange.version.not_in(latest))
+    )
+    await session.commit()
+    return result.rowcount or 0
+
+
+async def changes_since(session: AsyncSession, since: int) -> bytes:
+    """Свёрнутые изменения после версии since — готовое JSON-тело ответа.
+
+    {"version", "reset", "items", "categories", "flavors",
+     "deleted": {"items", "categories", "flavors"}}. reset=true — since из будущего
+    (например, база пересоздана): клиенту нужно сбросить кэш и взять since=0.
+    """
+    version = await current_version(session)
+    if since > version:
+        return dumps({"version": version, "reset": True})
+
+    latest = (
+        select(
+            CatalogChange.entity,
+            CatalogChange.entity_id,
+            func.max(CatalogChange.version).label("version"),
+        )
+        .where(CatalogChange.version > since)
+        .group_by(CatalogChange.entity, CatalogChange.entity_id)
+        .subquery()
+    )
+    rows = await session.execute(
+        select(CatalogChange.entity, CatalogChange.entity_id, CatalogChange.op, CatalogChange.version)
+        .join(latest, CatalogChange.version == latest.c.version)
+    )
+    # Последняя операция по каждой строке; связи товар—вкус сворачиваются в сам товар
+    last_ops: dict[tuple[str, int], tuple[int, str]] = {}
+    for entity, entity_id, op, row_version in rows:
+        if entity == ENTITY_ITEM_FLAVORS:
+            entity = ENTITY_ITEM
+        key = (entity, entity_id)
+        if key not in last_ops or last_ops[key][0] < row_version:
+            last_ops[key] = (row_version, op)
+    upserts: dict[str, set[int]] = defaultdict(set)
+    deleted: dict[str, set[int]] = defaultdict(set)
+    for (entity, entity_id), (_, op) in last_ops.items():
+        (deleted if op == OP_DELETE else upserts)[entity].add(entity_id)
+
+    items: list[bytes] = []
+    if upserts[ENTITY_ITEM]:
+        result = await session.execute(
+            select(CatalogItem.payload)
+            .where(CatalogItem.item_id.in_(upserts[ENTITY_ITEM]))
+            .order_by(CatalogItem.item_id)
+        )
+        items = list(result.scalars())
+    categories = b"[]"
+    if upserts[ENTITY_CATEGORY]:
+        result = await session.execute(
+            select(Category.id, Category.name, *Category.photo_columns())
+            .where(Category.id.in_(upserts[ENTITY_CATEGORY]))
+            .order_by(Category.name)
+        )
+        categories = rows_to_json(result, ("id", "name", *PHOTO_FIELDS))
+    flavors = b"[]"
+    if upserts[ENTITY_FLAVOR]:
+        result = await session.execute(
+            select(Flavor.id, Flavor.name, *Flavor.photo_columns())
+            .where(Flavor.id.in_(upserts[ENTITY_FLAVOR]))
+            .order_by(Flavor.id)
+        )
+        flavors = rows_to_json(result, ("id", "name", *PHOTO_FIELDS))
+    tombstones = dumps({
+        "items": sorted(deleted[ENTITY_ITEM]),
+        "categories": sorted(deleted[ENTITY_CATEGORY]),
+        "flavors": sorted(deleted[ENTITY_FLAVOR]),
+    })
+    return (
+        b'{"version":%d,"reset":false,"items":%s,"categories":%s,"flavors":%s,"deleted":%s}'
+        % (version, json_array(items), categories, flavors, tombstones)
+    )
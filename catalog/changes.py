@@ -0,0 +1,153 @@
+"""Учёт изменений каталога внутри транзакции.
+
+Пути записи (routes, ItemService, CategoryService) отмечают затронутые сущности
+через touch_items / touch_item_flavors / touch_category / touch_flavor. Перед
+commit в той же транзакции:
+
+* пересобираются изменённые строки витрины — стоимость пропорциональна числу
+  изменённых товаров, а не размеру каталога;
+* в журнал catalog_changes пишутся upsert/delete для каждой сущности.
+
+После успешного commit дельты публикуются подписчикам SSE (catalog.events) и
+применяются к фасетному индексу (catalog.facets) и отмечаются для статического
+снимка (catalog.snapshot); при откате всё отмеченное отбрасывается.
+"""
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from catalog import changelog, facets, read_model, snapshot
+from catalog.changelog import (
+    ENTITY_CATEGORY,
+    ENTITY_FLAVOR,
+    ENTITY_ITEM,
+    ENTITY_ITEM_FLAVORS,
+    OP_DELETE,
+    OP_UPSERT,
+)
+from catalog.events import broker
+from database import statements
+from models.category import Category
+from models.flavor import Flavor
+from models.items import item_flavor_association
+
+_ITEMS_KEY = "catalog_touched_items"
+_ITEM_FLAVORS_KEY = "catalog_touched_item_flavors"
+_CATEGORIES_KEY = "catalog_touched_categories"
+_FLAVORS_KEY = "catalog_touched_flavors"
+_EVENTS_KEY = "catalog_pending_events"
+_CHANGED_KEY = "catalog_changed"
+_KEYS = (_ITEMS_KEY, _ITEM_FLAVORS_KEY, _CATEGORIES_KEY, _FLAVORS_KEY, _EVENTS_KEY, _CHANGED_KEY)
+
+
+def _info(session: AsyncSession | Session) -> dict:
+    return getattr(session, "sync_session", session).info
+
+
+def touch_items(session: AsyncSession | Session, *item_ids: int) -> None:
+    """Отметить товары как изменённые (созданные, обновлённые или удалённые)."""
+    _info(session).setdefault(_ITEMS_KEY, set()).update(item_ids)
+
+
+def touch_item_flavors(session: AsyncSession | Session, *item_ids: int) -> None:
+    """Отметить изменение набора вкусов товаров (таблица item_flavor_association)."""
+    _info(session).setdefault(_ITEM_FLAVORS_KEY, set()).update(item_ids)
+    touch_items(session, *item_ids)
+
+
+async def touch_category(session: AsyncSession, category_id: int) -> None:
+    """Отметить категорию и её товары. Вызывать до удаления категории."""
+    _info(session).setdefault(_CATEGORIES_KEY, set()).add(category_id)
+    params = {"category_id": category_id}
+    item_ids = await session.scalars(statements.ITEM_IDS_BY_CATEGORY, params)
+    listed_ids = await session.scalars(statements.LISTED_IDS_BY_CATEGORY, params)
+    touch_items(session, *item_ids, *listed_ids)
+
+
+async def touch_flavor(session: AsyncSession, flavor_id: int) -> None:
+    """Отметить вкус и товары с ним. Вызывать до удаления вкуса."""
+    _info(session).setdefault(_FLAVORS_KEY, set()).add(flavor_id)
+    item_ids = await session.scalars(
+        select(item_flavor_association.c.item_id).where(
+            item_flavor_association.c.flavor_id == flavor_id
+        )
+    )
+    touch_items(session, *item_ids)
+
+
+def _apply_categories(session: Session, category_ids: set[int], events: list, log: list) -> None:
+    rows = session.execute(
+        select(Category.id, Category.name, *Category.photo_columns())
+        .where(Category.id.in_(category_ids))
+    ).all()
+    found = {row.id: row for row in rows}
+    for category_id in sorted(category_ids):
+        row = found.get(category_id)
+        if row is None:
+            events.append({"type": "category.delete", "id": category_id})
+            log.append((ENTITY_CATEGORY, category_id, OP_DELETE))
+        else:
+            events.append({
+                "type": "category.upsert",
+                "id": category_id,
+                "category": row._asdict(),
+            })
+            log.append((ENTITY_CATEGORY, category_id, OP_UPSERT))
+
+
+def _apply_flavors(session: Session, flavor_ids: set[int], log: list) -> None:
+    existing = set(session.execute(select(Flavor.id).where(Flavor.id.in_(flavor_ids))).scalars())
+    for flavor_id in sorted(flavor_ids):
+        log.append((ENTITY_FLAVOR, flavor_id, OP_UPSERT if flavor_id in existing else OP_DELETE))
+
+
+def _apply_items(session: Session, item_ids: set[int], events: list, log: list) -> None:
+    refreshed = read_model.refresh_items(session, item_ids)
+    for item_id, payload in refreshed.items():
+        if payload is None:
+            events.append({"type": "item.delete", "id": item_id})
+            log.append((ENTITY_ITEM, item_id, OP_DELETE))
+        else:
+            events.append({"type": "item.upsert", "id": item_id, "item": payload})
+            log.append((ENTITY_ITEM, item_id, OP_UPSERT))
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_changes(session: Session) -> None:
+    item_ids = session.info.pop(_ITEMS_KEY, None)
+    item_flavor_ids = session.info.pop(_ITEM_FLAVORS_KEY, None)
+    category_ids = session.info.pop(_CATEGORIES_KEY, None)
+    flavor_ids = session.info.pop(_FLAVORS_KEY, None)
+    events: list[dict] = []
+    log: list[tuple[str, int, str]] = []
+    if category_ids:
+        _apply_categories(session, category_ids, events, log)
+    if flavor_ids:
+        _apply_flavors(session, flavor_ids, log)
+    if item_flavor_ids:
+        log.extend((ENTITY_ITEM_FLAVORS, item_id, OP_UPSERT) for item_id in sorted(item_flavor_ids))
+    if item_ids:
+        _apply_items(session, item_ids, events, log)
+    version = changelog.record(session, log)
+    if version is not None:
+        session.info[_CHANGED_KEY] = True
+    if events:
+        for payload in events:
+            payload["version"] = version
+        session.info.setdefault(_EVENTS_KEY, []).extend(events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    events = session.info.pop(_EVENTS_KEY, None)
+    if events:
+        facets.index.apply(events)
+        broker.publish(events)
+    if session.info.pop(_CHANGED_KEY, False):
+        snapshot.builder.mark(events or ())
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session: Session, previous_transaction) -> None:
+    for key in _KEYS:
+        session.info.pop(key, None)
@@ -0,0 +1,128 @@
+"""Поток изменений каталога для Server-Sent Events.
+
+Один общий на процесс брокер: события складываются в кольцевой буфер, а все
+подписчики ждут одно и то же asyncio.Event, которое заменяется при каждой
+публикации. Ожидающее соединение не держит ни очереди, ни копий данных —
+только курсор (id последнего отправленного события). Кадры SSE кодируются
+один раз при публикации и отдаются всем соединениям как есть.
+
+id событий — версия каталога (catalog.changelog), в которой они закоммичены:
+все события одного commit публикуются одной пачкой с общим id. Версия хранится
+в БД, поэтому Last-Event-ID клиента остаётся осмысленным после перезапуска
+процесса: при старте брокер получает текущую версию (start), а история до неё
+считается вытесненной — такой клиент получает reset и догружает дельту.
+
+Версии выдаются в порядке commit, но after_commit разных сессий может выполниться
+в другом порядке — пачка с меньшей версией иногда приходит после большей. Поэтому
+подключённое соединение идёт не по версии, а по позиции пачки в истории (порядку
+публикации): опоздавшая пачка отправляется всем, кто её ещё не получил. Её id
+меньше уже отправленного; клиент, переподключившийся с таким Last-Event-ID,
+получит заново всё опубликованное после неё — события идемпотентны.
+
+Брокер свой у каждого процесса: изменения, закоммиченные другим процессом
+(второй воркер, бот на другом хосте), сюда не публикуются.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Any
+
+from core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+HISTORY_SIZE = 1000
+
+
+class CatalogEventBroker:
+    """Рассылка дельт каталога всем SSE-подписчикам процесса."""
+
+    def __init__(self, history_size: int = HISTORY_SIZE) -> None:
+        # (позиция, версия, кадры всех событий одного commit) в порядке публикации
+        self._frames: deque[tuple[int, int, bytes]] = deque(maxlen=history_size)
+        self._position = 0
+        self._last_id = 0
+        # Версия и позиция, до которых история неизвестна (до start или вытеснена)
+        self._floor = 0
+        self._floor_position = 0
+        self._wakeup = asyncio.Event()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    @property
+    def position(self) -> int:
+        """Позиция последней опубликованной пачки — курсор «всё уже получено»."""
+        return self._position
+
+    def start(self, version: int) -> None:
+        """Начать с версии каталога из БД (из lifespan); более раннюю историю брокер не знает."""
+        self._frames.clear()
+        self._last_id = self._floor = version
+        self._floor_position = self._position
+
+    def publish(self, events: list[dict[str, Any]]) -> None:
+        """Опубликовать события одного commit (в потоке цикла событий после commit).
+
+        У всех событий есть version — новая версия каталога после commit.
+        """
+        if not events:
+            return
+        version = events[0]["version"]
+        if version <= self._floor or any(known == version for _, known, _ in self._frames):
+            return
+        if version < self._last_id:
+            logger.warning("События каталога версии %d опубликованы после версии %d", version, self._last_id)
+        frames = b"".join(
+            b"id: %d\nevent: %s\ndata: %s\n\n" % (version, payload["type"].encode(), dumps(payload))
+            for payload in events
+        )
+        if len(self._frames) == self._frames.maxlen:
+            evicted_position, evicted_version, _ = self._frames[0]
+            self._floor = max(self._floor, evicted_version)
+            self._floor_position = evicted_position
+        self._position += 1
+        self._frames.append((self._position, version, frames))
+        self._last_id = max(self._last_id, version)
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    def seek(self, last_id: int) -> int | None:
+        """Позиция, с которой продолжить клиента с Last-Event-ID = last_id.
+
+        None — история до last_id неизвестна (вытеснена, до перезапуска или id из
+        будущего), клиенту нужен полный перезапрос.
+        """
+        if last_id < self._floor or last_id > self._last_id:
+            return None
+        for frame_position, version, _ in self._frames:
+            if version == last_id:
+                return frame_position
+        # Версии нет в истории (её закоммитил другой процесс): всё начиная с первой
+        # пачки новее last_id — опоздавшие пачки после неё тоже попадут
+        for frame_position, version, _ in self._frames:
+            if version > last_id:
+                return frame_position - 1
+        return self._position
+
+    def frames_after(self, position: int) -> list[tuple[int, bytes]] | None:
+        """Пачки, опубликованные после position: [(позиция, кадры)]. None — часть из
+        них уже вытеснена, клиенту нужен полный перезапрос."""
+        if position == self._position:
+            return []
+        if position < self._floor_position:
+            return None
+        return [(frame_position, frame) for frame_position, _, frame in self._frames if frame_position > position]
+
+    async def wait(self, position: int, timeout: float) -> None:
+        """Дождаться публикации после position (или таймаута для keep-alive)."""
+        if position != self._position:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except TimeoutError:
+            pass
+
+
+broker = CatalogEventBroker()
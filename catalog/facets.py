@@ -0,0 +1,135 @@
+"""Фасеты по вкусам: битовые множества товаров в памяти процесса.
+
+Для каждого вкуса и каждой категории хранится int-битмап: бит N установлен,
+если товар с id=N имеет этот вкус / лежит в этой категории. Счётчик «вкус X в
+категории Y» — popcount пересечения, фильтр по нескольким вкусам — AND/OR
+битмапов; ни join-ов, ни обращений к БД на запросе.
+
+Индекс загружается в lifespan (load) и дальше обновляется после каждого commit
+из тех же дельт товаров, что уходят в SSE (catalog.changes) — то есть со всех
+путей записи: REST и сервисов бота. Как и брокер SSE, индекс локален для
+процесса: при нескольких воркерах каждый поддерживает свою копию по своим
+commit-ам.
+"""
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.catalog import CatalogItem
+from models.items import item_flavor_association
+
+MODE_AND = "and"
+MODE_OR = "or"
+
+
+def iter_ids(bits: int) -> Iterator[int]:
+    """id из битмапа по возрастанию."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class FacetIndex:
+    def __init__(self) -> None:
+        self.loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._all = 0
+        self._by_flavor: dict[int, int] = defaultdict(int)
+        self._by_category: dict[int, int] = defaultdict(int)
+        # item_id -> (category_id, вкусы): чтобы при обновлении снять старые биты
+        self._items: dict[int, tuple[int | None, frozenset[int]]] = {}
+
+    def load(self, session: Session) -> int:
+        """Построить индекс по витрине и связям товар—вкус. Возвращает число товаров."""
+        self._reset()
+        flavors: dict[int, set[int]] = defaultdict(set)
+        for item_id, flavor_id in session.execute(
+            select(item_flavor_association.c.item_id, item_flavor_association.c.flavor_id)
+        ):
+            flavors[item_id].add(flavor_id)
+        for item_id, category_id in session.execute(
+            select(CatalogItem.item_id, CatalogItem.category_id)
+        ):
+            self._add(item_id, category_id, frozenset(flavors.get(item_id, ())))
+        self.loaded = True
+        return len(self._items)
+
+    def _add(self, item_id: int, category_id: int | None, flavor_ids: frozenset[int]) -> None:
+        bit = 1 << item_id
+        self._items[item_id] = (category_id, flavor_ids)
+        self._all |= bit
+        if category_id is not None:
+            self._by_category[category_id] |= bit
+        for flavor_id in flavor_ids:
+            self._by_flavor[flavor_id] |= bit
+
+    def _remove(self, item_id: int) -> None:
+        entry = self._items.pop(item_id, None)
+        if entry is None:
+            return
+        category_id, flavor_ids = entry
+        mask = ~(1 << item_id)
+        self._all &= mask
+        if category_id is not None:
+            self._by_category[category_id] &= mask
+            if not self._by_category[category_id]:
+                del self._by_category[category_id]
+        for flavor_id in flavor_ids:
+            self._by_flavor[flavor_id] &= mask
+            if not self._by_flavor[flavor_id]:
+                del self._by_flavor[flavor_id]
+
+    def apply(self, events: Iterable[dict]) -> None:
+        """Применить дельты товаров после commit (формат событий catalog.changes)."""
+        if not self.loaded:
+            return
+        for event in events:
+            if event["type"] == "item.upsert":
+                item = event["item"]
+                self._remove(item["id"])
+                self._add(
+                    item["id"],
+                    item["category_id"],
+                    frozenset(flavor["id"] for flavor in item["flavors"]),
+                )
+            elif event["type"] == "item.delete":
+                self._remove(event["id"])
+
+    def scope(self, category_id: int | None = None) -> int:
+        """Битмап товаров категории (None — всего каталога)."""
+        if category_id is None:
+            return self._all
+        return self._by_category.get(category_id, 0)
+
+    def flavor_counts(self, category_id: int | None = None) -> dict[int, int]:
+        """{flavor_id: число товаров} в категории; вкусы без товаров не попадают."""
+        scope = self.scope(category_id)
+        counts: dict[int, int] = {}
+        for flavor_id, bits in self._by_flavor.items():
+            count = (bits & scope).bit_count()
+            if count:
+                counts[flavor_id] = count
+        return counts
+
+    def match(
+        self,
+        flavor_ids: Iterable[int],
+        mode: str = MODE_AND,
+        category_id: int | None = None,
+    ) -> int:
+        """Битмап товаров со всеми (MODE_AND) или хотя бы одним (MODE_OR) из вкусов."""
+        bitmaps = [self._by_flavor.get(flavor_id, 0) for flavor_id in set(flavor_ids)]
+        if not bitmaps:
+            return self.scope(category_id)
+        combined = bitmaps[0]
+        for bits in bitmaps[1:]:
+            combined = combined & bits if mode == MODE_AND else combined | bits
+        return combined & self.scope(category_id)
+
+
+index = FacetIndex()
@@ -0,0 +1,62 @@
+"""Итоговая цена товара.
+
+Итоговая цена — price с наибольшей из действующих скидок: собственной скидкой
+товара (Item.discount) и акциями (Promotion) на товар или его категорию. Скидки
+задаются в процентах. Цена считается при записи строки витрины
+(catalog.read_model) и хранится в catalog_items.effective_price под индексом —
+фильтр и сортировка по цене ничего не пересчитывают на запросе.
+"""
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import Session
+
+from models.promotion import Promotion
+
+
+def utcnow() -> datetime:
+    """Текущее время UTC без часового пояса — в таком виде время хранится в БД."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Привести время к UTC без часового пояса (наивное время считается уже UTC)."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def effective_price(price: float, discount: float | None) -> float:
+    """Цена со скидкой discount (в процентах), округлённая до копеек."""
+    if not discount or discount <= 0:
+        return round(price, 2)
+    return round(price * (100 - min(discount, 100.0)) / 100, 2)
+
+
+def active_discounts(
+    session: Session,
+    item_ids: Iterable[int],
+    category_ids: Iterable[int],
+    now: datetime | None = None,
+) -> tuple[dict[int, float], dict[int, float]]:
+    """Наибольшие действующие скидки акций: ({item_id: %}, {category_id: %})."""
+    item_ids, category_ids = list(item_ids), list(category_ids)
+    now = now or utcnow()
+    rows = session.execute(
+        select(Promotion.item_id, Promotion.category_id, func.max(Promotion.discount))
+        .where(
+            Promotion.starts_at <= now,
+            Promotion.ends_at > now,
+            or_(Promotion.item_id.in_(item_ids), Promotion.category_id.in_(category_ids)),
+        )
+        .group_by(Promotion.item_id, Promotion.category_id)
+    ).all()
+    by_item: dict[int, float] = {}
+    by_category: dict[int, float] = {}
+    for item_id, category_id, discount in rows:
+        if item_id is not None:
+            by_item[item_id] = discount
+        else:
+            by_category[category_id] = discount
+    return by_item, by_category
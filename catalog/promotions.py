@@ -0,0 +1,119 @@
+"""Плановые акции: окна скидок применяются к витрине по таймеру.
+
+Начало и конец окна акции — такая же запись, как правка товара: PromotionScheduler
+просыпается к ближайшей границе окна и отмечает затронутые товары через
+touch_items, дальше работает обычный путь catalog.changes (витрина с новой
+effective_price, журнал изменений, SSE). Запросы витрины акции не вычисляют.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import select, func, or_, and_, delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from catalog.changes import touch_items
+from catalog.pricing import utcnow
+from database.db import new_async_session
+from models.items import Item
+from models.promotion import Promotion
+
+logger = logging.getLogger(__name__)
+
+# Даже без ближайших границ планировщик перепроверяет акции раз в час
+MAX_SLEEP_SECONDS = 3600.0
+
+
+async def promotion_item_ids(session: AsyncSession, promotions: Iterable[Promotion]) -> set[int]:
+    """Товары, на цену которых влияют акции: свои item_id и товары их категорий."""
+    item_ids: set[int] = set()
+    category_ids: set[int] = set()
+    for promotion in promotions:
+        if promotion.item_id is not None:
+            item_ids.add(promotion.item_id)
+        elif promotion.category_id is not None:
+            category_ids.add(promotion.category_id)
+    if category_ids:
+        item_ids.update(
+            await session.scalars(select(Item.id).where(Item.category_id.in_(category_ids)))
+        )
+    return item_ids
+
+
+class PromotionScheduler:
+    """Фоновая задача: применяет начало и конец окон акций к витрине.
+
+    Спит до ближайшей будущей границы окна (не дольше MAX_SLEEP_SECONDS); wake()
+    будит её раньше — после создания или удаления акции, когда ближайшая граница
+    могла измениться. Завершившиеся акции после применения удаляются.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._wakeup = asyncio.Event()
+        self._last_tick: datetime | None = None
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def tick(self, now: datetime | None = None) -> datetime | None:
+        """Применить границы окон из (предыдущий tick, now]. Возвращает следующую границу.
+
+        Первый tick после запуска применяет все уже начавшиеся акции — за время
+        простоя окна могли открыться или закрыться.
+        """
+        now = now or utcnow()
+        if self._last_tick is None:
+            crossed = Promotion.starts_at <= now
+        else:
+            crossed = or_(
+                and_(Promotion.starts_at > self._last_tick, Promotion.starts_at <= now),
+                and_(Promotion.ends_at > self._last_tick, Promotion.ends_at <= now),
+            )
+        async with self._session_factory() as session:
+            promotions = list(await session.scalars(select(Promotion).where(crossed)))
+            if promotions:
+                item_ids = await promotion_item_ids(session, promotions)
+                ended = [p.id for p in promotions if p.ends_at <= now]
+                if ended:
+                    await session.execute(delete(Promotion).where(Promotion.id.in_(ended)))
+                touch_items(session, *item_ids)
+                await session.commit()
+                logger.info(
+                    "Акции: границ окон %d, завершено %d, пересчитано товаров %d",
+                    len(promotions), len(ended), len(item_ids),
+                )
+            next_start = await session.scalar(
+                select(func.min(Promotion.starts_at)).where(Promotion.starts_at > now)
+            )
+            next_end = await session.scalar(
+                select(func.min(Promotion.ends_at)).where(Promotion.ends_at > now)
+            )
+        self._last_tick = now
+        upcoming = [moment for moment in (next_start, next_end) if moment is not None]
+        return min(upcoming) if upcoming else None
+
+    async def run_forever(self) -> None:
+        """Фоновая задача для lifespan."""
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            next_at = None
+            try:
+                next_at = await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка применения акций")
+            delay = MAX_SLEEP_SECONDS
+            if next_at is not None:
+                # Небольшой запас, чтобы граница гарантированно оказалась <= now
+                delay = min(max((next_at - utcnow()).total_seconds(), 0.0) + 0.05, delay)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except TimeoutError:
+                pass
+
+
+scheduler = PromotionScheduler(new_async_session)
@@ -0,0 +1,239 @@
+"""Модель чтения витрины (таблица catalog_items).
+
+Каждая строка — товар с названием/фото категории и списком вкусов, уже
+сериализованный в JSON. /get_items читает её одним запросом по индексу
+category_id (или по effective_price — фильтр и сортировка по цене), без
+join-ов и ORM-гидратации. Обновление идёт только по изменённым товарам
+(см. catalog.changes).
+"""
+from collections import defaultdict
+from functools import cache
+from typing import Iterable
+
+from sqlalchemy import Select, bindparam, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from catalog import changelog, facets, pricing
+from core.serialization import dumps
+from models.catalog import CatalogItem
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item, item_flavor_association
+from models.photo import PHOTO_FIELDS
+
+# Ограничение на число параметров в одном IN (...) — SQLite по умолчанию держит 999
+BATCH_SIZE = 500
+
+
+def _batches(ids: Iterable[int]) -> Iterable[list[int]]:
+    ordered = sorted(set(ids))
+    for start in range(0, len(ordered), BATCH_SIZE):
+        yield ordered[start:start + BATCH_SIZE]
+
+
+SORT_ID = "id"
+SORT_PRICE_ASC = "price_asc"
+SORT_PRICE_DESC = "price_desc"
+
+
+def _build_payloads(session: Session, item_ids: list[int]) -> dict[int, tuple[int | None, dict]]:
+    """Собрать {item_id: (category_id, payload)} для существующих товаров из item_ids."""
+    rows = session.execute(
+        select(
+            Item.id,
+            Item.name,
+            Item.description,
+            Item.price,
+            Item.discount,
+            Item.category_id,
+            *Item.photo_columns(),
+            Category.name,
+            *Category.photo_columns(),
+        )
+        .outerjoin(Category, Category.id == Item.category_id)
+        .where(Item.id.in_(item_ids))
+    ).all()
+    if not rows:
+        return {}
+
+    flavors_by_item: dict[int, list[dict]] = defaultdict(list)
+    flavor_rows = session.execute(
+        select(item_flavor_association.c.item_id, Flavor.id, Flavor.name, *Flavor.photo_columns())
+        .join(Flavor, Flavor.id == item_flavor_association.c.flavor_id)
+        .where(item_flavor_association.c.item_id.in_(item_ids))
+        .order_by(Flavor.id)
+    ).all()
+    for item_id, flavor_id, flavor_name, *flavor_photo in flavor_rows:
+        flavors_by_item[item_id].append(
+            {"id": flavor_id, "name": flavor_name, **dict(zip(PHOTO_FIELDS, flavor_photo))}
+        )
+
+    promo_by_item, promo_by_category = pricing.active_discounts(
+        session, item_ids, {row.category_id for row in rows if row.category_id is not None}
+    )
+
+    result: dict[int, tuple[int | None, dict]] = {}
+    photo_count = len(PHOTO_FIELDS)
+    for row in rows:
+        item_id, name, description, price, discount, category_id = row[:6]
+        photo = dict(zip(PHOTO_FIELDS, row[6:6 + photo_count]))
+        category_name = row[6 + photo_count]
+        category = None
+        if category_id is not None and category_name is not None:
+            category = {
+                "id": category_id,
+                "name": category_name,
+                **dict(zip(PHOTO_FIELDS, row[7 + photo_count:])),
+            }
+        best_discount = max(
+            discount or 0.0,
+            promo_by_item.get(item_id, 0.0),
+            promo_by_category.get(category_id, 0.0),
+        )
+        result[item_id] = (category_id, {
+            "id": item_id,
+            "name": name,
+            "description": description,
+            "price": price,
+            "discount": discount,
+            "effective_price": pricing.effective_price(price, best_discount),
+            **photo,
+            "category_id": category_id,
+            "category": category,
+            "flavors": flavors_by_item.get(item_id, []),
+        })
+    return result
+
+
+def refresh_items(session: Session, item_ids: Iterable[int]) -> dict[int, dict | None]:
+    """Пересобрать строки витрины для item_ids. Удалённые товары убираются из витрины.
+
+    Возвращает {item_id: payload} (None — товара больше нет). Работает с синхронной
+    Session (вызывается из before_commit, см. catalog.changes).
+    """
+    refreshed: dict[int, dict | None] = {}
+    for batch in _batches(item_ids):
+        built = _build_payloads(session, batch)
+        session.execute(delete(CatalogItem).where(CatalogItem.item_id.in_(batch)))
+        if built:
+            session.execute(
+                insert(CatalogItem),
+                [
+                    {
+                        "item_id": item_id,
+                        "category_id": category_id,
+                        "effective_price": payload["effective_price"],
+                        "payload": dumps(payload),
+                    }
+                    for item_id, (category_id, payload) in built.items()
+                ],
+            )
+        for item_id in batch:
+            entry = built.get(item_id)
+            refreshed[item_id] = entry[1] if entry else None
+    return refreshed
+
+
+def rebuild_all(session: Session) -> int:
+    """Полная пересборка витрины. Возвращает число товаров.
+
+    Все товары попадают в журнал изменений: формат payload мог поменяться, и
+    клиенты с локальной копией каталога должны перезапросить их.
+    """
+    session.execute(delete(CatalogItem))
+    item_ids = list(session.execute(select(Item.id)).scalars())
+    refresh_items(session, item_ids)
+    changelog.record(
+        session,
+        [(changelog.ENTITY_ITEM, item_id, changelog.OP_UPSERT) for item_id in item_ids],
+    )
+    return len(item_ids)
+
+
+async def ensure_built(session: AsyncSession, force: bool = False) -> int | None:
+    """Пересобрать витрину, если она не совпадает с items по числу строк (или force).
+
+    Возвращает число товаров при пересборке, иначе None.
+    """
+    if not force:
+        items_count = await session.scalar(select(func.count()).select_from(Item))
+        catalog_count = await session.scalar(select(func.count()).select_from(CatalogItem))
+        if items_count == catalog_count:
+            return None
+    count = await session.run_sync(rebuild_all)
+    await session.commit()
+    return count
+
+
+@cache
+def _payloads_query(
+    by_category: bool,
+    by_min_price: bool,
+    by_max_price: bool,
+    sort: str,
+    with_ids: bool = False,
+    by_ids: bool = False,
+) -> Select:
+    """Запрос /get_items для набора фильтров; значения — параметры при выполнении.
+
+    Вариантов немного (фильтры × сортировка), каждый строится один раз, ключ кэша
+    у готового объекта запоминается, и SQL сразу берётся из кэша скомпилированных
+    запросов. Параметры: category_id, min_price, max_price, item_ids.
+    """
+    query = select(CatalogItem.item_id, CatalogItem.payload) if with_ids else select(CatalogItem.payload)
+    if by_category:
+        query = query.where(CatalogItem.category_id == bindparam("category_id"))
+    if by_min_price:
+        query = query.where(CatalogItem.effective_price >= bindparam("min_price"))
+    if by_max_price:
+        query = query.where(CatalogItem.effective_price <= bindparam("max_price"))
+    if by_ids:
+        query = query.where(CatalogItem.item_id.in_(bindparam("item_ids", expanding=True)))
+    if sort == SORT_PRICE_ASC:
+        return query.order_by(CatalogItem.effective_price, CatalogItem.item_id)
+    if sort == SORT_PRICE_DESC:
+        return query.order_by(CatalogItem.effective_price.desc(), CatalogItem.item_id.desc())
+    return query.order_by(CatalogItem.item_id)
+
+
+async def get_payloads(
+    session: AsyncSession,
+    category_id: int | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    sort: str = SORT_ID,
+    item_mask: int | None = None,
+) -> list[bytes]:
+    """JSON товаров витрины (все или одной категории) в диапазоне итоговой цены.
+
+    sort: SORT_ID (по id) или SORT_PRICE_ASC / SORT_PRICE_DESC — по итоговой цене,
+    при равной цене по id; оба варианта идут по индексам (category_id,)
+    effective_price, item_id без сортировки в памяти.
+    item_mask — битмап допустимых id (фильтр по вкусам из catalog.facets): небольшой
+    набор уходит в IN (...), большой проверяется по битам при чтении строк.
+    """
+    if item_mask == 0:
+        return []
+    params = {"category_id": category_id, "min_price": min_price, "max_price": max_price}
+    filters = (category_id is not None, min_price is not None, max_price is not None, sort)
+    if item_mask is not None and item_mask.bit_count() > BATCH_SIZE:
+        rows = await session.execute(_payloads_query(*filters, with_ids=True), params)
+        return [payload for item_id, payload in rows if item_mask >> item_id & 1]
+    if item_mask is not None:
+        params["item_ids"] = list(facets.iter_ids(item_mask))
+    result = await session.execute(_payloads_query(*filters, by_ids=item_mask is not None), params)
+    return list(result.scalars())
+
+
+async def get_payloads_by_ids(session: AsyncSession, item_ids: list[int]) -> list[bytes]:
+    """JSON товаров витрины в порядке item_ids (до BATCH_SIZE); отсутствующие пропускаются."""
+    if not item_ids:
+        return []
+    rows = await session.execute(
+        select(CatalogItem.item_id, CatalogItem.payload).where(
+            CatalogItem.item_id.in_(item_ids[:BATCH_SIZE])
+        )
+    )
+    found = dict(rows.all())
+    return [found[item_id] for item_id in item_ids if item_id in found]
@@ -0,0 +1,73 @@
+"""Кэш готовых ответов каталога по версии каталога (вместе со сжатыми вариантами).
+
+Ответ /get_items (и /get_categories) меняется только вместе с версией каталога —
+номером последней записи catalog_changes (catalog.changelog): любая мутация
+товаров, категорий, вкусов и акций проходит через catalog.changes и пишет
+журнал. Поэтому запрос сначала читает версию (один поиск по первичному ключу),
+и, если для неё и этих параметров ответ уже есть, отдаёт его байты — без
+запроса к витрине, склейки JSON и сжатия. Сжатые варианты (core.compression.EncodedBody)
+живут в той же записи: каждое тело сжимается один раз на версию.
+
+При смене версии кэш очищается целиком (старые ответы больше не нужны), внутри
+версии число вариантов параметров ограничено CATALOG_RESPONSE_CACHE_SIZE (LRU).
+Кэш — в памяти процесса; версия берётся из БД, поэтому изменения, сделанные
+другим процессом (бот, второй воркер), тоже сбрасывают его.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+from config import CATALOG_RESPONSE_CACHE_SIZE
+from core.compression import EncodedBody
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """Ответы каталога текущей версии: ключ (маршрут и параметры) → EncodedBody."""
+
+    def __init__(self, max_entries: int = CATALOG_RESPONSE_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.version = -1
+        self._entries: OrderedDict[Hashable, EncodedBody] = OrderedDict()
+        self.stats = ResponseCacheStats()
+
+    def get(self, version: int, key: Hashable) -> EncodedBody | None:
+        if version != self.version:
+            # Запрос, прочитавший версию до свежего commit, не откатывает кэш назад
+            if version < self.version:
+                self.stats.misses += 1
+                return None
+            self.version = version
+            self._entries.clear()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry
+
+    def put(self, version: int, key: Hashable, body: bytes) -> EncodedBody:
+        """Сохранить тело; если параллельный запрос уже положил его — вернуть ту же
+        запись, чтобы оба ждали одно сжатие."""
+        if version == self.version and key in self._entries:
+            return self._entries[key]
+        entry = EncodedBody(body)
+        if version == self.version:
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+cache = ResponseCache()
@@ -0,0 +1,128 @@
+"""Лёгкие строки для чтения: товары, вкусы, категории без ORM-объектов.
+
+Списки для клавиатур бота и похожие пути только читают данные, а ORM-гидратация
+на каждый объект создаёт InstanceState, регистрирует его в identity map и
+обвешивает атрибуты инструментированием. Здесь строки запроса сразу
+превращаются в NamedTuple (кортеж без __dict__), связи читаются отдельными
+запросами и группируются по item_id; одинаковые вкусы и категории — общие
+объекты на весь список.
+
+Функции синхронные, как и catalog.read_model: из AsyncSession их вызывают
+через session.run_sync — весь разбор идёт за один переход в поток драйвера:
+
+    items = await session.run_sync(rows.items)
+
+Строки неизменяемые и не связаны с сессией: их нельзя менять и сохранять
+обратно — для записи нужен ORM (ItemService.get_item и т.п.).
+"""
+from typing import NamedTuple
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item, item_flavor_association
+
+
+class FlavorRow(NamedTuple):
+    id: int
+    name: str
+    photo: str
+
+
+class CategoryRow(NamedTuple):
+    id: int
+    name: str
+    photo: str
+
+
+class ItemRow(NamedTuple):
+    id: int
+    name: str
+    description: str
+    price: float
+    discount: float | None
+    photo: str
+    category_id: int | None
+    category: CategoryRow | None
+    flavors: tuple[FlavorRow, ...]
+
+
+_FLAVOR_COLUMNS = (Flavor.id, Flavor.name, Flavor.photo)
+_ITEM_COLUMNS = (
+    Item.id, Item.name, Item.description, Item.price, Item.discount, Item.photo, Item.category_id,
+)
+
+_FLAVORS = select(*_FLAVOR_COLUMNS).order_by(Flavor.name)
+_FLAVORS_BY_IDS = (
+    select(*_FLAVOR_COLUMNS)
+    .where(Flavor.id.in_(bindparam("ids", expanding=True)))
+    .order_by(Flavor.name)
+)
+_CATEGORIES = select(Category.id, Category.name, Category.photo).order_by(Category.name)
+_ITEMS = select(*_ITEM_COLUMNS).order_by(Item.id)
+_ITEMS_BY_IDS = (
+    select(*_ITEM_COLUMNS).where(Item.id.in_(bindparam("ids", expanding=True))).order_by(Item.id)
+)
+_ITEM_FLAVORS = (
+    select(item_flavor_association.c.item_id, *_FLAVOR_COLUMNS)
+    .join(Flavor, Flavor.id == item_flavor_association.c.flavor_id)
+    .order_by(item_flavor_association.c.item_id, Flavor.name)
+)
+_ITEM_FLAVORS_BY_IDS = _ITEM_FLAVORS.where(
+    item_flavor_association.c.item_id.in_(bindparam("ids", expanding=True))
+)
+
+
+def flavors(session: Session) -> list[FlavorRow]:
+    """Все вкусы по названию."""
+    return [FlavorRow._make(row) for row in session.execute(_FLAVORS)]
+
+
+def flavors_by_ids(session: Session, flavor_ids: list[int]) -> list[FlavorRow]:
+    """Вкусы из flavor_ids по названию; отсутствующие id пропускаются."""
+    if not flavor_ids:
+        return []
+    return [FlavorRow._make(row) for row in session.execute(_FLAVORS_BY_IDS, {"ids": flavor_ids})]
+
+
+def categories(session: Session) -> list[CategoryRow]:
+    """Все категории по названию."""
+    return [CategoryRow._make(row) for row in session.execute(_CATEGORIES)]
+
+
+def items(session: Session, item_ids: list[int] | None = None) -> list[ItemRow]:
+    """Товары (все или из item_ids) по id — с категорией и вкусами (по названию).
+
+    Три запроса без join-ов по товарам: товары, категории (их мало) и пары
+    товар–вкус со вкусом. Одинаковые вкусы и категории — одни и те же объекты.
+    """
+    if item_ids is None:
+        item_rows = session.execute(_ITEMS).all()
+        pair_rows = session.execute(_ITEM_FLAVORS)
+    elif not item_ids:
+        return []
+    else:
+        params = {"ids": item_ids}
+        item_rows = session.execute(_ITEMS_BY_IDS, params).all()
+        pair_rows = session.execute(_ITEM_FLAVORS_BY_IDS, params)
+
+    by_item: dict[int, list[FlavorRow]] = {}
+    shared: dict[int, FlavorRow] = {}
+    for item_id, flavor_id, name, photo in pair_rows:
+        flavor = shared.get(flavor_id)
+        if flavor is None:
+            flavor = shared[flavor_id] = FlavorRow(flavor_id, name, photo)
+        by_item.setdefault(item_id, []).append(flavor)
+
+    category_by_id = {category.id: category for category in categories(session)}
+    no_flavors = ()
+    return [
+        ItemRow(
+            *row,
+            category_by_id.get(row.category_id),
+            tuple(by_item[row.id]) if row.id in by_item else no_flavors,
+        )
+        for row in item_rows
+    ]
@@ -0,0 +1,239 @@
+"""Статический снимок каталога: JSON-файлы для отдачи без Python (nginx, CDN).
+
+В SNAPSHOT_DIR лежат:
+
+* manifest.json — версия каталога (как в /catalog/changes), категории, вкусы,
+  имена файлов с товарами и адреса картинок: префикс оригиналов (images) и шаблон
+  уменьшенных копий с их ширинами (image_sizes — routes.photos, IMAGE_WIDTHS), по
+  которым клиент строит srcset; маленький, кэшировать его нельзя (no-cache);
+* c<category_id>.<hash>.json — товары категории (c0 — без категории) в том же
+  формате, что /get_items. Имя зависит от содержимого, поэтому файлы можно
+  кэшировать навсегда (immutable) и клиент перекачивает только изменившиеся.
+
+Рядом с каждым файлом лежит .gz (gzip -9) — для gzip_static в nginx или CDN;
+приложение отдаёт их само через core.static.PrecompressedStaticFiles.
+
+Сборка инкрементальная: после commit SnapshotBuilder.mark получает те же
+дельты, что уходят в SSE, и отмечает затронутые категории; пересобираются и
+переписываются только их файлы (и манифест). Запись атомарная (временный файл
+и os.replace); файлы, на которые не ссылается ни текущий, ни предыдущий
+манифест, удаляются — клиент, успевший прочитать старый манифест, их ещё найдёт.
+"""
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from catalog import changelog
+from config import IMAGE_WIDTHS, SNAPSHOT_DEBOUNCE, SNAPSHOT_DIR
+from core import files
+from core.serialization import dumps, json_array
+from database.db import new_async_session
+from models.catalog import CatalogItem
+from models.category import Category
+from models.flavor import Flavor
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# Ключ файла для товаров без категории
+NO_CATEGORY = 0
+# Префикс URL картинок (uploads смонтирован в main как /static)
+IMAGES_URL = "/static/"
+# Шаблон URL уменьшенной копии фото (routes.photos)
+IMAGE_SIZES_URL = "/img/{width}/{photo}"
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_file(directory: str, name: str, body: bytes) -> None:
+    """Записать файл и его .gz (сначала .gz — файл без пары никто не увидит сжатым)."""
+    os.makedirs(directory, exist_ok=True)
+    _write_atomic(os.path.join(directory, f"{name}.gz"), gzip.compress(body, 9, mtime=0))
+    _write_atomic(os.path.join(directory, name), body)
+
+
+def _remove_files(directory: str, names: Iterable[str]) -> None:
+    for name in names:
+        for path in (os.path.join(directory, name), os.path.join(directory, f"{name}.gz")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class SnapshotBuilder:
+    """Фоновая задача: держит снимок каталога в SNAPSHOT_DIR в актуальном состоянии.
+
+    mark() вызывается после каждого commit с изменениями каталога; сборка идёт
+    не чаще раза в debounce секунд, чтобы серия правок из бота давала одну
+    запись файлов.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        directory: str = SNAPSHOT_DIR,
+        debounce: float = SNAPSHOT_DEBOUNCE,
+    ) -> None:
+        self._session_factory = session_factory
+        self.directory = directory
+        self.debounce = debounce
+        self._wakeup = asyncio.Event()
+        # None — нужна полная сборка (первая после запуска)
+        self._dirty: set[int] | None = None
+        # item_id -> ключ файла: при переносе товара меняются файлы обеих категорий
+        self._item_keys: dict[int, int] = {}
+        self._files: dict[int, str] = {}
+        # Файлы позапрошлого манифеста: удаляются, если не нужны текущему и прошлому
+        self._older_files: set[str] = set()
+        self.version = 0
+
+    def mark(self, events: Iterable[dict]) -> None:
+        """Отметить категории, затронутые дельтами каталога (формат catalog.changes).
+
+        Пустой events тоже запускает сборку: манифест (вкусы, версия) пересобирается всегда.
+        """
+        if self._dirty is None:
+            self._wakeup.set()
+            return
+        for event in events:
+            if event["type"] == "item.upsert":
+                key = event["item"]["category_id"] or NO_CATEGORY
+                previous = self._item_keys.get(event["id"])
+                if previous is not None:
+                    self._dirty.add(previous)
+                self._item_keys[event["id"]] = key
+                self._dirty.add(key)
+            elif event["type"] == "item.delete":
+                previous = self._item_keys.pop(event["id"], None)
+                if previous is not None:
+                    self._dirty.add(previous)
+            elif event["type"] in ("category.upsert", "category.delete"):
+                self._dirty.add(event["id"])
+        self._wakeup.set()
+
+    async def build(self) -> int:
+        """Пересобрать снимок по отмеченным категориям. Возвращает число записанных файлов."""
+        dirty, self._dirty = self._dirty, set()
+        full = dirty is None
+        try:
+            return await self._build(dirty, full)
+        except BaseException:
+            # Не потерять отметки: следующая сборка повторит их
+            if full:
+                self._dirty = None
+            else:
+                self._dirty |= dirty
+            raise
+
+    async def _build(self, dirty: set[int] | None, full: bool) -> int:
+        async with self._session_factory() as session:
+            version = await changelog.current_version(session)
+            categories = (
+                await session.execute(
+                    select(Category.id, Category.name, *Category.photo_columns()).order_by(Category.id)
+                )
+            ).all()
+            flavors = (
+                await session.execute(
+                    select(Flavor.id, Flavor.name, *Flavor.photo_columns()).order_by(Flavor.id)
+                )
+            ).all()
+            query = select(CatalogItem.item_id, CatalogItem.category_id, CatalogItem.payload)
+            if not full:
+                keys = list(dirty)
+                condition = CatalogItem.category_id.in_(keys)
+                if NO_CATEGORY in dirty:
+                    condition = condition | CatalogItem.category_id.is_(None)
+                query = query.where(condition)
+            rows = (await session.execute(query.order_by(CatalogItem.item_id))).all()
+
+        payloads: dict[int, list[bytes]] = {key: [] for key in (dirty or ())}
+        if full:
+            self._item_keys = {}
+        for item_id, category_id, payload in rows:
+            key = category_id or NO_CATEGORY
+            payloads.setdefault(key, []).append(payload)
+            self._item_keys[item_id] = key
+
+        files_map = {} if full else dict(self._files)
+        writes: list[tuple[str, bytes]] = []
+        for key, fragments in payloads.items():
+            if not fragments:
+                files_map.pop(key, None)
+                continue
+            body = json_array(fragments)
+            name = f"c{key}.{hashlib.sha1(body).hexdigest()[:12]}.json"
+            if full or files_map.get(key) != name:
+                writes.append((name, body))
+            files_map[key] = name
+
+        manifest = dumps({
+            "version": version,
+            "images": IMAGES_URL,
+            "image_sizes": {"url": IMAGE_SIZES_URL, "widths": list(IMAGE_WIDTHS)},
+            "categories": [row._asdict() for row in categories],
+            "flavors": [row._asdict() for row in flavors],
+            "files": {str(key): name for key, name in sorted(files_map.items())},
+        })
+        previous = set(self._files.values())
+        stale = self._older_files - previous - set(files_map.values())
+
+        def write() -> None:
+            for name, body in writes:
+                _write_file(self.directory, name, body)
+            _write_file(self.directory, MANIFEST_NAME, manifest)
+            _remove_files(self.directory, stale)
+
+        await files.run(write)
+        self._older_files = previous
+        self._files = files_map
+        self.version = version
+        return len(writes) + 1
+
+    async def _clean_directory(self) -> None:
+        """Удалить файлы снимка, оставшиеся от прошлого запуска (кроме текущих)."""
+        entries = await files.scandir(self.directory)
+        keep = set(self._files.values()) | {MANIFEST_NAME}
+        stale = {
+            name.removesuffix(".gz")
+            for name, _, _ in entries
+            if name.removesuffix(".gz") not in keep
+        }
+        if stale:
+            await files.run(_remove_files, self.directory, stale)
+
+    async def run_forever(self) -> None:
+        """Фоновая задача для lifespan: полная сборка при старте, дальше — по mark()."""
+        self._wakeup = asyncio.Event()
+        self._dirty = None
+        first = True
+        while True:
+            self._wakeup.clear()
+            try:
+                written = await self.build()
+                logger.debug("Снимок каталога v%d: записано файлов %d", self.version, written)
+                if first:
+                    await self._clean_directory()
+                    logger.info("Снимок каталога собран: v%d, файлов категорий %d", self.version, len(self._files))
+                    first = False
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка сборки снимка каталога")
+            await self._wakeup.wait()
+            await asyncio.sleep(self.debounce)
+
+
+builder = SnapshotBuilder(new_async_session)
@@ -0,0 +1 @@
+"""Общая инфраструктура приложения (не привязанная к боту или роутам)."""
@@ -0,0 +1,201 @@
+"""Сжатие JSON-ответов (gzip, brotli) с выбором кодировки по Accept-Encoding.
+
+JSON каталога — повторяющиеся ключи и вложенные category / flavors — сжимается
+в разы. Два пути:
+
+* CompressionMiddleware сжимает на каждом запросе любой JSON-ответ от
+  COMPRESS_MIN_SIZE байт (быстрые уровни COMPRESS_GZIP_LEVEL /
+  COMPRESS_BROTLI_QUALITY). Потоковые ответы (SSE) и уже сжатые не трогает.
+* EncodedBody — тело, сжатое заранее и хранимое вместе с ним (catalog.response_cache):
+  каждая кодировка считается один раз при первом запросе с ней, уровнями
+  посильнее (COMPRESS_CACHED_*), а ответ отдаётся готовыми байтами — с
+  Vary: Accept-Encoding, по которому middleware его пропускает.
+
+zlib и brotli отпускают GIL, поэтому сжатие идёт в отдельном пуле потоков
+(COMPRESS_WORKERS), а цикл событий тем временем обслуживает другие запросы.
+EncodedBody сжимает там всегда (уровень 9 на большом каталоге — десятки мс после
+каждой правки), а одновременные запросы одной кодировки ждут одну задачу.
+Middleware уносит в пул тела от COMPRESS_THREAD_SIZE байт; меньшие сжимаются на
+месте — переход в поток дороже их сжатия.
+
+brotli необязателен: без него выбирается только gzip. Цена CPU против байтов по
+уровням — benchmarks.bench_compression.
+"""
+import asyncio
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import (
+    COMPRESS_BROTLI_QUALITY,
+    COMPRESS_CACHED_BROTLI_QUALITY,
+    COMPRESS_CACHED_GZIP_LEVEL,
+    COMPRESS_GZIP_LEVEL,
+    COMPRESS_MIN_SIZE,
+    COMPRESS_THREAD_SIZE,
+    COMPRESS_WORKERS,
+)
+from core.serialization import JSONBytesResponse
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+BR = "br"
+GZIP = "gzip"
+# При равном q у клиента выбирается первая: brotli при том же уровне CPU меньше
+SUPPORTED = (BR, GZIP) if brotli is not None else (GZIP,)
+
+_executor = ThreadPoolExecutor(max_workers=COMPRESS_WORKERS, thread_name_prefix="compress")
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Сжать body; cached — уровни для тел, которые сжимаются один раз и кэшируются."""
+    if encoding == BR:
+        quality = COMPRESS_CACHED_BROTLI_QUALITY if cached else COMPRESS_BROTLI_QUALITY
+        return brotli.compress(body, mode=brotli.MODE_TEXT, quality=quality)
+    return gzip.compress(body, COMPRESS_CACHED_GZIP_LEVEL if cached else COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+async def compress_async(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """compress в пуле потоков сжатия."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, compress, body, encoding, cached)
+
+
+def shutdown() -> None:
+    """Остановить пул сжатия (из lifespan)."""
+    _executor.shutdown(wait=True)
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Кодировка для ответа по Accept-Encoding (с учётом q); None — без сжатия.
+
+    Разных значений заголовка на практике единицы (по браузерам), поэтому
+    разбор кэшируется.
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class EncodedBody:
+    """Готовое тело JSON и его сжатые варианты (считаются по первому запросу с кодировкой)."""
+
+    __slots__ = ("raw", "_encoded", "_pending")
+
+    def __init__(self, raw: bytes) -> None:
+        self.raw = raw
+        self._encoded: dict[str, bytes] = {}
+        # Кодировки, которые сейчас сжимаются: параллельные запросы ждут одну задачу
+        self._pending: dict[str, asyncio.Future] = {}
+
+    async def encoded(self, encoding: str) -> bytes:
+        """Тело в кодировке encoding (сжимается один раз, в пуле потоков)."""
+        body = self._encoded.get(encoding)
+        if body is not None:
+            return body
+        task = self._pending.get(encoding)
+        if task is None:
+            task = asyncio.ensure_future(compress_async(self.raw, encoding, cached=True))
+            self._pending[encoding] = task
+            task.add_done_callback(lambda done: self._store(encoding, done))
+        # shield: отменённый запрос не отменяет сжатие для остальных
+        return await asyncio.shield(task)
+
+    def _store(self, encoding: str, task: asyncio.Future) -> None:
+        self._pending.pop(encoding, None)
+        if not task.cancelled() and task.exception() is None:
+            self._encoded[encoding] = task.result()
+
+    async def response(self, accept_encoding: str | None) -> JSONBytesResponse:
+        """Ответ в лучшей кодировке, которую принимает клиент."""
+        if len(self.raw) < COMPRESS_MIN_SIZE:
+            return JSONBytesResponse(self.raw)
+        headers = {"Vary": "Accept-Encoding"}
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            return JSONBytesResponse(self.raw, headers=headers)
+        body = await self.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+        return JSONBytesResponse(body, headers=headers)
+
+
+class CompressionMiddleware:
+    """Сжатие JSON-ответов от COMPRESS_MIN_SIZE байт на каждом запросе (чистый ASGI).
+
+    Тела от COMPRESS_THREAD_SIZE байт сжимаются в пуле потоков (compress_async).
+
+    Ответ целиком приходит одним сообщением http.response.body (Response из
+    FastAPI), поэтому start задерживается до тела: по нему решается, сжимать ли,
+    и выставляются Content-Encoding и Content-Length.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                # Vary: Accept-Encoding — кодировку уже выбрал маршрут (EncodedBody)
+                if (
+                    headers.get("content-type", "").startswith("application/json")
+                    and "content-encoding" not in headers
+                    and "accept-encoding" not in headers.get("vary", "").lower()
+                ):
+                    start = message
+                    return
+                await send(message)
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            response_start, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(response_start)
+                await send(message)
+                return
+            headers = MutableHeaders(raw=response_start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                if len(body) >= COMPRESS_THREAD_SIZE:
+                    body = await compress_async(body, encoding)
+                else:
+                    body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
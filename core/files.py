@@ -0,0 +1,190 @@
+"""Асинхронные файловые операции на выделенном пуле потоков.
+
+os.path.exists / os.remove / scandir на медленном диске или сетевом томе
+блокируют цикл событий, а с ним — все запросы API и бота. Здесь такие вызовы
+выполняются в отдельном ThreadPoolExecutor (не в общем пуле по умолчанию),
+а глубина его очереди и время ожидания учитываются в stats().
+
+Удаление файлов, на которые ссылалась изменяемая строка, откладывается до
+успешного commit: remove_after_commit(session, path). При откате файлы остаются.
+Вместе с удалением забывается и решение core.images «отдавать оригинал» для этих фото.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import FILE_IO_QUEUE_WARN, FILE_IO_WORKERS, UPLOAD_DIR
+from core import images
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=FILE_IO_WORKERS, thread_name_prefix="file-io")
+_INFO_KEY = "files_remove_after_commit"
+# Ссылки на задачи удаления после commit, чтобы их не собрал GC до завершения
+_cleanup_tasks: set[asyncio.Task] = set()
+
+
+@dataclass
+class FilePoolStats:
+    """Счётчики пула файловых операций."""
+    submitted: int = 0
+    completed: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Операций, ожидающих свободного потока."""
+        return max(0, self.in_flight - FILE_IO_WORKERS)
+
+    @property
+    def avg_wait_ms(self) -> float:
+        return self.total_wait_ms / self.completed if self.completed else 0.0
+
+
+_stats = FilePoolStats()
+
+
+def stats() -> FilePoolStats:
+    return _stats
+
+
+async def run(func: Callable[..., Any], *args: Any) -> Any:
+    """Выполнить блокирующую функцию в пуле файловых операций."""
+    submitted_at = time.perf_counter()
+
+    def timed() -> Any:
+        wait_ms = (time.perf_counter() - submitted_at) * 1000
+        _stats.total_wait_ms += wait_ms
+        _stats.max_wait_ms = max(_stats.max_wait_ms, wait_ms)
+        return func(*args)
+
+    _stats.submitted += 1
+    _stats.in_flight += 1
+    _stats.max_in_flight = max(_stats.max_in_flight, _stats.in_flight)
+    if _stats.queue_depth >= FILE_IO_QUEUE_WARN:
+        logger.warning("Очередь файловых операций: %d в ожидании", _stats.queue_depth)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, timed)
+    finally:
+        _stats.in_flight -= 1
+        _stats.completed += 1
+
+
+def upload_path(file_name: str) -> str:
+    return os.path.join(UPLOAD_DIR, file_name)
+
+
+def _remove_many(paths: Iterable[str]) -> int:
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _scandir(directory: str) -> list[tuple[str, int, float]]:
+    if not os.path.isdir(directory):
+        return []
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                entries.append((entry.name, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def _move_many(pairs: Iterable[tuple[str, str]]) -> int:
+    moved = 0
+    for src, dst in pairs:
+        try:
+            os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+            shutil.move(src, dst)
+            moved += 1
+        except FileNotFoundError:
+            pass
+    return moved
+
+
+async def exists(path: str) -> bool:
+    return await run(os.path.exists, path)
+
+
+async def remove(path: str) -> bool:
+    """Удалить файл; отсутствие файла не ошибка. True, если файл был удалён."""
+    return bool(await run(_remove_many, (path,)))
+
+
+async def remove_many(paths: Iterable[str]) -> int:
+    """Удалить файлы одной операцией пула. Возвращает число удалённых."""
+    paths = list(paths)
+    if not paths:
+        return 0
+    return await run(_remove_many, paths)
+
+
+async def rename(src: str, dst: str) -> None:
+    """Переименовать/переместить файл (в т.ч. между файловыми системами)."""
+    await run(shutil.move, src, dst)
+
+
+async def move_many(pairs: Iterable[tuple[str, str]]) -> int:
+    """Переместить файлы (src, dst) одной операцией пула. Возвращает число перемещённых."""
+    pairs = list(pairs)
+    if not pairs:
+        return 0
+    return await run(_move_many, pairs)
+
+
+async def scandir(directory: str) -> list[tuple[str, int, float]]:
+    """[(имя, размер, mtime)] обычных файлов каталога (без подкаталогов)."""
+    return await run(_scandir, directory)
+
+
+def remove_after_commit(session: AsyncSession | Session, *paths: str) -> None:
+    """Удалить файлы после успешного commit сессии (при откате — не удалять)."""
+    sync_session = getattr(session, "sync_session", session)
+    sync_session.info.setdefault(_INFO_KEY, []).extend(p for p in paths if p)
+
+
+async def drain() -> None:
+    """Дождаться отложенных удалений (при остановке приложения)."""
+    if _cleanup_tasks:
+        await asyncio.gather(*_cleanup_tasks, return_exceptions=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _remove_committed(session: Session) -> None:
+    paths = session.info.pop(_INFO_KEY, None)
+    if not paths:
+        return
+    images.forget(*paths)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Синхронная сессия вне цикла событий (скрипты) — удаляем сразу
+        _remove_many(paths)
+        return
+    task = loop.create_task(remove_many(paths))
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_INFO_KEY, None)
@@ -0,0 +1,292 @@
+"""Метаданные загруженных картинок: размер, основной цвет и крошечная заглушка.
+
+Считаются один раз при загрузке (describe) и хранятся рядом с photo в строке
+товара, вкуса или категории (models.photo.PhotoMixin), а в ответах каталога
+уходят вместе с именем файла. Так фронтенд заранее резервирует место под
+картинку нужных пропорций и сразу закрашивает его, не дожидаясь загрузки.
+
+Декодирование картинки — работа CPU под GIL, поэтому она идёт в отдельном
+процессе (ProcessPoolExecutor, IMAGE_WORKERS), а не в пуле потоков: цикл событий
+API и бота не тормозит даже на большом фото. Процессы запускаются через spawn —
+fork процесса с живыми потоками (пул файлов, aiosqlite) может унаследовать
+чужую захваченную блокировку.
+
+Pillow необязателен: без него ширина и высота читаются из заголовка файла
+(JPEG, PNG, GIF, WebP), а цвет и заглушка остаются пустыми.
+
+Заглушка — base64 пикселей RGB квадрата IMAGE_PLACEHOLDER_SIZE×IMAGE_PLACEHOLDER_SIZE
+(при 4×4 — 64 символа). Фронтенд рисует их на canvas и растягивает на место
+картинки; сторона квадрата восстанавливается из длины: sqrt(байт / 3).
+
+Для srcset витрины есть уменьшенные копии (derive): WebP ширин IMAGE_WIDTHS в
+IMAGE_DERIVED_DIR/<ширина>/. Они создаются тем же пулом процессов при первом
+запросе (routes.photos) и дальше отдаются с диска; без Pillow отдаётся оригинал.
+"""
+import asyncio
+import base64
+import logging
+import multiprocessing
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, NamedTuple
+
+from config import (
+    IMAGE_DERIVED_DIR,
+    IMAGE_DERIVED_QUALITY,
+    IMAGE_PLACEHOLDER_SIZE,
+    IMAGE_WIDTHS,
+    IMAGE_WORKERS,
+)
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow — необязательная зависимость
+    Image = None
+else:
+    # Как в PIL.ImageOps.exif_transpose
+    _ORIENTATION_FIX = {
+        2: Image.Transpose.FLIP_LEFT_RIGHT,
+        3: Image.Transpose.ROTATE_180,
+        4: Image.Transpose.FLIP_TOP_BOTTOM,
+        5: Image.Transpose.TRANSPOSE,
+        6: Image.Transpose.ROTATE_270,
+        7: Image.Transpose.TRANSVERSE,
+        8: Image.Transpose.ROTATE_90,
+    }
+
+logger = logging.getLogger(__name__)
+
+# Сторона уменьшенной копии для поиска основного цвета
+_COLOR_SAMPLE = 32
+# EXIF Orientation 5–8: картинка повёрнута на 90°, ширина и высота меняются местами
+_EXIF_ORIENTATION = 0x0112
+_ROTATED = {5, 6, 7, 8}
+
+_executor: ProcessPoolExecutor | None = None
+# Копии, которые сейчас создаются: путь → задача (параллельные запросы ждут одну)
+_deriving: dict[str, asyncio.Future] = {}
+# Фото, которым копия не нужна: путь оригинала → наименьшая проверенная ширина, которой
+# он не шире (для неё и всех больших ширин сразу отдаётся оригинал, без задачи в пуле).
+# Запись убирается, когда фото удаляют или заменяют (forget)
+_originals: dict[str, int] = {}
+
+
+class ImageMeta(NamedTuple):
+    width: int
+    height: int
+    color: str | None = None  # "#rrggbb"
+    placeholder: str | None = None
+
+
+# --- Размер по заголовку (без Pillow) ---
+
+
+def _jpeg_size(f: BinaryIO) -> tuple[int, int] | None:
+    f.seek(2)
+    while True:
+        if f.read(1) != b"\xff":
+            return None
+        code = f.read(1)
+        while code == b"\xff":  # байты-заполнители
+            code = f.read(1)
+        if not code:
+            return None
+        marker = code[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # маркеры без длины
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        # SOF0–SOF15, кроме DHT (C4), JPG (C8) и DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            _, height, width = struct.unpack(">BHH", data)
+            return width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, 1)
+
+
+def _header_size(path: str) -> tuple[int, int] | None:
+    with open(path, "rb") as f:
+        head = f.read(30)
+        if head[:2] == b"\xff\xd8":
+            return _jpeg_size(f)
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L":
+                bits = int.from_bytes(head[21:25], "little")
+                return (bits & 0x3FFF) + 1, (bits >> 14 & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    return None
+
+
+# --- Полный разбор (Pillow) ---
+
+
+def _analyze_pillow(path: str) -> ImageMeta:
+    with Image.open(path) as image:
+        width, height = image.size
+        orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
+        # JPEG декодируется сразу в уменьшенном масштабе (1/2…1/8) — в разы быстрее
+        image.draft("RGB", (_COLOR_SAMPLE * 2, _COLOR_SAMPLE * 2))
+        if image.mode in ("RGBA", "LA", "P"):
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            image = image.convert("RGB")
+    if orientation in _ROTATED:
+        width, height = height, width
+    if orientation in _ORIENTATION_FIX:
+        image = image.transpose(_ORIENTATION_FIX[orientation])
+
+    # Основной цвет — самый частый из 4 после квантования уменьшенной копии
+    sample = image.resize((_COLOR_SAMPLE, _COLOR_SAMPLE), Image.Resampling.BOX).quantize(colors=4)
+    _, index = max(sample.getcolors())
+    r, g, b = sample.getpalette()[index * 3:index * 3 + 3]
+
+    side = IMAGE_PLACEHOLDER_SIZE
+    pixels = image.resize((side, side), Image.Resampling.BOX).tobytes()
+    return ImageMeta(width, height, f"#{r:02x}{g:02x}{b:02x}", base64.b64encode(pixels).decode())
+
+
+def analyze(path: str) -> ImageMeta | None:
+    """Разобрать картинку (синхронно, в процессе-воркере). None — формат не распознан."""
+    if Image is not None:
+        try:
+            return _analyze_pillow(path)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Повреждённый или неизвестный Pillow формат — хотя бы размер из заголовка
+            pass
+    try:
+        size = _header_size(path)
+    except (OSError, struct.error):
+        # Файла нет (удалён после загрузки) или заголовок обрезан
+        return None
+    return ImageMeta(*size) if size else None
+
+
+# --- Уменьшенные копии для srcset ---
+
+
+def pick_width(width: int) -> int | None:
+    """Наименьшая ширина из IMAGE_WIDTHS не меньше запрошенной; None — нужен оригинал."""
+    for candidate in IMAGE_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return None
+
+
+def derived_dirs() -> list[str]:
+    return [os.path.join(IMAGE_DERIVED_DIR, str(width)) for width in IMAGE_WIDTHS]
+
+
+def derived_path(file_name: str, width: int) -> str:
+    stem = os.path.splitext(file_name)[0]
+    return os.path.join(IMAGE_DERIVED_DIR, str(width), f"{stem}.webp")
+
+
+def _derive(source: str, target: str, width: int) -> bool:
+    """Сохранить копию source шириной width в target (в процессе-воркере).
+
+    False — картинка не шире width (копия не нужна, отдаётся оригинал).
+    """
+    with Image.open(source) as image:
+        orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
+        rotated = orientation in _ROTATED
+        if (image.height if rotated else image.width) <= width:
+            return False
+        # thumbnail сам декодирует JPEG в уменьшенном масштабе (draft)
+        image.thumbnail((1 << 16, width) if rotated else (width, 1 << 16), Image.Resampling.LANCZOS)
+        alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if alpha else "RGB")
+    if orientation in _ORIENTATION_FIX:
+        image = image.transpose(_ORIENTATION_FIX[orientation])
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Пишем во временный файл рядом и переименовываем: читатель не увидит половину файла
+    temporary = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.{os.getpid()}")
+    image.save(temporary, "WEBP", quality=IMAGE_DERIVED_QUALITY)
+    os.replace(temporary, target)
+    return True
+
+
+def forget(*sources: str) -> None:
+    """Забыть решения об оригиналах удалённых или заменённых фото (core.files после commit)."""
+    for source in sources:
+        _originals.pop(source, None)
+
+
+def _remember_original(task: asyncio.Future, source: str, width: int) -> None:
+    if not task.cancelled() and task.exception() is None and task.result() is False:
+        _originals[source] = min(width, _originals.get(source, width))
+
+
+async def derive(source: str, target: str, width: int) -> bool:
+    """Создать копию source шириной width (см. _derive); False — отдавать оригинал.
+
+    Параллельные запросы одной копии ждут одну задачу в пуле процессов; если фото
+    оказалось не шире width, это запоминается (_originals) и пул больше не нужен.
+    """
+    if Image is None or _originals.get(source, width + 1) <= width:
+        return False
+    task = _deriving.get(target)
+    if task is None:
+        task = asyncio.ensure_future(
+            asyncio.get_running_loop().run_in_executor(_pool(), _derive, source, target, width)
+        )
+        _deriving[target] = task
+        task.add_done_callback(lambda _: _deriving.pop(target, None))
+        # Ошибку забираем сразу: если все запросы уже отменены, её никто не прочитает
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        task.add_done_callback(lambda done: _remember_original(done, source, width))
+    try:
+        # shield: отменённый запрос (клиент ушёл) не отменяет копию для остальных
+        return await asyncio.shield(task)
+    except BrokenProcessPool:
+        logger.error("Процесс разбора картинок упал — пул будет создан заново")
+        shutdown()
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.warning("Не удалось создать копию %s шириной %d", source, width, exc_info=True)
+    return False
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def describe(path: str) -> ImageMeta | None:
+    """Метаданные картинки по пути; None, если файл не разобран (загрузка не падает)."""
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_pool(), analyze, path)
+    except BrokenProcessPool:
+        logger.error("Процесс разбора картинок упал — пул будет создан заново")
+        shutdown()
+    except Exception:
+        logger.warning("Не удалось разобрать картинку %s", path, exc_info=True)
+    return None
+
+
+def shutdown() -> None:
+    """Остановить процессы-воркеры (при остановке приложения)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
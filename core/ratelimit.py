@@ -0,0 +1,183 @@
+"""Ограничение частоты запросов к API: token bucket в памяти процесса.
+
+Каждый запрос относится к группе маршрутов (read, static, write, events,
+stream — см. RATE_LIMITS в config) и к клиенту: пользователь Telegram по
+подписанному initData (X-Telegram-Init-Data), иначе IP (IPv6 — по /64, адрес
+внутри подсети клиент меняет свободно). Ведро — на пару (группа, клиент).
+
+* Память O(1) на активный ключ: ведро — два float. Ведра лежат в OrderedDict
+  по времени последнего запроса; раз в EVICT_INTERVAL с головы снимаются
+  простаивающие дольше полного восполнения (такое ведро не отличается от
+  нового), при переполнении RATE_LIMIT_MAX_KEYS вытесняются самые старые.
+* Решение — несколько арифметических операций без await и блокировок:
+  middleware чисто ASGI, без BaseHTTPMiddleware.
+* Сверх лимита — 429 с Retry-After (секунды до появления токена).
+
+Лимиты локальны для процесса: при нескольких воркерах каждый считает свои.
+"""
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.webapp_auth import init_data_user_id
+
+GROUP_READ = "read"
+GROUP_STATIC = "static"
+GROUP_WRITE = "write"
+GROUP_EVENTS = "events"
+GROUP_STREAM = "stream"
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Как часто (сек) снимать простаивающие ведра
+EVICT_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float  # токенов в секунду
+    burst: int  # ёмкость ведра
+
+    @classmethod
+    def parse(cls, raw: str) -> "Limit":
+        """«10/50» — 10 запросов в секунду, всплеск до 50.
+
+        Скорость должна быть больше нуля (на неё делится время ожидания), всплеск —
+        не меньше 1; иначе ValueError. Снять лимит с группы — пустое значение.
+        """
+        rate_raw, _, burst_raw = raw.partition("/")
+        try:
+            rate = float(rate_raw)
+            burst = int(burst_raw) if burst_raw.strip() else max(1, math.ceil(rate))
+        except (ValueError, OverflowError):
+            raise ValueError(f"Лимит {raw!r}: ожидается «скорость/всплеск», например 10/50") from None
+        if not (0 < rate < math.inf) or burst < 1:
+            raise ValueError(f"Лимит {raw!r}: скорость должна быть больше 0, всплеск — не меньше 1")
+        return cls(rate, burst)
+
+
+def classify(method: str, path: str) -> str:
+    """Группа лимитов для запроса."""
+    if path.startswith(("/static/", "/img/", "/snapshot/")):
+        return GROUP_STATIC
+    if path == "/analytics/events":
+        return GROUP_EVENTS
+    if path == "/catalog/stream":
+        return GROUP_STREAM
+    if method in WRITE_METHODS:
+        return GROUP_WRITE
+    return GROUP_READ
+
+
+class RateLimiter:
+    def __init__(self, limits: dict[str, Limit], max_keys: int = 100_000) -> None:
+        self.limits = limits
+        self.max_keys = max_keys
+        # Ведро, простоявшее столько, восполнено полностью — его можно забыть
+        self.idle_ttl = max((limit.burst / limit.rate for limit in limits.values()), default=0.0)
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._next_evict = 0.0
+        self.allowed = 0
+        self.limited = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, key: str, group: str, now: float | None = None) -> float:
+        """Списать токен. 0 — запрос разрешён, иначе через сколько секунд повторить."""
+        limit = self.limits.get(group)
+        if limit is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        buckets = self._buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [float(limit.burst), now]
+            if len(buckets) > self.max_keys:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(key)
+            bucket[0] = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            bucket[1] = now
+        if now >= self._next_evict:
+            self._evict(now)
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            self.allowed += 1
+            return 0.0
+        self.limited += 1
+        return (1.0 - bucket[0]) / limit.rate
+
+    def _evict(self, now: float) -> None:
+        self._next_evict = now + EVICT_INTERVAL
+        buckets = self._buckets
+        while buckets:
+            key = next(iter(buckets))
+            if now - buckets[key][1] < self.idle_ttl:
+                return
+            del buckets[key]
+
+
+def _client_ip(ip: str) -> str:
+    if ":" not in ip:
+        return ip
+    try:
+        address = ipaddress.IPv6Address(ip)
+    except ValueError:
+        return ip
+    if address.ipv4_mapped:
+        return str(address.ipv4_mapped)
+    return str(ipaddress.IPv6Network(f"{ip}/64", strict=False))
+
+
+class RateLimitMiddleware:
+    """ASGI-middleware: RateLimiter перед приложением."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter,
+        bot_token: str = "",
+        trust_forwarded: bool = False,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.bot_token = bot_token
+        self.trust_forwarded = trust_forwarded
+
+    def _client_key(self, scope: Scope) -> str:
+        init_data = forwarded = None
+        for name, value in scope["headers"]:
+            if name == b"x-telegram-init-data":
+                init_data = value.decode("latin-1")
+            elif name == b"x-forwarded-for":
+                forwarded = value.decode("latin-1")
+        if init_data and self.bot_token:
+            user_id = init_data_user_id(init_data, self.bot_token)
+            if user_id is not None:
+                return f"tg:{user_id}"
+        if forwarded and self.trust_forwarded:
+            return _client_ip(forwarded.split(",")[0].strip())
+        client = scope.get("client")
+        return _client_ip(client[0]) if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        group = classify(scope["method"], scope["path"])
+        retry_after = self.limiter.hit(f"{group}:{self._client_key(scope)}", group)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            {"detail": "Слишком много запросов, повторите позже"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+        await response(scope, receive, send)
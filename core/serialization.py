@@ -0,0 +1,38 @@
+"""Быстрая JSON-сериализация ответов API.
+
+Используется orjson, если он установлен, иначе стандартный json. Горячие пути
+(/get_items, /get_categories) собирают тело ответа сразу в байты из кортежей
+строк БД или готовых JSON-фрагментов, минуя jsonable_encoder и ORM-объекты.
+"""
+import json
+from typing import Any, Iterable, Sequence
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Сериализовать obj в компактный UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def json_array(fragments: Iterable[bytes]) -> bytes:
+    """Склеить готовые JSON-фрагменты в массив без повторного разбора."""
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def rows_to_json(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> bytes:
+    """JSON-массив объектов из кортежей строк (Row) и списка имён полей."""
+    return dumps([dict(zip(fields, row)) for row in rows])
+
+
+class JSONBytesResponse(Response):
+    """Ответ с уже готовым телом JSON (bytes) — без повторной сериализации."""
+
+    media_type = "application/json"
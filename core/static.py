@@ -0,0 +1,76 @@
+"""Раздача статики с заранее сжатыми копиями (file.gz рядом с file).
+
+Как gzip_static в nginx: если клиент принимает gzip и рядом с файлом лежит
+.gz, отдаётся он с Content-Encoding: gzip — без сжатия на запросе. Поиск и
+stat .gz идут в пуле файловых операций (core.files), а не в цикле событий.
+"""
+import mimetypes
+import os
+import stat
+from typing import Collection
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from core import files
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles с .gz-копиями и Cache-Control.
+
+    Файлы из no_cache (например, манифест) клиент перепроверяет на каждом
+    запросе; остальные считаются неизменяемыми (имя зависит от содержимого).
+    """
+
+    def __init__(self, *args, no_cache: Collection[str] = (), **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.no_cache = frozenset(no_cache)
+
+    def _headers(self, name: str) -> dict[str, str]:
+        return {
+            "Cache-Control": CACHE_REVALIDATE if name in self.no_cache else CACHE_IMMUTABLE,
+            "Vary": "Accept-Encoding",
+        }
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """Сначала .gz-копия, если клиент принимает gzip (поиск и stat — в пуле core.files)."""
+        request_headers = Headers(scope=scope)
+        if scope["method"] in ("GET", "HEAD") and "gzip" in request_headers.get("accept-encoding", ""):
+            try:
+                gz_path, gz_stat = await files.run(self.lookup_path, f"{path}.gz")
+            except (OSError, ValueError):
+                gz_stat = None  # слишком длинное или недопустимое имя — разберётся StaticFiles
+            if gz_stat is not None and stat.S_ISREG(gz_stat.st_mode):
+                name = os.path.basename(path)
+                response = FileResponse(
+                    gz_path,
+                    stat_result=gz_stat,
+                    media_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+                    headers={**self._headers(name), "Content-Encoding": "gzip"},
+                )
+                if self.is_not_modified(response.headers, request_headers):
+                    return NotModifiedResponse(response.headers)
+                return response
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers=self._headers(os.path.basename(full_path)),
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,32 @@
+"""Хронология запуска приложения: отметки времени этапов и итоговая строка в лог."""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimeline:
+    """Собирает длительность этапов запуска (импорты, схема БД, бот) и пишет их в лог."""
+
+    def __init__(self, started_at: float | None = None) -> None:
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self._last = self.started_at
+        self.stages: list[tuple[str, float]] = []
+
+    def mark(self, stage: str) -> float:
+        """Завершить этап stage. Возвращает его длительность в миллисекундах."""
+        now = time.perf_counter()
+        elapsed_ms = (now - self._last) * 1000
+        self._last = now
+        self.stages.append((stage, elapsed_ms))
+        logger.debug("Старт: %s — %.1f мс", stage, elapsed_ms)
+        return elapsed_ms
+
+    @property
+    def total_ms(self) -> float:
+        return (self._last - self.started_at) * 1000
+
+    def report(self, title: str = "Запуск") -> None:
+        """Вывести в лог все этапы одной строкой."""
+        parts = ", ".join(f"{stage} {ms:.1f} мс" for stage, ms in self.stages)
+        logger.info("%s: %s; итого %.1f мс", title, parts or "нет этапов", self.total_ms)
@@ -0,0 +1,167 @@
+"""Сборщик «осиротевших» загрузок: файлы в UPLOAD_DIR, на которые не ссылается БД.
+
+Такие файлы остаются, например, если мастер добавления в боте бросили после
+загрузки фото или запись в БД упала после сохранения файла. Каталог обходится
+пачками: для каждой пачки имён одним запросом проверяются колонки photo в
+items, flavors и categories, между пачками управление отдаётся циклу событий.
+Файлы моложе грейс-периода не трогаются — их строка в БД может быть ещё не
+закоммичена.
+
+Уменьшенные копии фото (core.images.derive) — кэш: после прохода удаляются
+копии, оригинала которых в UPLOAD_DIR больше нет (удалён или убран сборщиком).
+
+Обход каталога и удаление идут через пул файловых операций (core.files).
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core import files, images
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item
+
+logger = logging.getLogger(__name__)
+
+MODE_DELETE = "delete"
+MODE_QUARANTINE = "quarantine"
+
+
+@dataclass
+class GcReport:
+    """Итог одного прохода сборщика."""
+    scanned: int = 0
+    orphans: int = 0
+    # Освобождено на диске (режим delete); перенос в карантин место не освобождает
+    bytes_reclaimed: int = 0
+    bytes_quarantined: int = 0
+    files_total: int = 0
+    bytes_total: int = 0
+    quarantine_files: int = 0
+    quarantine_bytes: int = 0
+    derived_removed: int = 0
+    duration_ms: float = 0.0
+
+
+class UploadGarbageCollector:
+    """Периодически находит и удаляет (или переносит в карантин) файлы без ссылок из БД."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        upload_dir: str,
+        quarantine_dir: str,
+        mode: str = MODE_QUARANTINE,
+        grace_seconds: int = 3600,
+        batch_size: int = 200,
+    ) -> None:
+        if mode not in (MODE_DELETE, MODE_QUARANTINE):
+            raise ValueError(f"Неизвестный режим сборки загрузок: {mode}")
+        self.session_factory = session_factory
+        self.upload_dir = upload_dir
+        self.quarantine_dir = quarantine_dir
+        self.mode = mode
+        self.grace_seconds = grace_seconds
+        self.batch_size = batch_size
+        self.last_report: GcReport | None = None
+
+    async def _referenced(self, session: AsyncSession, names: list[str]) -> set[str]:
+        query = union(
+            select(Item.photo).where(Item.photo.in_(names)),
+            select(Flavor.photo).where(Flavor.photo.in_(names)),
+            select(Category.photo).where(Category.photo.in_(names)),
+        )
+        result = await session.execute(query)
+        return set(result.scalars())
+
+    async def _dispose(self, names: list[str]) -> None:
+        if self.mode == MODE_QUARANTINE:
+            await files.move_many(
+                (os.path.join(self.upload_dir, name), os.path.join(self.quarantine_dir, name))
+                for name in names
+            )
+        else:
+            await files.remove_many(os.path.join(self.upload_dir, name) for name in names)
+
+    async def _sweep_derived(self, kept: set[str]) -> int:
+        """Удалить уменьшенные копии фото, которых нет среди kept."""
+        stems = {os.path.splitext(name)[0] for name in kept}
+        stale = []
+        for directory in images.derived_dirs():
+            for name, _, _ in await files.scandir(directory):
+                # .имя — копия, которая сейчас пишется
+                if not name.startswith(".") and os.path.splitext(name)[0] not in stems:
+                    stale.append(os.path.join(directory, name))
+        return await files.remove_many(stale)
+
+    async def collect(
+        self, on_progress: Callable[[int, int], Awaitable[None]] | None = None
+    ) -> GcReport:
+        """Один полный проход по каталогу загрузок. on_progress(проверено, всего) — после каждой пачки."""
+        started = time.perf_counter()
+        report = GcReport()
+        entries = await files.scandir(self.upload_dir)
+        cutoff = time.time() - self.grace_seconds
+        kept: set[str] = set()
+
+        async with self.session_factory() as session:
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start:start + self.batch_size]
+                report.scanned += len(batch)
+                referenced = await self._referenced(session, [name for name, _, _ in batch])
+                orphans = {
+                    name: size for name, size, mtime in batch
+                    if name not in referenced and mtime < cutoff
+                }
+                if orphans:
+                    await self._dispose(list(orphans))
+                    report.orphans += len(orphans)
+                    if self.mode == MODE_QUARANTINE:
+                        report.bytes_quarantined += sum(orphans.values())
+                    else:
+                        report.bytes_reclaimed += sum(orphans.values())
+                for name, size, _ in batch:
+                    if name not in orphans:
+                        kept.add(name)
+                        report.files_total += 1
+                        report.bytes_total += size
+                if on_progress is not None:
+                    await on_progress(report.scanned, len(entries))
+                await asyncio.sleep(0)
+
+        report.derived_removed = await self._sweep_derived(kept)
+        quarantined = await files.scandir(self.quarantine_dir)
+        report.quarantine_files = len(quarantined)
+        report.quarantine_bytes = sum(size for _, size, _ in quarantined)
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        self.last_report = report
+        logger.info(
+            "Сборка загрузок: проверено %d, сирот %d (%s), освобождено %.1f КБ, "
+            "перенесено в карантин %.1f КБ; хранилище %d файлов, %.1f МБ; карантин %d файлов, %.1f МБ; "
+            "лишних копий фото %d; %.0f мс",
+            report.scanned, report.orphans,
+            "в карантин" if self.mode == MODE_QUARANTINE else "удалены",
+            report.bytes_reclaimed / 1024, report.bytes_quarantined / 1024,
+            report.files_total, report.bytes_total / 1024 / 1024,
+            report.quarantine_files, report.quarantine_bytes / 1024 / 1024,
+            report.derived_removed, report.duration_ms,
+        )
+        return report
+
+    async def run_forever(self, interval_seconds: int, initial_delay: float = 60.0) -> None:
+        """Фоновая задача для lifespan: проход раз в interval_seconds."""
+        await asyncio.sleep(min(initial_delay, interval_seconds))
+        while True:
+            try:
+                await self.collect()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка сборки загрузок")
+            await asyncio.sleep(interval_seconds)
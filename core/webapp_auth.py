@@ -0,0 +1,52 @@
+"""Проверка initData Telegram Mini App (заголовок X-Telegram-Init-Data).
+
+Подпись: HMAC-SHA256 строки «key=value» (по алфавиту, через \\n, без hash)
+ключом HMAC-SHA256("WebAppData", токен бота) — см. документацию Telegram
+(Validating data received via the Mini App). Без проверки id пользователя
+подделывается, поэтому неподписанные данные не принимаются.
+"""
+import hashlib
+import hmac
+import json
+import time
+from functools import lru_cache
+from urllib.parse import parse_qsl
+
+# initData старше суток не принимается
+INIT_DATA_MAX_AGE = 24 * 3600
+
+
+@lru_cache(maxsize=8)
+def _secret_key(bot_token: str) -> bytes:
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+
+@lru_cache(maxsize=4096)
+def _verified_user(init_data: str, bot_token: str) -> tuple[int, int] | None:
+    """(user_id, auth_date) из подписанных initData или None. Клиент шлёт одну строку
+    на все запросы сессии, поэтому HMAC считается один раз на строку."""
+    fields = dict(parse_qsl(init_data, keep_blank_values=True))
+    received_hash = fields.pop("hash", "")
+    check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    expected = hmac.new(_secret_key(bot_token), check_string.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, received_hash):
+        return None
+    try:
+        user_id = int(json.loads(fields["user"])["id"])
+        auth_date = int(fields["auth_date"])
+    except (KeyError, ValueError, TypeError):
+        return None
+    return user_id, auth_date
+
+
+def init_data_user_id(init_data: str, bot_token: str, max_age: int = INIT_DATA_MAX_AGE) -> int | None:
+    """id пользователя Telegram из initData или None, если подпись неверна или данные устарели."""
+    if not init_data or not bot_token:
+        return None
+    verified = _verified_user(init_data, bot_token)
+    if verified is None:
+        return None
+    user_id, auth_date = verified
+    if time.time() - auth_date > max_age:
+        return None
+    return user_id
@@ -0,0 +1,270 @@
+"""Онлайн-копии SQLite: backup API шагами по несколько страниц, в отдельном потоке.
+
+Копировать файл БД, пока API и бот пишут, нельзя — копия может попасть на
+середину транзакции. Backup API SQLite (sqlite3.Connection.backup) переносит
+страницы в новый файл; на время шага источник держит только SHARED-блокировку
+(читатели не ждут, писатель ждёт конца шага), а между шагами поток спит
+BACKUP_STEP_PAUSE — писатели успевают закоммитить.
+
+Если источник изменило другое соединение, SQLite начинает копирование заново.
+При непрерывной записи копия могла бы не закончиться никогда, поэтому после
+BACKUP_MAX_RESTARTS перезапусков остаток копируется одним шагом: писатели ждут
+его окончания, читатели — нет.
+
+Копия — согласованный снимок БД на момент последнего шага. Она пишется во
+временный файл, проверяется (PRAGMA quick_check), по желанию сжимается gzip и
+переименовывается в BACKUP_DIR/<имя БД>-<время UTC>.db[.gz]; копии сверх
+BACKUP_KEEP последних удаляются.
+
+Всё это блокирующие вызовы sqlite3 и файловой системы — они идут в отдельном
+потоке (один на процесс, копии не пересекаются), цикл событий их не ждёт. На
+Linux у потока понижен приоритет (THREAD_NICE): на занятом CPU копия и сжатие
+идут дольше, но не отнимают время у запросов.
+Запуск — задача db.backup (jobs.tasks): по расписанию из lifespan
+(run_forever), командой /backup в боте или POST /jobs/db.backup. Влияние на
+задержки /get_items — benchmarks.bench_backup.
+"""
+import asyncio
+import gzip
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy.engine import make_url
+
+from config import (
+    BACKUP_COMPRESS,
+    BACKUP_DIR,
+    BACKUP_KEEP,
+    BACKUP_MAX_RESTARTS,
+    BACKUP_PAGES,
+    BACKUP_STEP_PAUSE,
+    DATABASE_URL,
+)
+from jobs.queue import queue
+
+logger = logging.getLogger(__name__)
+
+# Прогресс из потока копирования передаётся в цикл событий не чаще этого (сек)
+PROGRESS_INTERVAL = 0.5
+GZIP_CHUNK = 1 << 20
+# nice потока копирования (Linux): сжатие и копия не отнимают CPU у цикла событий
+THREAD_NICE = 19
+
+
+def _lower_priority() -> None:
+    """Понизить приоритет потока копирования; на Linux nice действует на отдельный поток."""
+    if sys.platform != "linux":
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), THREAD_NICE)
+    except OSError:
+        logger.debug("Не удалось понизить приоритет потока копирования", exc_info=True)
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup", initializer=_lower_priority)
+_stopping = threading.Event()
+
+
+class BackupError(Exception):
+    """Копию сделать нельзя (не SQLite) или она не прошла проверку."""
+
+
+class _TooManyRestarts(Exception):
+    """Запись не даёт закончить пошаговую копию — остаток копируется одним шагом."""
+
+
+@dataclass
+class BackupReport:
+    """Итог одной копии."""
+    path: str = ""
+    size: int = 0
+    pages: int = 0
+    steps: int = 0
+    restarts: int = 0
+    compressed: bool = False
+    duration_ms: float = 0.0
+
+
+def sqlite_path(url: str = DATABASE_URL) -> str | None:
+    """Путь к файлу SQLite из URL БД; None — не SQLite или БД в памяти."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return None
+    return parsed.database
+
+
+def _copy(
+    source_path: str,
+    target_path: str,
+    report: BackupReport,
+    pages: int,
+    pause: float,
+    max_restarts: int,
+    on_progress: Callable[[int, int], None] | None,
+) -> None:
+    """Пошаговая копия source_path в target_path (в потоке копирования)."""
+    last_remaining: int | None = None
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal last_remaining
+        if _stopping.is_set():
+            raise BackupError("Копирование прервано остановкой приложения")
+        report.steps += 1
+        report.pages = total
+        # remaining не уменьшился — источник изменился и копирование началось
+        # сначала (или шаг не прошёл, пока источник был занят писателем)
+        if last_remaining is not None and remaining >= last_remaining:
+            report.restarts += 1
+            if report.restarts > max_restarts:
+                raise _TooManyRestarts
+        last_remaining = remaining
+        if on_progress is not None:
+            on_progress(total - remaining, total)
+        if remaining and pause:
+            time.sleep(pause)
+
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        try:
+            source.backup(target, pages=pages, progress=progress, sleep=pause or 0.25)
+        except _TooManyRestarts:
+            logger.warning(
+                "Резервная копия: %d перезапусков из-за записи, остаток копируется одним шагом",
+                report.restarts - 1,
+            )
+            source.backup(target)
+            report.steps += 1
+        check = target.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            raise BackupError(f"Копия не прошла проверку: {check}")
+    finally:
+        target.close()
+        source.close()
+
+
+def _gzip(source_path: str, target_path: str, pause: float) -> None:
+    """Сжать кусками по GZIP_CHUNK с паузой между ними, как и копирование."""
+    with open(source_path, "rb") as src, gzip.open(target_path, "wb", compresslevel=6) as dst:
+        while chunk := src.read(GZIP_CHUNK):
+            if _stopping.is_set():
+                raise BackupError("Копирование прервано остановкой приложения")
+            dst.write(chunk)
+            if pause:
+                time.sleep(pause)
+
+
+def _rotate(directory: str, prefix: str, keep: int) -> list[str]:
+    """Удалить копии с prefix сверх keep последних; вернуть удалённые имена."""
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(prefix) and name.endswith((".db", ".db.gz"))
+    )
+    removed = names[:-keep] if keep > 0 else []
+    for name in removed:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _create(
+    source_path: str,
+    directory: str,
+    compress: bool,
+    keep: int,
+    on_progress: Callable[[int, int], None] | None,
+) -> BackupReport:
+    """Копия, сжатие, переименование и ротация (в потоке копирования)."""
+    started = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.splitext(os.path.basename(source_path))[0] + "-"
+    name = prefix + datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S") + ".db"
+    path = os.path.join(directory, name + ".gz" if compress else name)
+    # Временные файлы начинаются с точки — ротация их не видит
+    raw_tmp = os.path.join(directory, f".{name}.tmp")
+    gz_tmp = os.path.join(directory, f".{name}.gz.tmp")
+    report = BackupReport(path=path, compressed=compress)
+    try:
+        _copy(source_path, raw_tmp, report, BACKUP_PAGES, BACKUP_STEP_PAUSE, BACKUP_MAX_RESTARTS, on_progress)
+        if compress:
+            _gzip(raw_tmp, gz_tmp, BACKUP_STEP_PAUSE)
+            os.replace(gz_tmp, path)
+        else:
+            os.replace(raw_tmp, path)
+    finally:
+        for tmp in (raw_tmp, gz_tmp):
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+    removed = _rotate(directory, prefix, keep)
+    if removed:
+        logger.info("Резервные копии: удалено старых %d (%s)", len(removed), ", ".join(removed))
+    report.size = os.path.getsize(path)
+    report.duration_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+async def create(
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+    directory: str = BACKUP_DIR,
+    compress: bool = BACKUP_COMPRESS,
+    keep: int = BACKUP_KEEP,
+) -> BackupReport:
+    """Сделать копию БД из DATABASE_URL; on_progress(скопировано, всего страниц)."""
+    source_path = sqlite_path()
+    if source_path is None:
+        raise BackupError("Резервные копии делаются только для SQLite (DATABASE_URL)")
+    loop = asyncio.get_running_loop()
+    forward = None
+    if on_progress is not None:
+        last_sent = 0.0
+
+        def forward(done: int, total: int) -> None:  # в потоке копирования
+            nonlocal last_sent
+            now = time.monotonic()
+            if done < total and now - last_sent < PROGRESS_INTERVAL:
+                return
+            last_sent = now
+            asyncio.run_coroutine_threadsafe(on_progress(done, total), loop)
+
+    report = await loop.run_in_executor(_executor, _create, source_path, directory, compress, keep, forward)
+    logger.info(
+        "Резервная копия %s: %.1f МБ, %d страниц за %d шагов, перезапусков %d, %.0f мс",
+        report.path, report.size / 1024 / 1024, report.pages, report.steps, report.restarts, report.duration_ms,
+    )
+    return report
+
+
+async def run_forever(interval: float) -> None:
+    """Фоновая задача для lifespan: раз в interval ставит копию в очередь задач.
+
+    Ключ идемпотентности — номер интервала, поэтому при нескольких процессах
+    копия за интервал ставится один раз. Первая — в начале следующего интервала,
+    а не при каждом перезапуске.
+    """
+    while True:
+        slot = int(time.time() // interval)
+        await asyncio.sleep((slot + 1) * interval - time.time())
+        try:
+            await queue.enqueue("db.backup", idempotency_key=f"db.backup:{slot + 1}")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Не удалось поставить резервную копию")
+
+
+def shutdown() -> None:
+    """Прервать идущую копию на следующем шаге и дождаться потока (из lifespan)."""
+    _stopping.set()
+    _executor.shutdown(wait=True)
@@ -2,21 +2,40 @@ import os
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy import event, Engine
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from config import DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT
 
-@event.listens_for(Engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
+
+def _set_sqlite_pragma(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
 
 
+def create_engine(url: str = DATABASE_URL, echo: bool = False) -> AsyncEngine:
+    """Движок по URL: SQLite — с PRAGMA foreign_keys, остальные БД — с настройками пула из config."""
+    if make_url(url).get_backend_name() == "sqlite":
+        engine = create_async_engine(url, echo=echo)
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragma)
+        return engine
+    return create_async_engine(
+        url,
+        echo=echo,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+
 # echo=True выводит все SQL-запросы; отключается через SQLALCHEMY_ECHO=0 или false
 _sql_echo = os.getenv("SQLALCHEMY_ECHO", "0").lower() in ("1", "true", "yes")
-engine = create_async_engine("sqlite+aiosqlite:///mydb.db", echo=_sql_echo)
+engine = create_engine(DATABASE_URL, echo=_sql_echo)
 
 
 new_async_session = async_sessionmaker(engine, expire_on_commit=False)
@@ -28,4 +47,4 @@ async def get_session():
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
@@ -0,0 +1,115 @@
+"""Версия схемы БД: create_all запускается только если модели изменились.
+
+Отпечаток (fingerprint) строится по метаданным моделей — таблицы, колонки, типы,
+индексы и внешние ключи — и хранится в таблице schema_meta. На «тёплой» базе
+запуск сводится к одному SELECT вместо рефлексии всех таблиц.
+
+Производные таблицы (info={"derived": True}, например витрина catalog_items)
+при смене отпечатка пересоздаются — их содержимое собирается заново из исходных.
+В остальные существующие таблицы добавляются новые колонки моделей (ALTER TABLE
+ADD COLUMN) — только допускающие NULL или со значением по умолчанию на стороне
+БД; изменение или удаление колонок по-прежнему требует ручной миграции.
+"""
+import hashlib
+import logging
+
+from sqlalchemy import Column, Connection, String, Table, inspect, select, delete, insert, text
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database.db import Base
+
+# Регистрация всех моделей в Base.metadata до вычисления отпечатка
+import models.catalog  # noqa: F401
+import models.category  # noqa: F401
+import models.flavor  # noqa: F401
+import models.items  # noqa: F401
+import models.analytics  # noqa: F401
+import models.job  # noqa: F401
+import models.promotion  # noqa: F401
+import models.staff  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_KEY = "schema_fingerprint"
+
+schema_meta = Table(
+    "schema_meta",
+    Base.metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
+
+def schema_fingerprint() -> str:
+    """Хеш структуры всех таблиц из Base.metadata (без обращения к БД)."""
+    parts: list[str] = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(f"T:{table.name}")
+        for column in table.columns:
+            parts.append(
+                f"C:{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}"
+            )
+        for fk in sorted(table.foreign_keys, key=lambda f: f.target_fullname):
+            parts.append(f"F:{fk.parent.name}:{fk.target_fullname}:{fk.ondelete}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"I:{index.name}:{','.join(c.name for c in index.columns)}:{index.unique}")
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def read_fingerprint(conn: Connection) -> str | None:
+    if not conn.dialect.has_table(conn, schema_meta.name):
+        return None
+    return conn.execute(
+        select(schema_meta.c.value).where(schema_meta.c.key == SCHEMA_KEY)
+    ).scalar_one_or_none()
+
+
+def _write_fingerprint(conn: Connection, fingerprint: str) -> None:
+    conn.execute(delete(schema_meta).where(schema_meta.c.key == SCHEMA_KEY))
+    conn.execute(insert(schema_meta).values(key=SCHEMA_KEY, value=fingerprint))
+
+
+def _add_missing_columns(conn: Connection) -> list[str]:
+    """Добавить в существующие таблицы колонки, появившиеся в моделях."""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.info.get("derived") or table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(
+                    f"Колонку {table.name}.{column.name} (NOT NULL без server_default) "
+                    f"нельзя добавить автоматически — нужна ручная миграция"
+                )
+            table_name = conn.dialect.identifier_preparer.format_table(table)
+            spec = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {spec}"))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+async def ensure_schema(engine: AsyncEngine) -> bool:
+    """Создать недостающие таблицы, если отпечаток схемы в БД устарел.
+
+    Возвращает True, если был выполнен create_all (новая или изменённая схема).
+    """
+    fingerprint = schema_fingerprint()
+    async with engine.begin() as conn:
+        current = await conn.run_sync(read_fingerprint)
+        if current == fingerprint:
+            return False
+        derived = [t for t in Base.metadata.sorted_tables if t.info.get("derived")]
+        await conn.run_sync(Base.metadata.drop_all, tables=derived)
+        added = await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_write_fingerprint, fingerprint)
+    if added:
+        logger.info("Добавлены колонки: %s", ", ".join(added))
+    logger.info("Схема БД обновлена (отпечаток %s)", fingerprint[:12])
+    return True
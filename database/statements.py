@@ -0,0 +1,120 @@
+"""Готовые параметризованные запросы для горячих путей (бот, API) и учёт кэша SQL.
+
+select(...) с options() на каждый вызов — это построение дерева выражения и
+вычисление его ключа кэша (обход всего дерева) до того, как SQLAlchemy найдёт
+уже скомпилированный SQL. Запросы ниже собираются один раз при импорте,
+значения передаются через bindparam при выполнении, а ключ кэша у готового
+объекта вычисляется однажды и запоминается:
+
+    item = (await session.execute(ITEM_BY_ID, {"item_id": 5})).scalar_one_or_none()
+
+Запросы, набор условий которых зависит от аргументов (фильтры /get_items),
+кэшируются по этому набору (catalog.read_model._payloads_query). lambda_stmt
+здесь не используется: при выполнении через ORM-сессию он каждый раз копирует
+запрос и выходит медленнее обычного select (см. benchmarks.bench_statements).
+Готовые объекты общие — их не изменяют, а строят от них новые (.where(...)
+возвращает копию).
+
+stats считает попадания в кэш скомпилированного SQL по всем запросам движка
+(подключается в main, итог — в лог при остановке).
+"""
+from dataclasses import dataclass, field
+
+from sqlalchemy import bindparam, event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import selectinload
+
+from models.catalog import CatalogChange, CatalogItem
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item, item_flavor_association
+
+# --- Товары ---
+
+# Товар для редактирования в боте: вкусы и категория
+ITEM_BY_ID = (
+    select(Item)
+    .where(Item.id == bindparam("item_id"))
+    .options(selectinload(Item.flavors), selectinload(Item.category))
+)
+# Товар со вкусами (API: вкусы товара, добавление/удаление вкуса)
+ITEM_WITH_FLAVORS_BY_ID = (
+    select(Item)
+    .where(Item.id == bindparam("item_id"))
+    .options(selectinload(Item.flavors))
+)
+ITEM_IDS_BY_CATEGORY = select(Item.id).where(Item.category_id == bindparam("category_id"))
+ITEM_IDS_BY_FLAVOR = select(item_flavor_association.c.item_id).where(
+    item_flavor_association.c.flavor_id == bindparam("flavor_id")
+)
+LISTED_IDS_BY_CATEGORY = select(CatalogItem.item_id).where(
+    CatalogItem.category_id == bindparam("category_id")
+)
+
+# --- Вкусы ---
+
+FLAVOR_ROWS_ORDERED = select(Flavor.id, Flavor.name).order_by(Flavor.name)
+# expanding: список любой длины подставляется в IN (...) при выполнении
+FLAVORS_BY_IDS = (
+    select(Flavor)
+    .where(Flavor.id.in_(bindparam("ids", expanding=True)))
+    .order_by(Flavor.name)
+)
+FLAVOR_IDS_BY_IDS = select(Flavor.id).where(Flavor.id.in_(bindparam("ids", expanding=True)))
+
+# --- Категории ---
+
+# Категории для ответов API: с метаданными фото (ключи — PHOTO_FIELDS)
+CATEGORY_ROWS_ORDERED = select(Category.id, Category.name, *Category.photo_columns()).order_by(
+    Category.name
+)
+
+# --- Каталог ---
+
+# Версия каталога — номер последней записи журнала (catalog.changelog)
+CATALOG_VERSION = select(func.max(CatalogChange.version))
+
+
+@dataclass
+class StatementStats:
+    """Счётчики кэша скомпилированного SQL (ExecutionContext.cache_hit) по движку."""
+
+    hits: int = 0
+    misses: int = 0
+    # Запрос без ключа кэша (текстовый SQL, DDL, lambda с некэшируемым замыканием)
+    uncached: int = 0
+    _engines: list[Engine] = field(default_factory=list, repr=False)
+
+    def attach(self, engine: AsyncEngine | Engine) -> None:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if not event.contains(sync_engine, "after_cursor_execute", self._count):
+            event.listen(sync_engine, "after_cursor_execute", self._count)
+            self._engines.append(sync_engine)
+
+    def detach(self) -> None:
+        for sync_engine in self._engines:
+            event.remove(sync_engine, "after_cursor_execute", self._count)
+        self._engines.clear()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is None:
+            return
+        cache_hit = context.cache_hit
+        if cache_hit is context.dialect.CACHE_HIT:
+            self.hits += 1
+        elif cache_hit is context.dialect.CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+    @property
+    def hit_rate(self) -> float:
+        cached = self.hits + self.misses
+        return self.hits / cached if cached else 0.0
+
+    def reset(self) -> None:
+        self.hits = self.misses = self.uncached = 0
+
+
+stats = StatementStats()
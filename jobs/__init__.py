@@ -0,0 +1 @@
+"""Фоновые задачи: очередь на таблице jobs (jobs.queue) и их обработчики (jobs.tasks)."""
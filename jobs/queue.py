@@ -0,0 +1,455 @@
+"""Очередь фоновых задач на таблице jobs с пулом воркеров в процессе приложения.
+
+Тяжёлые операции (переоценка, пересборка витрины, сборка загрузок) не
+выполняются в запросе или хендлере бота: они ставятся в очередь (enqueue) и
+сразу возвращают задачу. Воркеры (JobQueue.run, запускается из lifespan)
+забирают задачи атомарным UPDATE ... RETURNING, поэтому одна задача не
+достанется двум воркерам.
+
+* Повторы: упавшая задача возвращается в очередь с экспоненциальной паузой,
+  после max_attempts помечается failed.
+* Прерванные задачи: процесс отмечает свои выполняемые задачи (locked_by,
+  heartbeat_at) раз в JOB_HEARTBEAT_INTERVAL. Задачу без отметки дольше
+  JOB_STALE_AFTER (процесс упал или хост недоступен) любой живой процесс
+  возвращает в очередь — обработчики должны быть идемпотентны. Задачи живого
+  процесса на другом хосте с общей БД не трогаются.
+* Идемпотентность: enqueue с тем же idempotency_key возвращает существующую
+  задачу, а не создаёт новую (повторная доставка апдейта Telegram, повтор
+  HTTP-запроса клиентом).
+* Прогресс: JobContext.progress пишет в БД и правит одно сообщение Telegram
+  не чаще JOB_PROGRESS_INTERVAL — через notifier, который регистрирует бот.
+* Хранение: завершённые задачи (done/failed) удаляются через
+  JOB_RETENTION_DAYS дней — задачи по расписанию не копятся в таблице вечно.
+"""
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import dataclass, field
+from datetime import timedelta
+from time import monotonic
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from catalog.pricing import utcnow
+from config import (
+    JOB_HEARTBEAT_INTERVAL,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL,
+    JOB_PROGRESS_INTERVAL,
+    JOB_RETENTION_DAYS,
+    JOB_RETRY_BASE,
+    JOB_STALE_AFTER,
+    JOB_WORKERS,
+)
+from database.db import new_async_session
+from models.job import Job
+from schemas.jobs import JobPayloadSchema
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+# Как часто удаляются завершённые задачи старше retention_days (сек)
+PURGE_INTERVAL = 3600
+
+Handler = Callable[..., Awaitable[dict | None]]
+# notifier(chat_id, message_id, text) — правка статусного сообщения (регистрирует бот)
+Notifier = Callable[[int, int, str], Awaitable[None]]
+
+
+class InvalidPayload(Exception):
+    """Параметры задачи не прошли схему типа или проверку обработчика — повтор не поможет.
+
+    Только эта ошибка завершает задачу без повторов; любая другая (в том числе
+    ValueError или TypeError из ошибки в коде обработчика) повторяется как обычно.
+    errors — ошибки pydantic по полям, если параметры не прошли схему.
+    """
+
+    def __init__(self, message: str, errors: list[dict[str, Any]] | None = None) -> None:
+        super().__init__(message)
+        self.errors = errors or []
+
+
+@dataclass
+class JobKind:
+    name: str
+    title: str
+    handler: Handler
+    payload: type[BaseModel] = JobPayloadSchema
+
+    def validate(self, payload: dict[str, Any] | None) -> dict[str, Any]:
+        """Параметры по схеме типа (только переданные поля); иначе InvalidPayload."""
+        try:
+            return self.payload.model_validate(payload or {}).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False)
+            fields = "; ".join(f"{'.'.join(map(str, error['loc'])) or 'payload'}: {error['msg']}" for error in errors)
+            raise InvalidPayload(f"Неверные параметры задачи {self.name}: {fields}", errors) from e
+
+
+_kinds: dict[str, JobKind] = {}
+
+
+def register(
+    name: str, title: str, payload: type[BaseModel] = JobPayloadSchema
+) -> Callable[[Handler], Handler]:
+    """Декоратор: зарегистрировать обработчик задач типа name.
+
+    Обработчик: async def handler(ctx: JobContext, **payload) -> dict | None;
+    ключ "summary" результата показывается в итоговом сообщении. payload —
+    pydantic-схема параметров: по ней они проверяются при постановке в очередь
+    (в HTTP — 422), поля схемы совпадают с именованными аргументами обработчика.
+    """
+    def decorator(handler: Handler) -> Handler:
+        _kinds[name] = JobKind(name, title, handler, payload)
+        return handler
+    return decorator
+
+
+def kinds() -> dict[str, JobKind]:
+    return dict(_kinds)
+
+
+@dataclass
+class JobContext:
+    """Передаётся обработчику: параметры задачи, фабрика сессий и отчёт о прогрессе."""
+    queue: "JobQueue"
+    job_id: int
+    kind: JobKind
+    attempt: int
+    chat_id: int | None = None
+    message_id: int | None = None
+    checkpoint: Any = None
+    _last_report: float = field(default=0.0, repr=False)
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        return self.queue.session_factory
+
+    async def save_checkpoint(self, session: AsyncSession, value: Any) -> None:
+        """Записать отметку о сделанной части работы в транзакции session.
+
+        Коммитится вместе с самой работой, поэтому повтор после сбоя продолжит
+        с ctx.checkpoint и не применит уже сделанное второй раз.
+        """
+        self.checkpoint = value
+        await session.execute(
+            update(Job).where(Job.id == self.job_id).values(checkpoint=value, updated_at=utcnow())
+        )
+
+    async def progress(self, done: int, total: int, force: bool = False) -> None:
+        """Сообщить прогресс. В БД и в Telegram уходит не чаще JOB_PROGRESS_INTERVAL."""
+        now = monotonic()
+        if not force and done < total and now - self._last_report < self.queue.progress_interval:
+            return
+        self._last_report = now
+        async with self.session_factory() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(progress_done=done, progress_total=total, updated_at=utcnow())
+            )
+            await session.commit()
+        percent = done * 100 // total if total else 100
+        await self.queue.notify(
+            self, f"⏳ {self.kind.title} (задача #{self.job_id}): {done}/{total} ({percent}%)"
+        )
+
+
+class JobQueue:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        workers: int = JOB_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_base: float = JOB_RETRY_BASE,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        progress_interval: float = JOB_PROGRESS_INTERVAL,
+        retention_days: int = JOB_RETENTION_DAYS,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+        stale_after: float = JOB_STALE_AFTER,
+    ) -> None:
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.retention_days = retention_days
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        # Владелец задач этого процесса: хост, pid и случайный суффикс (pid переиспользуется)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.notifier: Notifier | None = None
+        # Один «жетон» на поставленную задачу: будит ровно одного ждущего воркера
+        self._signals: asyncio.Queue[None] = asyncio.Queue()
+
+    def set_notifier(self, notifier: Notifier | None) -> None:
+        self.notifier = notifier
+
+    async def notify(self, ctx: JobContext, text: str) -> None:
+        if self.notifier is None or ctx.chat_id is None or ctx.message_id is None:
+            return
+        try:
+            await self.notifier(ctx.chat_id, ctx.message_id, text)
+        except Exception:
+            logger.warning("Не удалось обновить статус задачи #%d в Telegram", ctx.job_id, exc_info=True)
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any] | None = None,
+        idempotency_key: str | None = None,
+        chat_id: int | None = None,
+        message_id: int | None = None,
+        max_attempts: int | None = None,
+    ) -> Job:
+        """Поставить задачу в очередь и вернуть её (или существующую с тем же ключом).
+
+        payload проверяется схемой типа задачи: при ошибке — InvalidPayload до записи в БД.
+        """
+        if kind not in _kinds:
+            raise ValueError(f"Неизвестный тип задачи: {kind}")
+        payload = _kinds[kind].validate(payload)
+        now = utcnow()
+        async with self.session_factory() as session:
+            if idempotency_key is not None:
+                existing = await self._by_key(session, idempotency_key)
+                if existing is not None:
+                    return existing
+            job = Job(
+                kind=kind,
+                payload=payload,
+                status=STATUS_QUEUED,
+                idempotency_key=idempotency_key,
+                attempts=0,
+                max_attempts=max_attempts or self.max_attempts,
+                run_after=now,
+                progress_done=0,
+                progress_total=0,
+                chat_id=chat_id,
+                message_id=message_id,
+                created_at=now,
+                updated_at=now,
+            )
+            session.add(job)
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Тот же ключ успели поставить параллельно — отдаём ту задачу
+                await session.rollback()
+                return await self._by_key(session, idempotency_key)
+        self._signals.put_nowait(None)
+        logger.info("Задача #%d (%s) поставлена в очередь", job.id, kind)
+        return job
+
+    @staticmethod
+    async def _by_key(session: AsyncSession, idempotency_key: str) -> Job | None:
+        return await session.scalar(select(Job).where(Job.idempotency_key == idempotency_key))
+
+    async def get(self, job_id: int) -> Job | None:
+        async with self.session_factory() as session:
+            return await session.get(Job, job_id)
+
+    async def recover(self) -> int:
+        """Вернуть в очередь задачи, чей процесс перестал отмечаться. Возвращает их число.
+
+        Задачи без heartbeat_at — поставленные до появления отметок — тоже считаются
+        зависшими.
+        """
+        stale = utcnow() - timedelta(seconds=self.stale_after)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(
+                    Job.status == STATUS_RUNNING,
+                    (Job.heartbeat_at.is_(None)) | (Job.heartbeat_at < stale),
+                )
+                .values(status=STATUS_QUEUED, locked_by=None, run_after=utcnow(), updated_at=utcnow())
+            )
+            await session.commit()
+        return result.rowcount or 0
+
+    async def heartbeat(self) -> int:
+        """Отметить выполняемые этим процессом задачи. Возвращает их число."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.status == STATUS_RUNNING, Job.locked_by == self.worker_id)
+                .values(heartbeat_at=utcnow())
+            )
+            await session.commit()
+        return result.rowcount or 0
+
+    async def _heartbeat_forever(self) -> None:
+        """Отметки своих задач и возврат чужих зависших — раз в heartbeat_interval."""
+        while True:
+            try:
+                await self.heartbeat()
+                recovered = await self.recover()
+                if recovered:
+                    logger.warning("Возвращено в очередь зависших задач: %d", recovered)
+                    for _ in range(recovered):
+                        self._signals.put_nowait(None)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Не удалось обновить отметки задач")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def purge(self) -> int:
+        """Удалить done/failed задачи, не менявшиеся retention_days дней. Возвращает их число.
+
+        Вместе со строкой уходит и её idempotency_key: ключи расписаний (номер
+        интервала) и апдейтов Telegram к этому времени повторно не приходят.
+        """
+        if self.retention_days <= 0:
+            return 0
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(Job).where(
+                    Job.status.in_((STATUS_DONE, STATUS_FAILED)),
+                    Job.updated_at < utcnow() - timedelta(days=self.retention_days),
+                )
+            )
+            await session.commit()
+        return result.rowcount or 0
+
+    async def _purge_forever(self) -> None:
+        while True:
+            try:
+                purged = await self.purge()
+                if purged:
+                    logger.info("Удалено завершённых задач старше %d дн.: %d", self.retention_days, purged)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Не удалось удалить старые задачи")
+            await asyncio.sleep(PURGE_INTERVAL)
+
+    async def _claim(self) -> tuple | None:
+        now = utcnow()
+        candidate = (
+            select(Job.id)
+            .where(Job.status == STATUS_QUEUED, Job.run_after <= now)
+            .order_by(Job.run_after, Job.id)
+            .limit(1)
+            # PostgreSQL: воркеры не ждут друг друга на одной строке (SQLite FOR UPDATE опускает)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == candidate, Job.status == STATUS_QUEUED)
+                .values(
+                    status=STATUS_RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_by=self.worker_id,
+                    heartbeat_at=now,
+                    updated_at=now,
+                )
+                .returning(
+                    Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts,
+                    Job.chat_id, Job.message_id, Job.checkpoint,
+                )
+            )
+            row = result.first()
+            await session.commit()
+        return row
+
+    async def _next_due_in(self) -> float:
+        async with self.session_factory() as session:
+            next_at = await session.scalar(
+                select(func.min(Job.run_after)).where(Job.status == STATUS_QUEUED)
+            )
+        if next_at is None:
+            return self.poll_interval
+        return min(max((next_at - utcnow()).total_seconds(), 0.0), self.poll_interval)
+
+    async def _finish(self, job_id: int, **values) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(Job).where(Job.id == job_id).values(updated_at=utcnow(), **values)
+            )
+            await session.commit()
+
+    async def _execute(self, row) -> None:
+        job_id, kind_name, payload, attempt, max_attempts, chat_id, message_id, checkpoint = row
+        kind = _kinds.get(kind_name)
+        if kind is None:
+            await self._finish(job_id, status=STATUS_FAILED, error=f"Неизвестный тип задачи: {kind_name}")
+            return
+        ctx = JobContext(self, job_id, kind, attempt, chat_id, message_id, checkpoint)
+        try:
+            # Задачу могли поставить до изменения схемы — параметры проверяются снова
+            result = await kind.handler(ctx, **kind.validate(payload)) or {}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < max_attempts and not isinstance(e, InvalidPayload):
+                delay = self.retry_base * 2 ** (attempt - 1)
+                await self._finish(
+                    job_id,
+                    status=STATUS_QUEUED,
+                    error=error,
+                    run_after=utcnow() + timedelta(seconds=delay),
+                )
+                logger.warning("Задача #%d (%s) упала, повтор через %.0f с: %s", job_id, kind_name, delay, error)
+                await self.notify(
+                    ctx, f"🔁 {kind.title} (задача #{job_id}): ошибка, повтор через {delay:.0f} с"
+                )
+            else:
+                await self._finish(job_id, status=STATUS_FAILED, error=error)
+                if isinstance(e, InvalidPayload):
+                    logger.error("Задача #%d (%s) не выполнена, повтор не поможет: %s", job_id, kind_name, error)
+                else:
+                    logger.error(
+                        "Задача #%d (%s) не выполнена после %d попыток: %s", job_id, kind_name, attempt, error
+                    )
+                await self.notify(ctx, f"❌ {kind.title} (задача #{job_id}): {error}")
+            return
+        await self._finish(job_id, status=STATUS_DONE, result=result, error=None)
+        logger.info("Задача #%d (%s) выполнена", job_id, kind_name)
+        summary = result.get("summary") or "готово"
+        await self.notify(ctx, f"✅ {kind.title} (задача #{job_id}): {summary}")
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                row = await self._claim()
+                if row is not None:
+                    await self._execute(row)
+                    continue
+                delay = await self._next_due_in()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка воркера очереди задач")
+                delay = self.poll_interval
+            try:
+                await asyncio.wait_for(self._signals.get(), delay)
+            except TimeoutError:
+                pass
+
+    async def run(self) -> None:
+        """Фоновая задача для lifespan: пул воркеров, отметки выполняемых задач с
+        возвратом зависших и удаление старых завершённых задач."""
+        self._signals = asyncio.Queue()
+        await asyncio.gather(
+            self._heartbeat_forever(),
+            self._purge_forever(),
+            *(self._worker() for _ in range(self.workers)),
+        )
+
+
+queue = JobQueue(new_async_session)
@@ -0,0 +1,195 @@
+"""Обработчики фоновых задач. Импорт модуля регистрирует их в jobs.queue.
+
+Каждый обработчик переживает повтор: работа идёт пачками, и то, что уже
+закоммичено, при повторе не применяется второй раз.
+"""
+import os
+
+from sqlalchemy import select, update
+
+from analytics.aggregate import aggregate
+from catalog.changes import touch_category, touch_flavor, touch_items
+from config import (
+    UPLOAD_DIR,
+    UPLOAD_GC_BATCH,
+    UPLOAD_GC_GRACE,
+    UPLOAD_GC_MODE,
+    UPLOAD_QUARANTINE_DIR,
+)
+from core import files, images
+from core.uploads_gc import MODE_QUARANTINE, UploadGarbageCollector
+from database import backup
+from jobs.queue import InvalidPayload, JobContext, register
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item
+from schemas.jobs import RepricePayloadSchema, UploadsGcPayloadSchema
+
+CHUNK_SIZE = 200
+
+
+@register("items.reprice", "Переоценка товаров", RepricePayloadSchema)
+async def reprice_items(ctx: JobContext, percent: float, category_id: int | None = None) -> dict:
+    """Изменить цены на percent процентов (всего каталога или категории).
+
+    Пачка товаров и отметка о последнем обработанном id коммитятся вместе,
+    поэтому повтор после сбоя продолжает с места остановки.
+    """
+    factor = 1 + float(percent) / 100
+    if factor <= 0:
+        raise InvalidPayload("Цена после переоценки должна быть больше нуля")
+    query = select(Item.id).order_by(Item.id)
+    if category_id is not None:
+        query = query.where(Item.category_id == category_id)
+    async with ctx.session_factory() as session:
+        all_ids = list(await session.scalars(query))
+
+    last_id = ctx.checkpoint or 0
+    item_ids = [item_id for item_id in all_ids if item_id > last_id]
+    done_before = len(all_ids) - len(item_ids)
+    total = len(all_ids)
+    for start in range(0, len(item_ids), CHUNK_SIZE):
+        chunk = item_ids[start:start + CHUNK_SIZE]
+        async with ctx.session_factory() as session:
+            await session.execute(
+                update(Item).where(Item.id.in_(chunk)).values(price=Item.price * factor)
+            )
+            touch_items(session, *chunk)
+            await ctx.save_checkpoint(session, chunk[-1])
+            await session.commit()
+        await ctx.progress(done_before + start + len(chunk), total)
+    sign = "+" if percent > 0 else ""
+    return {
+        "updated": len(item_ids),
+        "summary": f"цены изменены на {sign}{percent:g}% у {total} товаров",
+    }
+
+
+@register("catalog.rebuild", "Пересборка витрины")
+async def rebuild_catalog(ctx: JobContext) -> dict:
+    """Пересобрать строки витрины всех товаров пачками, не останавливая чтение каталога.
+
+    В отличие от read_model.rebuild_all, таблица не очищается: каждая пачка
+    пересобирается через touch_items, а подписчики SSE и фасеты получают дельты.
+    """
+    async with ctx.session_factory() as session:
+        item_ids = list(await session.scalars(select(Item.id).order_by(Item.id)))
+    for start in range(0, len(item_ids), CHUNK_SIZE):
+        chunk = item_ids[start:start + CHUNK_SIZE]
+        async with ctx.session_factory() as session:
+            touch_items(session, *chunk)
+            await session.commit()
+        await ctx.progress(start + len(chunk), len(item_ids))
+    return {"items": len(item_ids), "summary": f"пересобрано товаров: {len(item_ids)}"}
+
+
+@register("images.backfill", "Метаданные картинок")
+async def backfill_images(ctx: JobContext) -> dict:
+    """Размер, цвет и заглушка (core.images) для фото, загруженных до их появления.
+
+    Берутся строки без photo_width; пачка обновляется и коммитится вместе с
+    отметкой для витрины, так что повтор продолжает с необработанных. Файлы,
+    которые не удалось разобрать, пропускаются (и снова пробуются при повторе).
+    """
+    pending = []
+    async with ctx.session_factory() as session:
+        for model in (Category, Flavor, Item):
+            rows = await session.execute(
+                select(model.id, model.photo).where(model.photo_width.is_(None)).order_by(model.id)
+            )
+            pending.extend((model, row_id, photo) for row_id, photo in rows if photo)
+
+    described = 0
+    for start in range(0, len(pending), CHUNK_SIZE):
+        chunk = pending[start:start + CHUNK_SIZE]
+        async with ctx.session_factory() as session:
+            for model, row_id, photo in chunk:
+                meta = await images.describe(files.upload_path(photo))
+                if meta is None:
+                    continue
+                # Фото могло смениться, пока файл разбирался, — обновляем только то же самое
+                result = await session.execute(
+                    update(model)
+                    .where(model.id == row_id, model.photo == photo)
+                    .values(
+                        photo_width=meta.width,
+                        photo_height=meta.height,
+                        photo_color=meta.color,
+                        photo_placeholder=meta.placeholder,
+                    )
+                )
+                if not result.rowcount:
+                    continue
+                described += 1
+                if model is Category:
+                    await touch_category(session, row_id)
+                elif model is Flavor:
+                    await touch_flavor(session, row_id)
+                else:
+                    touch_items(session, row_id)
+            await session.commit()
+        await ctx.progress(start + len(chunk), len(pending))
+    return {
+        "described": described,
+        "skipped": len(pending) - described,
+        "summary": f"обработано картинок {described} из {len(pending)}",
+    }
+
+
+@register("uploads.gc", "Очистка загрузок", UploadsGcPayloadSchema)
+async def collect_uploads(ctx: JobContext, mode: str = UPLOAD_GC_MODE) -> dict:
+    """Внеочередной проход сборщика осиротевших загрузок (core.uploads_gc)."""
+    collector = UploadGarbageCollector(
+        ctx.session_factory,
+        UPLOAD_DIR,
+        UPLOAD_QUARANTINE_DIR,
+        mode=mode,
+        grace_seconds=UPLOAD_GC_GRACE,
+        batch_size=UPLOAD_GC_BATCH,
+    )
+    report = await collector.collect(on_progress=ctx.progress)
+    return {
+        "scanned": report.scanned,
+        "orphans": report.orphans,
+        "bytes_reclaimed": report.bytes_reclaimed,
+        "bytes_quarantined": report.bytes_quarantined,
+        "summary": (
+            f"проверено {report.scanned}, убрано {report.orphans} "
+            + (
+                f"(в карантин {report.bytes_quarantined // 1024} КБ)"
+                if mode == MODE_QUARANTINE
+                else f"(освобождено {report.bytes_reclaimed // 1024} КБ)"
+            )
+        ),
+    }
+
+
+@register("analytics.aggregate", "Пересчёт подборок")
+async def aggregate_recommendations(ctx: JobContext) -> dict:
+    """Популярное и «смотрят вместе» по событиям витрины (analytics.aggregate)."""
+    report = await aggregate(ctx.session_factory, on_progress=ctx.progress)
+    return {
+        "items": report.items,
+        "sessions": report.sessions,
+        "summary": f"товаров {report.items}, сессий {report.sessions}",
+    }
+
+
+@register("db.backup", "Резервная копия БД")
+async def backup_database(ctx: JobContext) -> dict:
+    """Онлайн-копия SQLite в BACKUP_DIR с ротацией (database.backup).
+
+    Повтор просто делает новую копию: незаконченная осталась во временном файле
+    и удалена.
+    """
+    report = await backup.create(on_progress=ctx.progress)
+    return {
+        "path": report.path,
+        "size": report.size,
+        "pages": report.pages,
+        "restarts": report.restarts,
+        "summary": (
+            f"{os.path.basename(report.path)}, {report.size / 1024 / 1024:.1f} МБ "
+            f"за {report.duration_ms / 1000:.1f} с"
+        ),
+    }
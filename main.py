@@ -1,4 +1,9 @@
+import time
+
+_started_at = time.perf_counter()
+
 import asyncio
+import importlib
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -10,54 +15,178 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from starlette.staticfiles import StaticFiles
 
-from config import setup_logging
+from config import (
+    setup_logging,
+    ANALYTICS_AGGREGATE_INTERVAL,
+    BACKUP_INTERVAL,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_TRUST_FORWARDED,
+    RATE_LIMITS,
+    UPLOAD_DIR,
+    UPLOAD_GC_BATCH,
+    UPLOAD_GC_GRACE,
+    UPLOAD_GC_INTERVAL,
+    UPLOAD_GC_MODE,
+    UPLOAD_QUARANTINE_DIR,
+    SNAPSHOT_DIR,
+)
 
 setup_logging()
 
-from database.db import Base, engine
-import models.category  # noqa: F401 — регистрация модели для create_all
-from routes import items, flavors, categories
-
-from bot.bot import create_bot_and_dispatcher, run_polling
+from analytics import aggregate as analytics_aggregate
+from analytics.buffer import buffer as analytics_buffer
+from catalog import changelog, facets, read_model, response_cache
+from catalog.events import broker as catalog_broker
+from catalog.promotions import scheduler as promotion_scheduler
+from catalog.snapshot import MANIFEST_NAME, builder as snapshot_builder
+from core import compression, files, images
+from core.compression import CompressionMiddleware
+from core.ratelimit import Limit, RateLimiter, RateLimitMiddleware
+from core.static import PrecompressedStaticFiles
+from core.timeline import StartupTimeline
+from core.uploads_gc import UploadGarbageCollector
+from database import backup, statements
+from database.db import engine, new_async_session
+from database.schema import ensure_schema, schema_fingerprint
+from jobs import tasks  # noqa: F401 — регистрирует типы фоновых задач
+from jobs.queue import queue as job_queue
+from routes import items, flavors, categories, catalog, promotions, jobs, analytics, photos
+
+# aiogram, хендлеры и клавиатуры бота импортируются лениво (см. run_bot) —
+# без токена они не нужны, а их импорт занимает большую часть холодного старта.
 from bot.config import BotConfig
 
 logger = logging.getLogger(__name__)
 
+timeline = StartupTimeline(_started_at)
+timeline.mark("импорты")
+
+
+async def run_bot(config: BotConfig) -> None:
+    """Импорт бота в отдельном потоке и long polling — API к этому моменту уже принимает запросы."""
+    started = time.perf_counter()
+    bot_module = await asyncio.to_thread(importlib.import_module, "bot.bot")
+    bot_instance, dp = bot_module.create_bot_and_dispatcher(config)
+    logger.info(
+        "Телеграм-бот запущен (импорт и настройка %.1f мс)",
+        (time.perf_counter() - started) * 1000,
+    )
+    try:
+        await bot_module.run_polling(bot_instance, dp)
+    finally:
+        job_queue.set_notifier(None)
+        await bot_instance.session.close()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    bot_task = None
-    bot_instance = None
+    statements.stats.attach(engine)
+    created = await ensure_schema(engine)
+    timeline.mark("схема БД" if created else "схема БД (create_all пропущен)")
+    async with new_async_session() as session:
+        seeded = await changelog.ensure_seeded(session)
+        rebuilt = await read_model.ensure_built(session, force=created)
+        compacted = 0 if seeded else await changelog.compact(session)
+        await session.run_sync(facets.index.load)
+        catalog_broker.start(await changelog.current_version(session))
+    if rebuilt is not None:
+        logger.info("Витрина каталога пересобрана: %d товаров", rebuilt)
+    if seeded or compacted:
+        logger.info("Журнал изменений каталога: добавлено %d, свёрнуто %d записей", seeded, compacted)
+    timeline.mark("витрина")
+    if created:
+        # Новые колонки метаданных фото заполняются в фоне (задача переживает перезапуск)
+        await job_queue.enqueue(
+            "images.backfill", idempotency_key=f"images.backfill:{schema_fingerprint()}"
+        )
+
+    background_tasks: list[asyncio.Task] = [
+        asyncio.create_task(promotion_scheduler.run_forever()),
+        asyncio.create_task(job_queue.run()),
+        asyncio.create_task(snapshot_builder.run_forever()),
+        asyncio.create_task(analytics_buffer.run_forever()),
+    ]
+    if ANALYTICS_AGGREGATE_INTERVAL > 0:
+        background_tasks.append(
+            asyncio.create_task(analytics_aggregate.run_forever(ANALYTICS_AGGREGATE_INTERVAL))
+        )
     config = BotConfig.from_env()
     if config.token:
-        bot_instance, dp = create_bot_and_dispatcher(config)
-        bot_task = asyncio.create_task(run_polling(bot_instance, dp))
-        logger.info("Телеграм-бот запущен")
+        background_tasks.append(asyncio.create_task(run_bot(config)))
     else:
         logger.warning("TELEGRAM_BOT_TOKEN не задан — бот не запущен")
+    if UPLOAD_GC_INTERVAL > 0:
+        collector = UploadGarbageCollector(
+            new_async_session,
+            UPLOAD_DIR,
+            UPLOAD_QUARANTINE_DIR,
+            mode=UPLOAD_GC_MODE,
+            grace_seconds=UPLOAD_GC_GRACE,
+            batch_size=UPLOAD_GC_BATCH,
+        )
+        background_tasks.append(asyncio.create_task(collector.run_forever(UPLOAD_GC_INTERVAL)))
+    if BACKUP_INTERVAL > 0:
+        if backup.sqlite_path() is not None:
+            background_tasks.append(asyncio.create_task(backup.run_forever(BACKUP_INTERVAL)))
+        else:
+            logger.info("Резервные копии по расписанию — только для SQLite, DATABASE_URL другой")
+    timeline.mark("фоновые задачи")
+    timeline.report()
 
     yield
 
-    if bot_task is not None:
-        bot_task.cancel()
-        try:
-            await bot_task
-        except asyncio.CancelledError:
-            pass
-    if bot_instance is not None:
-        await bot_instance.session.close()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await files.drain()
+    images.shutdown()
+    compression.shutdown()
+    backup.shutdown()
     await engine.dispose()
+    stats = files.stats()
+    logger.info(
+        "Файловые операции: %d, макс. в работе %d, ожидание в очереди ср. %.1f мс / макс. %.1f мс",
+        stats.completed, stats.max_in_flight, stats.avg_wait_ms, stats.max_wait_ms,
+    )
+    sql = statements.stats
+    logger.info(
+        "Кэш SQL: попаданий %.1f%% (%d из %d), без кэша %d",
+        sql.hit_rate * 100, sql.hits, sql.hits + sql.misses, sql.uncached,
+    )
+    responses = response_cache.cache.stats
+    logger.info(
+        "Кэш ответов каталога: попаданий %.1f%% (%d из %d)",
+        responses.hit_rate * 100, responses.hits, responses.hits + responses.misses,
+    )
 
 
 app = FastAPI(lifespan=lifespan)
 
 
 app.mount("/static", StaticFiles(directory="uploads"), name="static")
+# Снимок каталога (catalog.snapshot); в продакшене его лучше отдавать nginx/CDN напрямую
+os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+app.mount(
+    "/snapshot",
+    PrecompressedStaticFiles(directory=SNAPSHOT_DIR, no_cache={MANIFEST_NAME}),
+    name="snapshot",
+)
 
 
+# Сжатие JSON-ответов (core.compression); добавлено первым — самый внутренний слой
+app.add_middleware(CompressionMiddleware)
+if RATE_LIMIT_ENABLED:
+    # Добавляется раньше CORS, чтобы ответ 429 тоже получал CORS-заголовки
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=RateLimiter(
+            {group: Limit.parse(raw) for group, raw in RATE_LIMITS.items() if raw},
+            max_keys=RATE_LIMIT_MAX_KEYS,
+        ),
+        bot_token=BotConfig.from_env().token,
+        trust_forwarded=RATE_LIMIT_TRUST_FORWARDED,
+    )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -71,6 +200,11 @@ app.add_middleware(
 app.include_router(items.router)
 app.include_router(flavors.router)
 app.include_router(categories.router)
+app.include_router(catalog.router)
+app.include_router(promotions.router)
+app.include_router(jobs.router)
+app.include_router(analytics.router)
+app.include_router(photos.router)
 
 
 @app.get("/", response_class=FileResponse)
@@ -88,4 +222,4 @@ if __name__ == "__main__":
         host="127.0.0.1",
         port=8000,
         log_level=os.getenv("LOG_LEVEL", "info").lower(),
-    )
\ No newline at end of file
+    )
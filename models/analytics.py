@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import Index, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.db import Base
+
+
+class ItemEvent(Base):
+    """Сырое событие витрины: просмотр карточки или добавление в корзину.
+
+    Пишется пачками из буфера (analytics.buffer); старше окна агрегации — удаляется.
+    item_id без внешнего ключа: события удалённых товаров просто не попадают в выборку.
+    """
+    __tablename__ = "item_events"
+    __table_args__ = (
+        Index("ix_item_events_created_at", "created_at"),
+        Index("ix_item_events_session", "session_id", "item_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str]  # view | cart
+    item_id: Mapped[int]
+    session_id: Mapped[str]
+    created_at: Mapped[datetime]
+
+
+class Recommendation(Base):
+    """Готовая подборка: id товаров по убыванию веса.
+
+    kind=popular — key_id категории (0 — весь каталог), kind=also_viewed — key_id
+    товара. Таблица производная: её целиком пересчитывает analytics.aggregate.
+    """
+    __tablename__ = "recommendations"
+    __table_args__ = ({"info": {"derived": True}},)
+
+    kind: Mapped[str] = mapped_column(primary_key=True)
+    key_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    item_ids: Mapped[list[int]] = mapped_column(JSON)
@@ -0,0 +1,52 @@
+from sqlalchemy import Index, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.db import Base
+
+
+class CatalogItem(Base):
+    """Денормализованная запись витрины: товар вместе с категорией и вкусами (готовый JSON).
+
+    Таблица производная — её целиком можно пересобрать из items/categories/flavors
+    (см. catalog.read_model.rebuild_all), поэтому при смене схемы она пересоздаётся.
+    effective_price — цена со всеми действующими скидками (catalog.pricing); индексы
+    по ней обслуживают фильтр по диапазону и сортировку /get_items.
+    """
+    __tablename__ = "catalog_items"
+    __table_args__ = (
+        Index("ix_catalog_items_price", "effective_price", "item_id"),
+        Index("ix_catalog_items_category_price", "category_id", "effective_price", "item_id"),
+        {"info": {"derived": True}},
+    )
+
+    item_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    category_id: Mapped[int | None] = mapped_column(index=True, nullable=True)
+    effective_price: Mapped[float]
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+
+
+class CatalogChange(Base):
+    """Журнал изменений каталога (только добавление): какая сущность изменилась и как.
+
+    version — монотонный номер в порядке commit (выдаёт CatalogVersion); клиент хранит
+    последний полученный и запрашивает изменения «после version» (см. catalog.changelog).
+    """
+    __tablename__ = "catalog_changes"
+
+    version: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    entity: Mapped[str]  # item | category | flavor | item_flavors
+    entity_id: Mapped[int]
+    op: Mapped[str]  # upsert | delete
+
+
+class CatalogVersion(Base):
+    """Счётчик версий каталога — одна строка (id=1).
+
+    Транзакция, записывающая изменения, сначала увеличивает его (UPDATE) и держит
+    блокировку строки до commit: версии выдаются строго в порядке commit, и запись
+    с меньшим номером не может стать видимой позже записи с большим.
+    """
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    version: Mapped[int]
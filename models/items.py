@@ -2,6 +2,7 @@ from sqlalchemy import Table, Column, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.db import Base
+from models.photo import PhotoMixin
 
 item_flavor_association = Table(
     "item_flavor_association",
@@ -11,7 +12,7 @@ item_flavor_association = Table(
 )
 
 
-class Item(Base):
+class Item(PhotoMixin, Base):
     __tablename__ = "items"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -19,7 +20,6 @@ class Item(Base):
     description: Mapped[str]
     price: Mapped[float]
     discount: Mapped[float] = mapped_column(nullable=True)
-    photo: Mapped[str]
     category_id: Mapped[int | None] = mapped_column(
         ForeignKey("categories.id", ondelete="SET NULL"), nullable=True
     )
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.db import Base
+
+
+class Job(Base):
+    """Фоновая задача очереди (jobs.queue): тип, параметры, статус, попытки и прогресс.
+
+    idempotency_key уникален — повторная постановка с тем же ключом возвращает
+    существующую задачу. chat_id/message_id — сообщение Telegram, в котором
+    показывается прогресс (необязательно).
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str]
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    status: Mapped[str]  # queued | running | done | failed
+    idempotency_key: Mapped[str | None] = mapped_column(unique=True, nullable=True)
+    attempts: Mapped[int] = mapped_column(default=0)
+    max_attempts: Mapped[int]
+    run_after: Mapped[datetime]
+    progress_done: Mapped[int] = mapped_column(default=0)
+    progress_total: Mapped[int] = mapped_column(default=0)
+    checkpoint: Mapped[dict | int | None] = mapped_column(JSON, nullable=True)  # см. JobContext.save_checkpoint
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(nullable=True)
+    # Процесс, выполняющий задачу, и его последняя отметка (jobs.queue: возврат зависших задач)
+    locked_by: Mapped[str | None] = mapped_column(nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    chat_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    message_id: Mapped[int | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime]
+    updated_at: Mapped[datetime]
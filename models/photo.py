@@ -0,0 +1,30 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.images import ImageMeta
+
+# Поля фото в строках БД и в JSON ответов каталога (в этом порядке)
+PHOTO_FIELDS = ("photo", "photo_width", "photo_height", "photo_color", "photo_placeholder")
+
+
+class PhotoMixin:
+    """Фото товара, вкуса или категории и его метаданные (см. core.images).
+
+    Метаданные пустые, если картинку не удалось разобрать или она загружена до
+    их появления (их заполняет фоновая задача images.backfill).
+    """
+    photo: Mapped[str]
+    photo_width: Mapped[int | None]
+    photo_height: Mapped[int | None]
+    photo_color: Mapped[str | None] = mapped_column(String(7))
+    photo_placeholder: Mapped[str | None]
+
+    @classmethod
+    def photo_columns(cls) -> tuple:
+        return tuple(getattr(cls, name) for name in PHOTO_FIELDS)
+
+    def set_photo(self, file_name: str, meta: ImageMeta | None) -> None:
+        self.photo = file_name
+        self.photo_width, self.photo_height, self.photo_color, self.photo_placeholder = (
+            meta or (None, None, None, None)
+        )
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.db import Base
+
+
+class Promotion(Base):
+    """Плановая скидка на товар или на всю категорию в окне [starts_at, ends_at).
+
+    Время — UTC без часового пояса. Ровно одно из item_id / category_id задано.
+    """
+    __tablename__ = "promotions"
+    __table_args__ = (
+        Index("ix_promotions_starts_at", "starts_at"),
+        Index("ix_promotions_ends_at", "ends_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    item_id: Mapped[int | None] = mapped_column(
+        ForeignKey("items.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    category_id: Mapped[int | None] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    discount: Mapped[float]  # проценты, 0 < discount <= 100
+    starts_at: Mapped[datetime]
+    ends_at: Mapped[datetime]
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.db import Base
+
+
+class Staff(Base):
+    """Сотрудник, назначенный из бота (/staff_add): роль admin или courier.
+
+    Дополняет TELEGRAM_ADMIN_IDS / TELEGRAM_COURIERS_IDS из окружения — курьера
+    можно добавить без перезапуска (см. bot.roles.RoleResolver).
+    """
+    __tablename__ = "staff"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    role: Mapped[str]
+    created_at: Mapped[datetime]
@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+from fastapi import APIRouter, Query
+from sqlalchemy import select
+
+from analytics.aggregate import ALL_CATEGORIES, KIND_ALSO_VIEWED, KIND_POPULAR, TOP_SIZE
+from analytics.buffer import buffer
+from catalog import read_model
+from core.serialization import JSONBytesResponse, json_array
+from database.db import SessionDep
+from models.analytics import Recommendation
+from routes.items import parse_ids
+from schemas.analytics import ItemEventBatchSchema
+from schemas.items import ItemCatalogSchema
+
+router = APIRouter()
+
+# Сколько последних просмотров клиента учитывается в /recommendations/for_you
+RECENT_ITEMS_MAX = 10
+
+
+@router.post("/analytics/events", status_code=202)
+async def track_events(batch: ItemEventBatchSchema):
+    """Принять просмотры и добавления в корзину с витрины.
+
+    События копятся в памяти и пишутся в БД пачками (analytics.buffer) — запрос
+    в БД не ходит.
+    """
+    accepted = buffer.add(batch.session_id, [(event.kind, event.item_id) for event in batch.events])
+    return {"accepted": accepted}
+
+
+async def _recommended(session: SessionDep, kind: str, key_id: int) -> list[int]:
+    item_ids = await session.scalar(
+        select(Recommendation.item_ids).where(
+            Recommendation.kind == kind, Recommendation.key_id == key_id
+        )
+    )
+    return item_ids or []
+
+
+@router.get(
+    "/recommendations/popular",
+    response_model=list[ItemCatalogSchema],
+    response_class=JSONBytesResponse,
+)
+async def get_popular(session: SessionDep, category_id: int | None = None):
+    """Популярные товары (всего каталога или категории) из подборок analytics.aggregate."""
+    item_ids = await _recommended(session, KIND_POPULAR, category_id or ALL_CATEGORIES)
+    return JSONBytesResponse(json_array(await read_model.get_payloads_by_ids(session, item_ids)))
+
+
+@router.get(
+    "/recommendations/also_viewed/{item_id}",
+    response_model=list[ItemCatalogSchema],
+    response_class=JSONBytesResponse,
+)
+async def get_also_viewed(item_id: int, session: SessionDep):
+    """Товары, которые смотрели вместе с item_id."""
+    item_ids = await _recommended(session, KIND_ALSO_VIEWED, item_id)
+    return JSONBytesResponse(json_array(await read_model.get_payloads_by_ids(session, item_ids)))
+
+
+@router.get(
+    "/recommendations/for_you",
+    response_model=list[ItemCatalogSchema],
+    response_class=JSONBytesResponse,
+)
+async def get_for_you(session: SessionDep, item_ids: str = Query("")):
+    """Подборка по последним просмотрам клиента: item_ids="5,3,8" (сначала свежие).
+
+    Списки «смотрят вместе» этих товаров сливаются с весом по позиции (свежие
+    просмотры и верх списков важнее), уже просмотренные исключаются. Пока
+    просмотров нет — популярное.
+    """
+    recent = list(dict.fromkeys(parse_ids(item_ids, "item_ids")))[:RECENT_ITEMS_MAX]
+    if not recent:
+        return await get_popular(session)
+    rows = await session.execute(
+        select(Recommendation.key_id, Recommendation.item_ids).where(
+            Recommendation.kind == KIND_ALSO_VIEWED, Recommendation.key_id.in_(recent)
+        )
+    )
+    lists = dict(rows.all())
+    scores: dict[int, float] = defaultdict(float)
+    for age, seen_id in enumerate(recent):
+        for rank, candidate in enumerate(lists.get(seen_id, ())):
+            scores[candidate] += 1 / ((age + 1) * (rank + 1))
+    seen = set(recent)
+    ranked = sorted((i for i in scores if i not in seen), key=lambda i: (-scores[i], i))[:TOP_SIZE]
+    return JSONBytesResponse(json_array(await read_model.get_payloads_by_ids(session, ranked)))
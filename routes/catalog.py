@@ -0,0 +1,95 @@
+import asyncio
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from sqlalchemy import select
+
+from catalog import changelog, facets
+from catalog.events import broker
+from core.serialization import JSONBytesResponse, dumps
+from database.db import SessionDep
+from models.flavor import Flavor
+from schemas.flavors import FlavorFacetSchema
+
+router = APIRouter()
+
+# Комментарий SSE раз в KEEPALIVE секунд не даёт прокси закрыть простаивающее соединение
+KEEPALIVE_SECONDS = 25
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+
+
+@router.get("/catalog/stream")
+async def catalog_stream(
+    request: Request,
+    last_event_id: str | None = Header(None),
+):
+    """SSE-поток дельт каталога: item.upsert / item.delete / category.upsert / category.delete.
+
+    id события — версия каталога. Клиент, переподключившийся с Last-Event-ID, получает
+    пропущенные события; если их в истории процесса нет (вытеснены, процесс
+    перезапущен, id больше текущей версии) — событие reset: клиент догружает
+    дельту через /catalog/changes и дальше идёт от текущей версии.
+    """
+    try:
+        cursor = broker.seek(int(last_event_id)) if last_event_id else broker.position
+    except ValueError:
+        cursor = broker.position
+
+    async def stream():
+        nonlocal cursor
+        yield b"retry: 3000\n\n"
+        if cursor is None:
+            cursor = broker.position
+            yield RESET_FRAME
+        while True:
+            frames = broker.frames_after(cursor)
+            if frames is None:
+                cursor = broker.position
+                yield RESET_FRAME
+            elif frames:
+                cursor = frames[-1][0]
+                yield b"".join(frame for _, frame in frames)
+            else:
+                await broker.wait(cursor, KEEPALIVE_SECONDS)
+                if cursor == broker.position:
+                    if await request.is_disconnected():
+                        return
+                    yield b": ping\n\n"
+            await asyncio.sleep(0)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/catalog/changes", response_class=JSONBytesResponse)
+async def catalog_changes(session: SessionDep, since: int = Query(0, ge=0)):
+    """Свёрнутые изменения каталога после версии since: upsert-ы и надгробия.
+
+    since=0 — весь каталог. В ответе version — её клиент передаёт в следующий раз.
+    """
+    return JSONBytesResponse(await changelog.changes_since(session, since))
+
+
+@router.get(
+    "/catalog/facets",
+    response_model=list[FlavorFacetSchema],
+    response_class=JSONBytesResponse,
+)
+async def catalog_facets(session: SessionDep, category_id: int | None = None):
+    """Вкусы категории (или всего каталога) с числом товаров — для чипов фильтра.
+
+    Счётчики берутся из битмапов catalog.facets; из БД читаются только названия вкусов.
+    """
+    counts = facets.index.flavor_counts(category_id)
+    if not counts:
+        return JSONBytesResponse(b"[]")
+    rows = await session.execute(
+        select(Flavor.id, Flavor.name, *Flavor.photo_columns())
+        .where(Flavor.id.in_(counts))
+        .order_by(Flavor.name)
+    )
+    return JSONBytesResponse(dumps([{**row._asdict(), "count": counts[row.id]} for row in rows]))
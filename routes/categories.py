@@ -2,24 +2,43 @@ import os
 from uuid import uuid4
 
 import aiofiles
-from fastapi import APIRouter, Form, HTTPException, UploadFile, File
-from sqlalchemy import select
+from fastapi import APIRouter, Form, Header, HTTPException, UploadFile, File
 
+from catalog import changelog, response_cache
+from catalog.changes import touch_category
 from config import UPLOAD_DIR
+from core import files, images
+from core.serialization import JSONBytesResponse, rows_to_json
+from database import statements
 from database.db import SessionDep
 from models.category import Category
+from models.photo import PHOTO_FIELDS
+from schemas.categories import CategoryGetSchema
 
 router = APIRouter()
 
 
-@router.get("/get_categories")
-async def get_categories(session: SessionDep):
-    """Получить список всех категорий."""
-    result = await session.execute(select(Category).order_by(Category.name))
-    return list(result.scalars().all())
+@router.get(
+    "/get_categories",
+    response_model=list[CategoryGetSchema],
+    response_class=JSONBytesResponse,
+)
+async def get_categories(session: SessionDep, accept_encoding: str | None = Header(None)):
+    """Получить список всех категорий (JSON собирается прямо из кортежей строк).
 
+    Ответ кэшируется до смены версии каталога (catalog.response_cache).
+    """
+    version = await changelog.current_version(session)
+    body = response_cache.cache.get(version, "categories")
+    if body is None:
+        result = await session.execute(statements.CATEGORY_ROWS_ORDERED)
+        body = response_cache.cache.put(
+            version, "categories", rows_to_json(result, ("id", "name", *PHOTO_FIELDS))
+        )
+    return await body.response(accept_encoding)
 
-@router.post("/create_category")
+
+@router.post("/create_category", response_model=CategoryGetSchema)
 async def create_category(
     name: str = Form(...),
     photo: UploadFile = File(...),
@@ -32,36 +51,37 @@ async def create_category(
     async with aiofiles.open(file_path, "wb") as out_file:
         content = await photo.read()
         await out_file.write(content)
+    meta = await images.describe(file_path)
 
     try:
-        new_category = Category(name=name.strip(), photo=file_name)
+        new_category = Category(name=name.strip())
+        new_category.set_photo(file_name, meta)
         session.add(new_category)
+        await session.flush()
+        await touch_category(session, new_category.id)
         await session.commit()
         await session.refresh(new_category)
         return new_category
     except Exception as e:
-        if os.path.exists(file_path):
-            os.remove(file_path)
         await session.rollback()
+        await files.remove(file_path)
         raise HTTPException(status_code=500, detail=f"Ошибка БД: {str(e)}")
 
 
 @router.delete("/categories/{category_id}")
 async def delete_category(category_id: int, session: SessionDep):
-    result = await session.execute(select(Category).where(Category.id == category_id))
-    category = result.scalar_one_or_none()
+    category = await session.get(Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Категория не найдена")
     if category.photo:
-        file_path = os.path.join(UPLOAD_DIR, category.photo)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        files.remove_after_commit(session, files.upload_path(category.photo))
+    await touch_category(session, category_id)
     await session.delete(category)
     await session.commit()
     return {"status": "deleted"}
 
 
-@router.patch("/categories/{category_id}")
+@router.patch("/categories/{category_id}", response_model=CategoryGetSchema)
 async def update_category(
     category_id: int,
     session: SessionDep,
@@ -69,8 +89,7 @@ async def update_category(
     photo: UploadFile = File(None),
 ):
     """Обновить название и/или картинку категории."""
-    result = await session.execute(select(Category).where(Category.id == category_id))
-    category = result.scalar_one_or_none()
+    category = await session.get(Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Категория не найдена")
     if name is not None and name.strip():
@@ -82,11 +101,11 @@ async def update_category(
         async with aiofiles.open(file_path, "wb") as out_file:
             content = await photo.read()
             await out_file.write(content)
+        meta = await images.describe(file_path)
         if category.photo:
-            old_path = os.path.join(UPLOAD_DIR, category.photo)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        category.photo = file_name
+            files.remove_after_commit(session, files.upload_path(category.photo))
+        category.set_photo(file_name, meta)
+    await touch_category(session, category_id)
     await session.commit()
     await session.refresh(category)
     return category
@@ -5,16 +5,19 @@ import aiofiles
 from fastapi import APIRouter, Form, HTTPException, UploadFile, File
 from sqlalchemy import select, delete
 
+from catalog.changes import touch_flavor
 from config import UPLOAD_DIR
+from core import files, images
 from database.db import SessionDep
 from models.flavor import Flavor
 from models.items import Item
+from schemas.flavors import FlavorGetSchema
 
 
 router = APIRouter()
 
 
-@router.post("/create_flavor")
+@router.post("/create_flavor", response_model=FlavorGetSchema)
 async def create_flavor(
         name: str = Form(...),
         photo: UploadFile = File(...),
@@ -27,20 +30,21 @@ async def create_flavor(
     async with aiofiles.open(file_path, 'wb') as out_file:
         content = await photo.read()
         await out_file.write(content)
+    meta = await images.describe(file_path)
 
-    new_flavor = Flavor(
-        name=name,
-        photo=file_name
-    )
+    new_flavor = Flavor(name=name)
+    new_flavor.set_photo(file_name, meta)
 
     session.add(new_flavor)
+    await session.flush()
+    await touch_flavor(session, new_flavor.id)
     await session.commit()
     await session.refresh(new_flavor)
 
     return new_flavor
 
 
-@router.post("/edit_flavor")
+@router.post("/edit_flavor", response_model=FlavorGetSchema)
 async def edit_flavor(
         id: int = Form(...),
         name: str = Form(...),
@@ -48,8 +52,10 @@ async def edit_flavor(
         session: SessionDep = None,
 ):
 
-    result = await session.execute(select(Flavor).where(Flavor.id == id))
-    flavor = result.scalar_one_or_none()
+    flavor = await session.get(Flavor, id)
+
+    if not flavor:
+        raise HTTPException(status_code=404, detail="Вкус не найден")
 
     extension = os.path.splitext(photo.filename)[1]
     file_name = f"{uuid4()}{extension}"
@@ -58,12 +64,13 @@ async def edit_flavor(
     async with aiofiles.open(file_path, 'wb') as out_file:
         content = await photo.read()
         await out_file.write(content)
+    meta = await images.describe(file_path)
 
-    if not flavor:
-        raise HTTPException(status_code=404, detail="Вкус не найден")
-
+    if flavor.photo:
+        files.remove_after_commit(session, files.upload_path(flavor.photo))
     flavor.name = name
-    flavor.photo = file_name
+    flavor.set_photo(file_name, meta)
+    await touch_flavor(session, id)
 
     await session.commit()
     await session.refresh(flavor)
@@ -73,11 +80,15 @@ async def edit_flavor(
 
 @router.delete("/flavors/{flavor_id}")
 async def delete_flavor(flavor_id: int, session: SessionDep):
-    query = delete(Flavor).where(Flavor.id == flavor_id)
-    result = await session.execute(query)
-    await session.commit()
-
-    if result.rowcount == 0:
+    # Проверка до touch_flavor: иначе несуществующий id оставил бы надгробие в журнале
+    # и сдвинул версию каталога
+    row = (await session.execute(select(Flavor.id, Flavor.photo).where(Flavor.id == flavor_id))).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Вкус не найден")
+    if row.photo:
+        files.remove_after_commit(session, files.upload_path(row.photo))
+    await touch_flavor(session, flavor_id)
+    await session.execute(delete(Flavor).where(Flavor.id == flavor_id))
+    await session.commit()
 
     return {"status": "deleted"}
\ No newline at end of file
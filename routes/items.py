@@ -1,27 +1,45 @@
 import os
+from typing import Literal
 
-from sqlalchemy.orm import selectinload
 
+from bot.services.items import ItemService
+from catalog import changelog, facets, read_model, response_cache
+from catalog.changes import touch_items, touch_item_flavors
 from config import UPLOAD_DIR
+from core import files, images
+from core.serialization import JSONBytesResponse, json_array
+from database import statements
 from database.db import SessionDep
 from models.category import Category
 from models.flavor import Flavor
 from models.items import Item
+from schemas.flavors import FlavorGetSchema
+from schemas.items import ItemGetSchema, ItemCatalogSchema
 from uuid import uuid4
-from fastapi import Form, UploadFile, File, APIRouter, HTTPException
-from sqlalchemy import select
+from fastapi import Form, UploadFile, File, APIRouter, Header, HTTPException, Query
 import aiofiles
 
 router = APIRouter()
 
 
-@router.post("/create_items")
+def parse_ids(raw: str, field: str = "flavor_ids") -> list[int]:
+    """Разобрать строку id через запятую ('1,2,3'); 400 при нечисловых значениях."""
+    try:
+        return [int(x.strip()) for x in raw.split(",") if x.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{field} должен быть строкой чисел через запятую (например: '1,2,3')",
+        )
+
+
+@router.post("/create_items", response_model=ItemGetSchema)
 async def create_item(
     name: str = Form(...),
     description: str = Form(...),
     price: float = Form(...),
     category_id: int = Form(...),
-    discount: float = Form(None),
+    discount: float = Form(None, ge=0, le=100),
     flavor_ids: str = Form(None),
     photo: UploadFile = File(...),
     session: SessionDep = None,
@@ -32,6 +50,15 @@ async def create_item(
     if not category:
         raise HTTPException(status_code=404, detail="Категория не найдена")
 
+    # Вкусы проверяются до сохранения фото, чтобы ошибка не оставляла файл без записи в БД
+    selected_flavors = []
+    if flavor_ids:
+        id_list = parse_ids(flavor_ids)
+        result = await session.execute(statements.FLAVORS_BY_IDS, {"ids": id_list})
+        selected_flavors = result.scalars().all()
+        if len(selected_flavors) != len(set(id_list)):
+            raise HTTPException(status_code=404, detail="Один или несколько вкусов не найдены")
+
     extension = os.path.splitext(photo.filename)[1]
     file_name = f"{uuid4()}{extension}"
     file_path = os.path.join(UPLOAD_DIR, file_name)
@@ -39,60 +66,79 @@ async def create_item(
     async with aiofiles.open(file_path, "wb") as out_file:
         content = await photo.read()
         await out_file.write(content)
-
-    selected_flavors = []
-    if flavor_ids:
-        try:
-            id_list = [int(x.strip()) for x in flavor_ids.split(",") if x.strip()]
-            result = await session.execute(select(Flavor).where(Flavor.id.in_(id_list)))
-            selected_flavors = result.scalars().all()
-            if len(selected_flavors) != len(id_list):
-                raise HTTPException(status_code=404, detail="Один или несколько вкусов не найдены")
-        except ValueError:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            raise HTTPException(
-                status_code=400,
-                detail="flavor_ids должен быть строкой чисел через запятую (например: '1,2,3')",
-            )
+    meta = await images.describe(file_path)
 
     try:
         new_item = Item(
             name=name,
             description=description,
             price=price,
-            discount=discount,
+            discount=discount or None,
             category_id=category_id,
             flavors=selected_flavors,
-            photo=file_name,
         )
+        new_item.set_photo(file_name, meta)
         session.add(new_item)
+        await session.flush()
+        if selected_flavors:
+            touch_item_flavors(session, new_item.id)
+        else:
+            touch_items(session, new_item.id)
         await session.commit()
         await session.refresh(new_item)
         return new_item
     except Exception as e:
-        if os.path.exists(file_path):
-            os.remove(file_path)
         await session.rollback()
+        await files.remove(file_path)
         raise HTTPException(status_code=500, detail=f"Ошибка БД: {str(e)}")
 
 
-@router.get("/get_items")
-async def get_items(session: SessionDep, category_id: int | None = None):
-    query = select(Item).options(
-        selectinload(Item.flavors),
-        selectinload(Item.category),
-    )
-    if category_id is not None:
-        query = query.where(Item.category_id == category_id)
-    result = await session.execute(query)
-    return list(result.scalars().unique().all())
+@router.get(
+    "/get_items",
+    response_model=list[ItemCatalogSchema],
+    response_class=JSONBytesResponse,
+)
+async def get_items(
+    session: SessionDep,
+    category_id: int | None = None,
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    sort: Literal["id", "price_asc", "price_desc"] = "id",
+    flavor_ids: str | None = None,
+    flavor_mode: Literal["and", "or"] = "and",
+    accept_encoding: str | None = Header(None),
+):
+    """Товары витрины с категорией и вкусами — готовый JSON из catalog_items без сериализации.
+
+    min_price / max_price и sort=price_asc|price_desc работают по итоговой цене
+    (со скидками и действующими акциями). flavor_ids="1,2" — товары со всеми
+    (flavor_mode=and) или хотя бы одним (or) из вкусов; считается по битмапам
+    catalog.facets, без join-ов.
+
+    Ответ без фильтра по вкусам кэшируется до смены версии каталога вместе со
+    сжатыми вариантами (catalog.response_cache). Фильтр по вкусам считается по
+    битмапам в памяти, которые обновляются уже после commit, — такой ответ не
+    кэшируется (его сжимает core.compression.CompressionMiddleware).
+    """
+    if flavor_ids:
+        item_mask = facets.index.match(parse_ids(flavor_ids), flavor_mode, category_id)
+        payloads = await read_model.get_payloads(
+            session, category_id, min_price, max_price, sort, item_mask
+        )
+        return JSONBytesResponse(json_array(payloads))
+
+    key = ("items", category_id, min_price, max_price, sort)
+    version = await changelog.current_version(session)
+    body = response_cache.cache.get(version, key)
+    if body is None:
+        payloads = await read_model.get_payloads(session, category_id, min_price, max_price, sort)
+        body = response_cache.cache.put(version, key, json_array(payloads))
+    return await body.response(accept_encoding)
 
 
-@router.get("/items/{item_id}/flavors")
+@router.get("/items/{item_id}/flavors", response_model=list[FlavorGetSchema])
 async def get_item_flavors(item_id: int, session: SessionDep):
-    stmt = select(Item).where(Item.id == item_id).options(selectinload(Item.flavors))
-    result = await session.execute(stmt)
+    result = await session.execute(statements.ITEM_WITH_FLAVORS_BY_ID, {"item_id": item_id})
     item = result.scalar_one_or_none()
 
     if not item:
@@ -101,21 +147,64 @@ async def get_item_flavors(item_id: int, session: SessionDep):
     return item.flavors
 
 
+@router.put("/items/{item_id}/flavors")
+async def set_item_flavors(item_id: int, session: SessionDep, flavor_ids: str = Form("")):
+    """Заменить набор вкусов товара целиком: flavor_ids="1,2,3" (пустая строка — без вкусов).
+
+    Разница с текущими связями применяется одним INSERT и одним DELETE в одной транзакции.
+    """
+    result = await ItemService(session).set_flavors(item_id, parse_ids(flavor_ids))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Товар или один из вкусов не найден")
+    added, removed = result
+    return {"status": "success", "added": sorted(added), "removed": sorted(removed)}
+
+
+# --- Массовые операции: item_ids="1,2,3", один запрос к БД и один commit на пакет ---
+
+
+@router.post("/items/bulk_delete")
+async def bulk_delete_items(session: SessionDep, item_ids: str = Form(...)):
+    """Удалить несколько товаров; фото удаляются одним пакетом после commit."""
+    deleted = await ItemService(session).delete_items(parse_ids(item_ids, "item_ids"))
+    return {"status": "success", "affected": deleted}
+
+
+@router.post("/items/bulk_move")
+async def bulk_move_items(session: SessionDep, item_ids: str = Form(...), category_id: int = Form(...)):
+    """Перенести несколько товаров в категорию."""
+    moved = await ItemService(session).move_items(parse_ids(item_ids, "item_ids"), category_id)
+    if moved is None:
+        raise HTTPException(status_code=404, detail="Категория не найдена")
+    return {"status": "success", "affected": moved}
+
+
+@router.post("/items/bulk_discount")
+async def bulk_discount_items(
+    session: SessionDep,
+    item_ids: str = Form(...),
+    discount: float = Form(None, ge=0, le=100),
+):
+    """Задать скидку (в процентах) нескольким товарам; без discount или 0 — снять скидку."""
+    updated = await ItemService(session).set_discount(
+        parse_ids(item_ids, "item_ids"), discount or None
+    )
+    return {"status": "success", "affected": updated}
+
+
 @router.delete("/items/{item_id}")
 async def delete_item(item_id: int, session: SessionDep):
 
-    result = await session.execute(select(Item).where(Item.id == item_id))
-    item = result.scalar_one_or_none()
+    item = await session.get(Item, item_id)
 
     if not item:
         raise HTTPException(status_code=404, detail="Товар не найден")
 
     if item.photo:
-        file_path = os.path.join(UPLOAD_DIR, item.photo)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        files.remove_after_commit(session, files.upload_path(item.photo))
 
     await session.delete(item)
+    touch_items(session, item_id)
     await session.commit()
 
     return {"status": "success", "message": f"Item {item_id} and its relations deleted"}
@@ -123,8 +212,7 @@ async def delete_item(item_id: int, session: SessionDep):
 
 @router.post("/add_flavor_to_item")
 async def add_flavor_to_item(item_id: int, flavor_id: int, session: SessionDep):
-    stmt = select(Item).where(Item.id == item_id).options(selectinload(Item.flavors))
-    result = await session.execute(stmt)
+    result = await session.execute(statements.ITEM_WITH_FLAVORS_BY_ID, {"item_id": item_id})
     item = result.scalar_one_or_none()
 
     if not item:
@@ -138,14 +226,14 @@ async def add_flavor_to_item(item_id: int, flavor_id: int, session: SessionDep):
         return {"message": "Этот вкус уже добавлен"}
 
     item.flavors.append(flavor)
+    touch_item_flavors(session, item_id)
     await session.commit()
     return {"status": "success"}
 
 
 @router.post("/remove_flavor_from_item")
 async def remove_taste_from_item(item_id: int, flavor_id: int, session: SessionDep):
-    stmt = select(Item).where(Item.id == item_id).options(selectinload(Item.flavors))
-    result = await session.execute(stmt)
+    result = await session.execute(statements.ITEM_WITH_FLAVORS_BY_ID, {"item_id": item_id})
     item = result.scalar_one_or_none()
 
     if not item:
@@ -156,19 +244,19 @@ async def remove_taste_from_item(item_id: int, flavor_id: int, session: SessionD
         raise HTTPException(status_code=404, detail="Вкус не найден")
 
     item.flavors.remove(flavor)
+    touch_item_flavors(session, item_id)
     await session.commit()
     return {"status": "success"}
 
 
-@router.patch("/items/{item_id}")
+@router.patch("/items/{item_id}", response_model=ItemGetSchema)
 async def update_item(
     item_id: int,
     session: SessionDep,
     category_id: int = Form(None),
 ):
     """Обновить категорию товара (и при необходимости другие поля)."""
-    result = await session.execute(select(Item).where(Item.id == item_id))
-    item = result.scalar_one_or_none()
+    item = await session.get(Item, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Товар не найден")
     if category_id is not None:
@@ -176,6 +264,7 @@ async def update_item(
         if not cat:
             raise HTTPException(status_code=404, detail="Категория не найдена")
         item.category_id = category_id
+    touch_items(session, item_id)
     await session.commit()
     await session.refresh(item)
     return item
\ No newline at end of file
@@ -0,0 +1,57 @@
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException
+from fastapi.exceptions import RequestValidationError
+
+from bot.config import BotConfig
+from bot.roles import Role, RoleResolver
+from core.webapp_auth import init_data_user_id
+from jobs.queue import InvalidPayload, kinds, queue
+from schemas.jobs import JobGetSchema
+
+_config = BotConfig.from_env()
+# Те же источники ролей, что у бота: TELEGRAM_ADMIN_IDS и таблица staff
+_roles = RoleResolver(_config)
+
+
+async def require_admin(x_telegram_init_data: str | None = Header(None)) -> int:
+    """Администратор по подписанным initData Mini App (X-Telegram-Init-Data), как в боте."""
+    user_id = init_data_user_id(x_telegram_init_data or "", _config.token)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Нужна авторизация Telegram")
+    if await _roles.resolve(user_id) is not Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Только для администраторов")
+    return user_id
+
+
+# Задачи (переоценка, резервная копия, сборка загрузок) ставят и смотрят только администраторы
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post("/jobs/{kind}", response_model=JobGetSchema, status_code=202)
+async def enqueue_job(
+    kind: str,
+    payload: dict[str, Any] = Body(default_factory=dict),
+    idempotency_key: str | None = Header(None),
+):
+    """Поставить фоновую задачу (items.reprice, catalog.rebuild, uploads.gc) и сразу вернуть её.
+
+    Тело — параметры задачи; они проверяются схемой типа (jobs.tasks), ошибка — 422.
+    Повтор запроса с тем же заголовком Idempotency-Key возвращает уже созданную
+    задачу. Статус и прогресс — GET /jobs/{job_id}. Только для администраторов
+    (require_admin): без подписанных initData — 401, не админ — 403.
+    """
+    if kind not in kinds():
+        raise HTTPException(status_code=404, detail="Неизвестный тип задачи")
+    try:
+        return await queue.enqueue(kind, payload, idempotency_key=idempotency_key)
+    except InvalidPayload as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors])
+
+
+@router.get("/jobs/{job_id}", response_model=JobGetSchema)
+async def get_job(job_id: int):
+    job = await queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job
@@ -0,0 +1,32 @@
+import os
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from core import files, images
+from core.static import CACHE_IMMUTABLE
+
+router = APIRouter()
+
+
+@router.get("/img/{width}/{file_name}", response_class=FileResponse)
+async def get_image(width: int, file_name: str):
+    """Фото из uploads шириной не меньше width — для srcset витрины.
+
+    Ширина округляется вверх до ближайшей из IMAGE_WIDTHS; WebP-копия создаётся
+    при первом запросе (core.images.derive) и дальше отдаётся с диска. Если фото
+    не шире запрошенного, ширина больше всех из списка или Pillow не установлен —
+    отдаётся оригинал. Имена файлов уникальны, поэтому ответ кэшируется навсегда.
+    """
+    if os.path.basename(file_name) != file_name or file_name.startswith("."):
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    headers = {"Cache-Control": CACHE_IMMUTABLE}
+    source = files.upload_path(file_name)
+    target_width = images.pick_width(width)
+    if target_width is not None:
+        target = images.derived_path(file_name, target_width)
+        if await files.exists(target) or await images.derive(source, target, target_width):
+            return FileResponse(target, media_type="image/webp", headers=headers)
+    if not await files.exists(source):
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    return FileResponse(source, headers=headers)
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Form, HTTPException
+from sqlalchemy import select
+
+from catalog.changes import touch_items
+from catalog.pricing import to_utc, utcnow
+from catalog.promotions import promotion_item_ids, scheduler
+from database.db import SessionDep
+from models.category import Category
+from models.items import Item
+from models.promotion import Promotion
+from schemas.promotions import PromotionGetSchema
+
+router = APIRouter()
+
+
+@router.get("/promotions", response_model=list[PromotionGetSchema])
+async def get_promotions(session: SessionDep):
+    """Действующие и запланированные акции (завершённые удаляет планировщик)."""
+    result = await session.scalars(select(Promotion).order_by(Promotion.starts_at, Promotion.id))
+    return result.all()
+
+
+@router.post("/promotions", response_model=PromotionGetSchema)
+async def create_promotion(
+    discount: float = Form(..., gt=0, le=100),
+    starts_at: datetime = Form(...),
+    ends_at: datetime = Form(...),
+    item_id: int = Form(None),
+    category_id: int = Form(None),
+    session: SessionDep = None,
+):
+    """Запланировать скидку (в процентах) на товар или категорию в окне [starts_at, ends_at)."""
+    if (item_id is None) == (category_id is None):
+        raise HTTPException(status_code=400, detail="Укажите ровно одно из: item_id, category_id")
+    starts_at, ends_at = to_utc(starts_at), to_utc(ends_at)
+    if ends_at <= starts_at:
+        raise HTTPException(status_code=400, detail="Окончание акции должно быть позже начала")
+    if ends_at <= utcnow():
+        raise HTTPException(status_code=400, detail="Акция уже завершилась")
+    if item_id is not None and not await session.get(Item, item_id):
+        raise HTTPException(status_code=404, detail="Товар не найден")
+    if category_id is not None and not await session.get(Category, category_id):
+        raise HTTPException(status_code=404, detail="Категория не найдена")
+
+    promotion = Promotion(
+        item_id=item_id,
+        category_id=category_id,
+        discount=discount,
+        starts_at=starts_at,
+        ends_at=ends_at,
+    )
+    session.add(promotion)
+    await session.flush()
+    # Уже начавшаяся акция применяется сразу; будущую применит планировщик
+    if starts_at <= utcnow():
+        touch_items(session, *await promotion_item_ids(session, [promotion]))
+    await session.commit()
+    scheduler.wake()
+    return promotion
+
+
+@router.delete("/promotions/{promotion_id}")
+async def delete_promotion(promotion_id: int, session: SessionDep):
+    promotion = await session.get(Promotion, promotion_id)
+    if not promotion:
+        raise HTTPException(status_code=404, detail="Акция не найдена")
+    touch_items(session, *await promotion_item_ids(session, [promotion]))
+    await session.delete(promotion)
+    await session.commit()
+    scheduler.wake()
+    return {"status": "deleted"}
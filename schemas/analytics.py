@@ -0,0 +1,13 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ItemEventSchema(BaseModel):
+    kind: Literal["view", "cart"]
+    item_id: int
+
+
+class ItemEventBatchSchema(BaseModel):
+    session_id: str = Field(min_length=1, max_length=64)
+    events: list[ItemEventSchema] = Field(max_length=100)
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class CategoryGetSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    photo: str
+    photo_width: int | None = None
+    photo_height: int | None = None
+    photo_color: str | None = None
+    photo_placeholder: str | None = None
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class FlavorGetSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    photo: str
+    photo_width: int | None = None
+    photo_height: int | None = None
+    photo_color: str | None = None
+    photo_placeholder: str | None = None
+
+
+class FlavorFacetSchema(FlavorGetSchema):
+    """Вкус с числом товаров в выбранной категории (формат /catalog/facets)."""
+    count: int
@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from schemas.categories import CategoryGetSchema
+from schemas.flavors import FlavorGetSchema
 
 
 class ItemSchema(BaseModel):
@@ -8,6 +11,24 @@ class ItemSchema(BaseModel):
 
 
 class ItemGetSchema(BaseModel):
+    """Товар без связей (ответ на создание/изменение)."""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
-    title: str
-    author: str
\ No newline at end of file
+    name: str
+    description: str
+    price: float
+    discount: float | None = None
+    photo: str
+    photo_width: int | None = None
+    photo_height: int | None = None
+    photo_color: str | None = None
+    photo_placeholder: str | None = None
+    category_id: int | None = None
+
+
+class ItemCatalogSchema(ItemGetSchema):
+    """Товар витрины: с категорией, вкусами и итоговой ценой (формат /get_items)."""
+    effective_price: float
+    category: CategoryGetSchema | None = None
+    flavors: list[FlavorGetSchema] = []
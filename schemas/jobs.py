@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobGetSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    progress_done: int
+    progress_total: int
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class JobPayloadSchema(BaseModel):
+    """Параметры задачи без полей. Лишние ключи — ошибка при постановке (422),
+    а не TypeError в обработчике после ответа клиенту."""
+    model_config = ConfigDict(extra="forbid")
+
+
+class RepricePayloadSchema(JobPayloadSchema):
+    percent: float = Field(gt=-100)
+    category_id: int | None = None
+
+
+class UploadsGcPayloadSchema(JobPayloadSchema):
+    mode: Literal["delete", "quarantine"] = "quarantine"
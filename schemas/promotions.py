@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class PromotionGetSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    item_id: int | None = None
+    category_id: int | None = None
+    discount: float
+    starts_at: datetime
+    ends_at: datetime
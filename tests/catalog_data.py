@@ -0,0 +1,68 @@
+"""Создание строк каталога в тестах — теми же путями записи, что у приложения (catalog.changes)."""
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from catalog.changes import touch_category, touch_flavor, touch_item_flavors, touch_items
+from models.category import Category
+from models.flavor import Flavor
+from models.items import Item, item_flavor_association
+
+
+async def add_category(session: AsyncSession, name: str) -> int:
+    category = Category(name=name, photo=f"{name}.png")
+    session.add(category)
+    await session.flush()
+    await touch_category(session, category.id)
+    await session.commit()
+    return category.id
+
+
+async def add_flavor(session: AsyncSession, name: str) -> int:
+    flavor = Flavor(name=name, photo=f"{name}.png")
+    session.add(flavor)
+    await session.flush()
+    await touch_flavor(session, flavor.id)
+    await session.commit()
+    return flavor.id
+
+
+async def add_item(
+    session: AsyncSession,
+    name: str,
+    category_id: int | None = None,
+    flavor_ids: tuple[int, ...] = (),
+    price: float = 100.0,
+) -> int:
+    item = Item(name=name, description="", price=price, photo=f"{name}.png", category_id=category_id)
+    session.add(item)
+    await session.flush()
+    await set_flavors(session, item.id, flavor_ids, commit=False)
+    touch_items(session, item.id)
+    await session.commit()
+    return item.id
+
+
+async def update_item(session: AsyncSession, item_id: int, **values) -> None:
+    item = await session.get(Item, item_id)
+    for name, value in values.items():
+        setattr(item, name, value)
+    touch_items(session, item_id)
+    await session.commit()
+
+
+async def set_flavors(session: AsyncSession, item_id: int, flavor_ids: tuple[int, ...], commit: bool = True) -> None:
+    await session.execute(delete(item_flavor_association).where(item_flavor_association.c.item_id == item_id))
+    if flavor_ids:
+        await session.execute(
+            item_flavor_association.insert(),
+            [{"item_id": item_id, "flavor_id": flavor_id} for flavor_id in flavor_ids],
+        )
+    touch_item_flavors(session, item_id)
+    if commit:
+        await session.commit()
+
+
+async def delete_item(session: AsyncSession, item_id: int) -> None:
+    await session.execute(delete(Item).where(Item.id == item_id))
+    touch_items(session, item_id)
+    await session.commit()
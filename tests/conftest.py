@@ -0,0 +1,55 @@
+"""Общие фикстуры тестов: приложение на временной SQLite-базе.
+
+Настройки читаются при импорте config, поэтому окружение и рабочий каталог
+(uploads, snapshot, backups создаются относительно него) задаются здесь — до
+импорта модулей приложения.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="tests-")
+sys.path.insert(0, ROOT)
+os.chdir(WORKDIR)
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{WORKDIR}/test.db",
+    "TELEGRAM_BOT_TOKEN": "",
+    "RATE_LIMIT_ENABLED": "0",
+})
+
+import pytest  # noqa: E402
+
+from catalog import facets  # noqa: E402
+from catalog.events import broker  # noqa: E402
+from database.db import Base, engine, new_async_session  # noqa: E402
+import database.schema  # noqa: E402,F401 — регистрирует все модели в Base.metadata
+
+
+async def reset_database() -> None:
+    """Пустая схема и сброшенные индексы процесса (фасеты, SSE-брокер)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    facets.index.loaded = False
+    facets.index._reset()
+    broker.start(0)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def session_factory():
+    """Фабрика сессий на чистой базе; соединения закрываются после теста (свой цикл событий)."""
+    await reset_database()
+    yield new_async_session
+    await engine.dispose()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    os.chdir(ROOT)
+    shutil.rmtree(WORKDIR, ignore_errors=True)
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from catalog import changelog
+from catalog.changelog import ENTITY_ITEM, OP_DELETE
+from conftest import reset_database
+from database.db import engine, new_async_session
+from models.catalog import CatalogChange, CatalogVersion
+from routes import catalog as catalog_routes
+
+from catalog_data import add_category, add_item, delete_item, update_item
+
+pytestmark = pytest.mark.anyio
+
+
+async def changes(session, since: int) -> dict:
+    return json.loads(await changelog.changes_since(session, since))
+
+
+async def test_versions_follow_the_counter(session_factory):
+    async with session_factory() as session:
+        category_id = await add_category(session, "Жидкости")
+        first = await changelog.current_version(session)
+        await add_item(session, "A", category_id)
+        second = await changelog.current_version(session)
+        counter = await session.scalar(select(CatalogVersion.version))
+        versions = list(await session.scalars(select(CatalogChange.version).order_by(CatalogChange.version)))
+
+    assert second > first
+    assert counter == second
+    # Номера без пропусков и повторов: каждый commit берёт следующий диапазон счётчика
+    assert versions == list(range(1, second + 1))
+
+
+async def test_compact_keeps_tombstones(session_factory):
+    async with session_factory() as session:
+        kept = await add_item(session, "Остаётся")
+        removed = await add_item(session, "Удаляется")
+        after_create = await changelog.current_version(session)
+        await update_item(session, kept, price=150.0)
+        await update_item(session, removed, price=50.0)
+        await delete_item(session, removed)
+        version = await changelog.current_version(session)
+
+        deleted = await changelog.compact(session)
+        rows = (await session.execute(
+            select(CatalogChange.entity, CatalogChange.entity_id, CatalogChange.op)
+            .where(CatalogChange.entity == ENTITY_ITEM)
+        )).all()
+        assert deleted > 0
+        # По одной записи на товар; для удалённого — надгробие
+        assert sorted(rows) == sorted([(ENTITY_ITEM, kept, "upsert"), (ENTITY_ITEM, removed, OP_DELETE)])
+        assert await changelog.current_version(session) == version
+
+        delta = await changes(session, after_create)
+        assert [item["id"] for item in delta["items"]] == [kept]
+        assert delta["items"][0]["price"] == 150.0
+        assert delta["deleted"]["items"] == [removed]
+
+        full = await changes(session, 0)
+        assert [item["id"] for item in full["items"]] == [kept]
+        assert full["deleted"]["items"] == [removed]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(catalog_routes.router)
+    with TestClient(app) as client:
+        client.portal.call(reset_database)
+        yield client
+        client.portal.call(engine.dispose)
+
+
+def test_changes_since_returns_deltas(client):
+    async def seed() -> tuple[int, int, int]:
+        async with new_async_session() as session:
+            category_id = await add_category(session, "Жидкости")
+            first = await add_item(session, "Первый", category_id)
+            second = await add_item(session, "Второй", category_id)
+            return category_id, first, second
+
+    category_id, first, second = client.portal.call(seed)
+    full = client.get("/catalog/changes", params={"since": 0}).json()
+    assert full["reset"] is False
+    assert [item["id"] for item in full["items"]] == [first, second]
+    assert [category["id"] for category in full["categories"]] == [category_id]
+    synced = full["version"]
+
+    assert client.get("/catalog/changes", params={"since": synced}).json() == {
+        "version": synced,
+        "reset": False,
+        "items": [],
+        "categories": [],
+        "flavors": [],
+        "deleted": {"items": [], "categories": [], "flavors": []},
+    }
+
+    async def edit() -> None:
+        async with new_async_session() as session:
+            await update_item(session, first, name="Первый+")
+            await delete_item(session, second)
+
+    client.portal.call(edit)
+    delta = client.get("/catalog/changes", params={"since": synced}).json()
+    assert delta["version"] > synced
+    assert [(item["id"], item["name"]) for item in delta["items"]] == [(first, "Первый+")]
+    assert delta["categories"] == []
+    assert delta["deleted"]["items"] == [second]
+
+
+def test_changes_since_future_version_asks_for_reset(client):
+    async def version() -> int:
+        async with new_async_session() as session:
+            await add_item(session, "Товар")
+            return await session.scalar(select(func.max(CatalogChange.version)))
+
+    current = client.portal.call(version)
+    assert client.get("/catalog/changes", params={"since": current + 10}).json() == {
+        "version": current,
+        "reset": True,
+    }
@@ -0,0 +1,86 @@
+import pytest
+
+from catalog import facets
+from catalog.facets import MODE_AND, MODE_OR, FacetIndex, iter_ids
+
+from catalog_data import add_category, add_flavor, add_item, delete_item, set_flavors, update_item
+
+
+def upsert(item_id: int, category_id: int | None, flavor_ids: tuple[int, ...]) -> dict:
+    item = {"id": item_id, "category_id": category_id, "flavors": [{"id": flavor_id} for flavor_id in flavor_ids]}
+    return {"type": "item.upsert", "id": item_id, "item": item}
+
+
+def ids(bits: int) -> list[int]:
+    return list(iter_ids(bits))
+
+
+@pytest.fixture
+def index() -> FacetIndex:
+    index = FacetIndex()
+    index.loaded = True
+    index.apply([
+        upsert(1, 1, (10, 11)),
+        upsert(2, 1, (10,)),
+        upsert(3, 2, (11,)),
+        upsert(4, None, ()),
+    ])
+    return index
+
+
+def test_and_or_match(index):
+    assert ids(index.match([10, 11], MODE_AND)) == [1]
+    assert ids(index.match([10, 11], MODE_OR)) == [1, 2, 3]
+    assert ids(index.match([10, 11], MODE_OR, category_id=1)) == [1, 2]
+    assert ids(index.match([11], MODE_AND, category_id=2)) == [3]
+    assert ids(index.match([], MODE_AND)) == [1, 2, 3, 4]
+    assert ids(index.match([99], MODE_OR)) == []
+    assert index.flavor_counts(1) == {10: 2, 11: 1}
+
+
+def test_upsert_replaces_previous_bits(index):
+    # Товар 1 потерял вкус 10 и переехал в категорию 2
+    index.apply([upsert(1, 2, (11,))])
+    assert ids(index.match([10, 11], MODE_AND)) == []
+    assert ids(index.match([10], MODE_OR)) == [2]
+    assert ids(index.match([11], MODE_OR, category_id=1)) == []
+    assert ids(index.match([11], MODE_OR, category_id=2)) == [1, 3]
+    assert index.flavor_counts(1) == {10: 1}
+
+
+def test_delete_clears_item(index):
+    index.apply([{"type": "item.delete", "id": 2}, {"type": "item.delete", "id": 3}])
+    assert ids(index.match([10], MODE_OR)) == [1]
+    assert ids(index.match([10, 11], MODE_OR)) == [1]
+    assert index.flavor_counts() == {10: 1, 11: 1}
+    assert ids(index.scope(2)) == []
+
+
+def test_unloaded_index_ignores_events():
+    index = FacetIndex()
+    index.apply([upsert(1, 1, (10,))])
+    assert ids(index.match([10], MODE_OR)) == []
+
+
+@pytest.mark.anyio
+async def test_index_follows_commits(session_factory):
+    async with session_factory() as session:
+        await session.run_sync(facets.index.load)
+        category_id = await add_category(session, "Жидкости")
+        mint = await add_flavor(session, "Мята")
+        berry = await add_flavor(session, "Ягоды")
+        both = await add_item(session, "Оба", category_id, (mint, berry))
+        only_mint = await add_item(session, "Мята", category_id, (mint,))
+
+        assert ids(facets.index.match([mint, berry], MODE_AND, category_id)) == [both]
+        assert ids(facets.index.match([mint, berry], MODE_OR, category_id)) == [both, only_mint]
+
+        await set_flavors(session, only_mint, (mint, berry))
+        assert ids(facets.index.match([mint, berry], MODE_AND)) == [both, only_mint]
+
+        await update_item(session, both, category_id=None)
+        assert ids(facets.index.match([berry], MODE_OR, category_id)) == [only_mint]
+
+        await delete_item(session, only_mint)
+        assert ids(facets.index.match([mint, berry], MODE_OR)) == [both]
+        assert facets.index.flavor_counts(category_id) == {}
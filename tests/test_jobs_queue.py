@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+
+from catalog.pricing import utcnow
+from jobs import queue as jobs_queue
+from jobs.queue import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    InvalidPayload,
+    JobQueue,
+    register,
+)
+from models.job import Job
+from schemas.jobs import RepricePayloadSchema
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def kinds():
+    """Регистрирует типы задач теста и убирает их после."""
+    names: list[str] = []
+
+    def add(name: str, handler, payload=None):
+        names.append(name)
+        if payload is None:
+            register(name, name)(handler)
+        else:
+            register(name, name, payload)(handler)
+
+    yield add
+    for name in names:
+        jobs_queue._kinds.pop(name, None)
+
+
+def make_queue(session_factory, **options) -> JobQueue:
+    return JobQueue(session_factory, retry_base=0, **options)
+
+
+async def run_once(queue: JobQueue) -> Job:
+    """Забрать и выполнить одну задачу, как воркер; вернуть её строку после выполнения."""
+    row = await queue._claim()
+    assert row is not None
+    await queue._execute(row)
+    return await queue.get(row[0])
+
+
+async def test_failed_attempt_is_retried(session_factory, kinds):
+    calls = []
+
+    async def flaky(ctx):
+        calls.append(ctx.attempt)
+        if ctx.attempt == 1:
+            raise RuntimeError("сеть недоступна")
+        return {"summary": "ok"}
+
+    kinds("test.flaky", flaky)
+    queue = make_queue(session_factory)
+    job = await queue.enqueue("test.flaky")
+
+    job = await run_once(queue)
+    assert (job.status, job.attempts) == (STATUS_QUEUED, 1)
+    assert job.error == "RuntimeError: сеть недоступна"
+
+    job = await run_once(queue)
+    assert (job.status, job.attempts, job.error) == (STATUS_DONE, 2, None)
+    assert job.result == {"summary": "ok"}
+    assert calls == [1, 2]
+
+
+async def test_retry_waits_for_backoff(session_factory, kinds):
+    async def broken(ctx):
+        raise RuntimeError("сбой")
+
+    kinds("test.backoff", broken)
+    queue = JobQueue(session_factory, retry_base=60)
+    await queue.enqueue("test.backoff")
+    job = await run_once(queue)
+    assert job.status == STATUS_QUEUED
+    assert job.run_after > utcnow() + timedelta(seconds=50)
+    assert await queue._claim() is None
+
+
+async def test_fails_after_max_attempts(session_factory, kinds):
+    async def broken(ctx):
+        raise ValueError("ошибка в обработчике")
+
+    kinds("test.broken", broken)
+    queue = make_queue(session_factory)
+    await queue.enqueue("test.broken", max_attempts=2)
+
+    # ValueError из кода обработчика — обычная ошибка, повторяется
+    assert (await run_once(queue)).status == STATUS_QUEUED
+    job = await run_once(queue)
+    assert (job.status, job.attempts) == (STATUS_FAILED, 2)
+    assert job.error == "ValueError: ошибка в обработчике"
+
+
+async def test_invalid_payload_fails_without_retry(session_factory, kinds):
+    async def rejects(ctx):
+        raise InvalidPayload("нечего делать")
+
+    kinds("test.rejects", rejects)
+    queue = make_queue(session_factory)
+    await queue.enqueue("test.rejects")
+    job = await run_once(queue)
+    assert (job.status, job.attempts) == (STATUS_FAILED, 1)
+    assert job.error == "InvalidPayload: нечего делать"
+
+
+async def test_payload_is_validated(session_factory, kinds):
+    async def reprice(ctx, percent: float, category_id: int | None = None):
+        return {"percent": percent}
+
+    kinds("test.reprice", reprice, RepricePayloadSchema)
+    queue = make_queue(session_factory)
+    with pytest.raises(InvalidPayload) as error:
+        await queue.enqueue("test.reprice", {"percent": -150})
+    assert error.value.errors[0]["loc"] == ("percent",)
+
+    # Задача, поставленная до изменения схемы: неверные параметры — сразу failed
+    async with session_factory() as session:
+        now = utcnow()
+        session.add(Job(
+            kind="test.reprice", payload={"percent": 5, "unknown": 1}, status=STATUS_QUEUED,
+            attempts=0, max_attempts=3, run_after=now, created_at=now, updated_at=now,
+        ))
+        await session.commit()
+    job = await run_once(queue)
+    assert (job.status, job.attempts) == (STATUS_FAILED, 1)
+    assert job.error.startswith("InvalidPayload:")
+
+
+async def test_stale_running_job_is_requeued(session_factory, kinds):
+    async def noop(ctx):
+        return None
+
+    kinds("test.noop", noop)
+    owner = make_queue(session_factory, stale_after=120)
+    other = make_queue(session_factory, stale_after=120)
+    job = await owner.enqueue("test.noop")
+    row = await owner._claim()
+    assert row[0] == job.id
+
+    job = await owner.get(job.id)
+    assert (job.status, job.locked_by) == (STATUS_RUNNING, owner.worker_id)
+    # Владелец жив — чужой процесс задачу не трогает
+    assert await other.recover() == 0
+
+    async with session_factory() as session:
+        await session.execute(
+            update(Job).where(Job.id == job.id).values(heartbeat_at=utcnow() - timedelta(seconds=300))
+        )
+        await session.commit()
+    # Свежая отметка владельца снова защищает задачу
+    assert await owner.heartbeat() == 1
+    assert await other.recover() == 0
+
+    async with session_factory() as session:
+        await session.execute(
+            update(Job).where(Job.id == job.id).values(heartbeat_at=utcnow() - timedelta(seconds=300))
+        )
+        await session.commit()
+    assert await other.recover() == 1
+    job = await other.get(job.id)
+    assert (job.status, job.locked_by) == (STATUS_QUEUED, None)
+
+    job = await run_once(other)
+    assert (job.status, job.attempts) == (STATUS_DONE, 2)
+
+
+async def test_idempotency_key_returns_existing_job(session_factory, kinds):
+    async def noop(ctx):
+        return None
+
+    kinds("test.once", noop)
+    queue = make_queue(session_factory)
+    first = await queue.enqueue("test.once", idempotency_key="once:1")
+    second = await queue.enqueue("test.once", idempotency_key="once:1")
+    assert first.id == second.id
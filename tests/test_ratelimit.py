@@ -0,0 +1,50 @@
+import pytest
+
+from core.ratelimit import GROUP_READ, GROUP_WRITE, Limit, RateLimiter, classify
+
+
+def test_parse():
+    assert Limit.parse("10/50") == Limit(10.0, 50)
+    assert Limit.parse("0.2/5") == Limit(0.2, 5)
+    # Без всплеска — ведро на секунду запросов, но не меньше одного
+    assert Limit.parse("3") == Limit(3.0, 3)
+    assert Limit.parse("0.5") == Limit(0.5, 1)
+
+
+@pytest.mark.parametrize("raw", ["0/s", "0/5", "0", "-1/5", "5/0", "nan/5", "abc", "10/x"])
+def test_parse_rejects_invalid_limits(raw):
+    with pytest.raises(ValueError, match="Лимит"):
+        Limit.parse(raw)
+
+
+def test_bucket_allows_burst_then_limits():
+    limiter = RateLimiter({GROUP_WRITE: Limit(1.0, 3)})
+    assert [limiter.hit("client", GROUP_WRITE, now=100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("client", GROUP_WRITE, now=100.0) == pytest.approx(1.0)
+    # Другой клиент и группа без лимита не затронуты
+    assert limiter.hit("other", GROUP_WRITE, now=100.0) == 0.0
+    assert limiter.hit("client", GROUP_READ, now=100.0) == 0.0
+    assert (limiter.allowed, limiter.limited) == (4, 1)
+
+
+def test_bucket_refills_over_time():
+    limiter = RateLimiter({GROUP_WRITE: Limit(2.0, 2)})
+    limiter.hit("client", GROUP_WRITE, now=0.0)
+    limiter.hit("client", GROUP_WRITE, now=0.0)
+    assert limiter.hit("client", GROUP_WRITE, now=0.25) == pytest.approx(0.25)
+    assert limiter.hit("client", GROUP_WRITE, now=0.5) == 0.0
+
+
+def test_idle_buckets_are_evicted():
+    limiter = RateLimiter({GROUP_WRITE: Limit(1.0, 5)})
+    limiter.hit("old", GROUP_WRITE, now=0.0)
+    limiter.hit("new", GROUP_WRITE, now=10.0)
+    assert len(limiter) == 1
+
+
+def test_classify():
+    assert classify("GET", "/img/320/a.png") == "static"
+    assert classify("GET", "/catalog/stream") == "stream"
+    assert classify("POST", "/analytics/events") == "events"
+    assert classify("POST", "/create_items") == GROUP_WRITE
+    assert classify("GET", "/get_items") == GROUP_READ